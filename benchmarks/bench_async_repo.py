@@ -0,0 +1,144 @@
+"""
+Concurrent RunTask ticks on SQLite through the sync repositories (one shared
+Session) and through AsyncFupGenRepository/AsyncFupRepository (aiosqlite,
+one pooled session per call).
+
+Besides the wall time it reports the longest stall of a 1 ms heartbeat task,
+i.e. how long the event loop was blocked, and with it every other timer.
+
+    PYTHONPATH=src python benchmarks/bench_async_repo.py [OWNERS] [GENERATORS]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from app.usecase.task.runtask import RunTask
+from domain.entity.channel import Channel
+from domain.entity.fup import FollowUp
+from domain.entity.fupgen import FupGenInput
+from domain.entity.recurrence import RecurrenceConfig
+from infra.db.db import Session, make_async_session, make_session
+from infra.db.models.base import Base
+from infra.db.models.fup import fup
+from infra.recurrence.cursor import cursor_factory
+from infra.repository.asyncfupgenrepo import AsyncFupGenRepository
+from infra.repository.fupgenrepo import FupGenRepository
+from infra.repository.fuprepo import AsyncFupRepository
+
+TS = datetime(2025, 5, 4, 12)
+
+
+class SyncFupRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, fups: list[FollowUp]) -> None:
+        if fups:
+            rows = [dict(f.model_dump(), id=str(uuid4())) for f in fups]
+            self.db.execute(insert(fup.__table__), rows)
+            self.db.commit()
+
+
+class Gateway:
+    async def send(self, fups: list[FollowUp]) -> None:
+        await asyncio.sleep(0.002)  # the network
+
+
+def populate(path: str, owners: int, generators: int) -> None:
+    session = make_session(f"sqlite:///{path}", Base)()
+    repo = FupGenRepository(
+        db=session, make_recurrence=cursor_factory, make_id=lambda: str(uuid4())
+    )
+    repo.create_many(
+        [
+            FupGenInput(
+                hookid="hook",
+                ownerid=f"owner{o}",
+                name=f"gen{g}",
+                channel=[Channel(id="a", type="email", configdata={})],
+                recurconfig=RecurrenceConfig(
+                    freq="DAILY",
+                    dtstart=datetime(2025, 5, 1) + timedelta(hours=g),
+                    allow_infinite=True,
+                ),
+                msg="hello",
+            )
+            for o in range(owners)
+            for g in range(generators)
+        ]
+    )
+    session.close()
+
+
+async def heartbeat(stop: asyncio.Event, stalls: list[float]) -> None:
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        stalls.append(now - last - 0.001)
+        last = now
+
+
+async def ticks(task: RunTask, owners: int) -> tuple[float, float]:
+    stop = asyncio.Event()
+    stalls: list[float] = []
+    beat = asyncio.create_task(heartbeat(stop, stalls))
+    await asyncio.sleep(0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(task.execute(f"owner{o}", TS) for o in range(owners)))
+    elapsed = time.perf_counter() - t0
+
+    stop.set()
+    await beat
+    return elapsed, max(stalls, default=0.0)
+
+
+async def main(owners: int, generators: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_path = os.path.join(tmp, "sync.db")
+        async_path = os.path.join(tmp, "async.db")
+        populate(sync_path, owners, generators)
+        populate(async_path, owners, generators)
+
+        session = make_session(f"sqlite:///{sync_path}", Base)()
+        sync_task = RunTask(
+            fupgenrepo=FupGenRepository(
+                db=session, make_recurrence=cursor_factory, make_id=str
+            ),
+            fuprepo=SyncFupRepository(session),
+            sendgateway=Gateway(),
+        )
+
+        sessions = await make_async_session(f"sqlite+aiosqlite:///{async_path}", Base)
+        async_task = RunTask(
+            fupgenrepo=AsyncFupGenRepository(
+                sessions=sessions, make_recurrence=cursor_factory, make_id=str
+            ),
+            fuprepo=AsyncFupRepository(sessions=sessions, make_id=lambda: str(uuid4())),
+            sendgateway=Gateway(),
+        )
+
+        print(f"{owners:,} concurrent ticks, {generators} generators each")
+        for name, task in (("sync Session", sync_task), ("AsyncSession", async_task)):
+            elapsed, stall = await ticks(task, owners)
+            print(
+                f"{name:<13} {elapsed:.2f}s  ({owners / elapsed:,.0f} ticks/s)  "
+                f"longest loop stall {stall * 1000:.1f}ms"
+            )
+
+        session.close()
+        await sessions.kw["bind"].dispose()
+
+
+if __name__ == "__main__":
+    owners = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    generators = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    asyncio.run(main(owners, generators))
@@ -0,0 +1,64 @@
+"""
+Memory per owner of AsyncioTaskScheduler, task-per-owner vs single-loop mode.
+
+Every owner is added far in the future, so what is measured is the idle cost
+of a scheduled owner: traced Python allocations and pending timer handles.
+
+    PYTHONPATH=src python benchmarks/bench_asyncio_memory.py [N]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Optional
+
+from infra.scheduler.taskscheduler import AsyncioTaskScheduler
+
+
+async def tick(task_id: str) -> Optional[datetime]:
+    return None
+
+
+async def measure(n: int, single_loop: bool) -> tuple[float, int, float, float]:
+    logger = logging.getLogger("bench")
+    logger.disabled = True
+    sch = AsyncioTaskScheduler(logger=logger, single_loop=single_loop)
+    run_at = datetime.now() + timedelta(hours=1)
+    ids = [f"owner{i}" for i in range(n)]
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    for task_id in ids:
+        await sch.add_task(task_id, tick, run_at)
+    await asyncio.sleep(0)  # let the per-owner tasks reach their timer
+    added = time.perf_counter() - t0
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    timers = len(asyncio.get_running_loop()._scheduled)  # type: ignore[attr-defined]
+
+    t0 = time.perf_counter()
+    for task_id in ids:
+        await sch.remove_task(task_id)
+    removed = time.perf_counter() - t0
+    return used / n, timers, added, removed
+
+
+async def main(n: int) -> None:
+    print(f"{n:,} owners")
+    print(
+        f"{'mode':<14} {'bytes/owner':>12} {'timers':>9} {'add s':>8} {'remove s':>9}"
+    )
+    for label, single_loop in [("task-per-owner", False), ("single-loop", True)]:
+        per_owner, timers, added, removed = await measure(n, single_loop)
+        print(
+            f"{label:<14} {per_owner:>12,.0f} {timers:>9,} {added:>8.2f} {removed:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -0,0 +1,77 @@
+"""
+One tick of recurrence work for N generators: a SchedulerManager.schedule per
+generator (rrule_factory, cursor_factory) against one batch_schedule call, and
+SharedSchedule when only DISTINCT rule states exist among them. The
+generators are simple DAILY/WEEKLY/MONTHLY rules about two years old.
+
+    PYTHONPATH=src python benchmarks/bench_batch_recurrence.py [N] [DISTINCT]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+from domain.entity.recurrence import RecurrenceConfig, make_scheduler
+from infra.recurrence.batch import batch_schedule
+from infra.recurrence.cursor import cursor_factory
+from infra.recurrence.rruleadaptor import rrule_factory
+from infra.recurrence.shared import SharedSchedule
+
+TICK = datetime(2025, 4, 20, 12)
+
+
+def configs(n: int, distinct: int | None = None) -> list[RecurrenceConfig]:
+    out = []
+    for i in range(n):
+        freq = ("DAILY", "WEEKLY", "MONTHLY")[i % 3]
+        dtstart = TICK - timedelta(days=730, minutes=i % (distinct or n))
+        cfg = RecurrenceConfig(
+            freq=freq, dtstart=dtstart, interval=1 + i % 2, allow_infinite=True
+        )
+        # last run a few days before the tick, as for a live generator
+        sch = make_scheduler(cursor_factory, cfg)
+        sch.schedule(TICK - timedelta(days=3))
+        out.append(sch.config)
+    return out
+
+
+def per_generator(factory, cfgs: list[RecurrenceConfig]) -> float:
+    t0 = time.perf_counter()
+    for cfg in cfgs:
+        make_scheduler(factory, cfg.model_copy()).schedule(TICK)
+    return time.perf_counter() - t0
+
+
+def batched(cfgs: list[RecurrenceConfig], plan=batch_schedule) -> float:
+    t0 = time.perf_counter()
+    # the SchedulerManagers exist anyway: RunTask gets them from the repository
+    managers = [make_scheduler(cursor_factory, cfg.model_copy()) for cfg in cfgs]
+    t1 = time.perf_counter()
+    planned = plan([m.config for m in managers], TICK)
+    for manager, (dates, next_run) in zip(managers, planned):
+        manager.apply(dates, next_run)
+    return time.perf_counter() - t1
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    cfgs = configs(n)
+    shared = configs(n, distinct)
+    for name, seconds in (
+        ("rrule_factory", per_generator(rrule_factory, cfgs)),
+        ("cursor_factory", per_generator(cursor_factory, cfgs)),
+        ("batch_schedule", batched(cfgs)),
+        (f"{distinct} distinct:", None),
+        ("cursor_factory", per_generator(cursor_factory, shared)),
+        ("batch_schedule", batched(shared)),
+        ("SharedSchedule", batched(shared, SharedSchedule())),
+    ):
+        if seconds is None:
+            print(name)
+            continue
+        print(f"{name:<16} {seconds * 1000:>10.1f} ms {seconds / n * 1e6:>8.1f} us/gen")
+
+
+if __name__ == "__main__":
+    main()
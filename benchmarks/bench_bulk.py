@@ -0,0 +1,77 @@
+"""
+One-by-one schedule/cancel against schedule_many/cancel_many, per backend.
+Backends are started, as during a warm start or a mass import.
+
+    PYTHONPATH=src python benchmarks/bench_bulk.py [N]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from infra.scheduler.scheduler import (
+    APSchedulerTaskScheduler,
+    HeapqTaskScheduler,
+    TaskSchedulerProtocol,
+)
+from infra.scheduler.timingwheel import TimingWheelTaskScheduler
+
+BACKENDS: dict[str, Callable[[], TaskSchedulerProtocol]] = {
+    "heapq": HeapqTaskScheduler,
+    "timingwheel": TimingWheelTaskScheduler,
+    "apscheduler": APSchedulerTaskScheduler,
+}
+
+
+async def stub(task_id: str) -> Optional[datetime]:
+    return None
+
+
+async def run(make: Callable[[], TaskSchedulerProtocol], n: int) -> list[float]:
+    start = datetime.now() + timedelta(hours=1)
+    tasks = [(f"owner{i}", start + timedelta(seconds=(i * 7919) % n)) for i in range(n)]
+    ids = [task_id for task_id, _ in tasks]
+    timings = []
+
+    sch = make()
+    await sch.start()
+    t0 = time.perf_counter()
+    for task_id, run_at in tasks:
+        await sch.schedule(task_id, stub, run_at)
+    t1 = time.perf_counter()
+    for task_id in ids:
+        await sch.cancel(task_id)
+    t2 = time.perf_counter()
+    await sch.stop()
+    timings += [t1 - t0, t2 - t1]
+
+    sch = make()
+    await sch.start()
+    t0 = time.perf_counter()
+    await sch.schedule_many(stub, tasks)
+    t1 = time.perf_counter()
+    await sch.cancel_many(ids)
+    t2 = time.perf_counter()
+    await sch.stop()
+    timings += [t1 - t0, t2 - t1]
+    return timings
+
+
+async def main(n: int) -> None:
+    logging.disable(logging.INFO)
+    print(f"{n:,} tasks, seconds")
+    print(
+        f"{'backend':<12} {'schedule':>9} {'cancel':>9} {'sched_many':>11} {'cancel_many':>12}"
+    )
+    for name, make in BACKENDS.items():
+        one, cancel, many, cancel_many = await run(make, n)
+        print(
+            f"{name:<12} {one:>9.3f} {cancel:>9.3f} {many:>11.3f} {cancel_many:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -0,0 +1,70 @@
+"""
+Onboarding a customer's generators: FupGenRepository.create per generator
+against one create_many.
+
+    PYTHONPATH=src python benchmarks/bench_create_many.py [GENERATORS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from domain.entity.channel import Channel
+from domain.entity.fupgen import FupGenInput
+from domain.entity.recurrence import RecurrenceConfig
+from infra.db.db import make_session
+from infra.db.models.base import Base
+from infra.recurrence.cursor import cursor_factory
+from infra.repository.fupgenrepo import FupGenRepository
+
+
+def inputs(ownerid: str, n: int) -> list[FupGenInput]:
+    start = datetime(2025, 1, 1)
+    return [
+        FupGenInput(
+            hookid="hook",
+            ownerid=f"{ownerid}{i % 1000}",
+            name=f"gen{i}",
+            channel=[
+                Channel(id="a", type="email", configdata={"to": "a@b.c"}),
+                Channel(id="b", type="sms", configdata={"to": "123"}),
+            ],
+            recurconfig=RecurrenceConfig(
+                freq="DAILY",
+                dtstart=start + timedelta(minutes=(i * 7919) % 1440),
+                allow_infinite=True,
+            ),
+            msg="hello",
+            data={"i": i},
+        )
+        for i in range(n)
+    ]
+
+
+def main(n: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        session = make_session(f"sqlite:///{os.path.join(tmp, 'ups.db')}", Base)()
+        repo = FupGenRepository(
+            db=session, make_recurrence=cursor_factory, make_id=lambda: str(uuid4())
+        )
+
+        batch = inputs("single", n)
+        t0 = time.perf_counter()
+        for input in batch:
+            repo.create(input)
+        elapsed = time.perf_counter() - t0
+        print(f"create      {n:,} generators in {elapsed:.2f}s ({n / elapsed:,.0f}/s)")
+
+        batch = inputs("bulk", n)
+        t0 = time.perf_counter()
+        repo.create_many(batch)
+        elapsed = time.perf_counter() - t0
+        print(f"create_many {n:,} generators in {elapsed:.2f}s ({n / elapsed:,.0f}/s)")
+        session.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
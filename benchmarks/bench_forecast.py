@@ -0,0 +1,90 @@
+"""
+30-day forecast for one owner with thousands of generators, against
+hydrating them with get_fupgen as RunTask does.
+
+    PYTHONPATH=src python benchmarks/bench_forecast.py [GENERATORS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.usecase.task.forecast import Forecast
+from infra.db.db import make_session
+from infra.db.models.base import Base
+from infra.db.models.data import Data
+from infra.db.models.fupgen import FupGen
+from infra.db.models.msg import Message
+from infra.db.models.recurrenceconfig import Recurrence
+from infra.recurrence.cursor import cursor_factory
+from infra.recurrence.rruleadaptor import rrule_factory
+from infra.repository.fupgenrepo import FupGenRepository
+
+NOW = datetime(2025, 4, 20, 12)
+FREQS = ("DAILY", "WEEKLY", "MONTHLY")
+
+
+def populate(session, n: int) -> None:
+    ids = [f"gen{i}" for i in range(n)]
+    blob = "x" * 2000
+    session.execute(insert(Message), [{"id": id, "msg": blob} for id in ids])
+    session.execute(insert(Data), [{"id": id, "data": {"blob": blob}} for id in ids])
+    session.execute(
+        insert(FupGen),
+        [
+            {
+                "id": id,
+                "hookid": "hook",
+                "ownerid": "owner",
+                "name": id,
+                "message_id": id,
+                "data_id": id,
+            }
+            for id in ids
+        ],
+    )
+    recs = []
+    for i, id in enumerate(ids):
+        dtstart = datetime(2024, 1, 1) + timedelta(hours=i % 24, days=i % 28)
+        recs.append(
+            {
+                "id": id,
+                "freq": FREQS[i % 3],
+                "dtstart": dtstart,
+                "next_run": NOW + timedelta(hours=i % 48),
+                "past_events": "all",
+                "is_exhausted": False,
+            }
+        )
+    session.execute(insert(Recurrence), recs)
+    session.commit()
+
+
+def main(n: int) -> None:
+    until = NOW + timedelta(days=30)
+    with tempfile.TemporaryDirectory() as tmp:
+        session = make_session(f"sqlite:///{os.path.join(tmp, 'ups.db')}", Base)()
+        populate(session, n)
+
+        for name, factory in (("rrule", rrule_factory), ("cursor", cursor_factory)):
+            repo = FupGenRepository(db=session, make_recurrence=factory, make_id=str)
+            forecast = Forecast(fupgenrepo=repo, make_recurrence=factory)
+            t0 = time.perf_counter()
+            fups = forecast.execute("owner", until, ts=NOW)
+            elapsed = time.perf_counter() - t0
+            print(f"forecast ({name}): {len(fups):,} fups in {elapsed * 1000:.0f}ms")
+
+        session.expunge_all()
+        t0 = time.perf_counter()
+        repo.get_fupgen("owner", active_only=True)
+        elapsed = time.perf_counter() - t0
+        print(f"get_fupgen alone (cursor): {elapsed * 1000:.0f}ms")
+        session.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
@@ -0,0 +1,99 @@
+"""
+"Which generators fire in the next hour": evaluating every rule against one
+range scan on the occurrence table.
+
+    PYTHONPATH=src python benchmarks/bench_occurrences.py [GENERATORS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from infra.db.db import make_session
+from infra.db.models.base import Base
+from infra.db.models.fupgen import FupGen
+from infra.db.models.recurrenceconfig import Recurrence
+from infra.recurrence.cursor import cursor_factory
+from infra.repository.fupgenrepo import to_config
+from infra.repository.occurrencerepo import OccurrenceRepository
+
+NOW = datetime(2025, 4, 20, 12)
+CHUNK = 50_000
+
+
+def populate(session, n: int) -> None:
+    start = datetime(2025, 1, 1)
+    for c in range(0, n, CHUNK):
+        ids = [f"gen{i}" for i in range(c, min(c + CHUNK, n))]
+        session.execute(
+            insert(FupGen),
+            [
+                {
+                    "id": id,
+                    "hookid": "hook",
+                    "ownerid": f"owner{id}",
+                    "name": "gen",
+                    "message_id": id,
+                    "data_id": id,
+                }
+                for id in ids
+            ],
+        )
+        recs = []
+        for i, id in enumerate(ids, c):
+            dtstart = start + timedelta(minutes=(i * 7919) % 1440)
+            nr = dtstart + timedelta(days=(NOW - dtstart).days)
+            recs.append(
+                {
+                    "id": id,
+                    "freq": "DAILY",
+                    "dtstart": dtstart,
+                    "last_run": nr,
+                    "next_run": nr + timedelta(days=1) if nr <= NOW else nr,
+                    "is_exhausted": False,
+                }
+            )
+        session.execute(insert(Recurrence), recs)
+    session.commit()
+
+
+def evaluate_all(session, end: datetime) -> int:
+    found = 0
+    for (rec,) in session.execute(
+        select(Recurrence).where(Recurrence.is_exhausted == False)
+    ):
+        found += len(cursor_factory(to_config(rec)).between(NOW, end))
+    return found
+
+
+def main(n: int) -> None:
+    end = NOW + timedelta(hours=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        session = make_session(f"sqlite:///{os.path.join(tmp, 'ups.db')}", Base)()
+        populate(session, n)
+        occurrences = OccurrenceRepository(db=session, make_recurrence=cursor_factory)
+
+        t0 = time.perf_counter()
+        found = evaluate_all(session, end)
+        print(
+            f"evaluate every rule: {found:,} dates in {time.perf_counter() - t0:.2f}s"
+        )
+
+        t0 = time.perf_counter()
+        occurrences.refill([f"gen{i}" for i in range(n)])
+        print(f"initial refill (depth 10): {time.perf_counter() - t0:.2f}s")
+
+        t0 = time.perf_counter()
+        due = occurrences.due_between(NOW, end)
+        print(
+            f"range scan: {len(due):,} dates in {(time.perf_counter() - t0) * 1000:.1f}ms"
+        )
+        session.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
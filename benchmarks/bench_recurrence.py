@@ -0,0 +1,49 @@
+"""
+Cost of one tick's recurrence work (build the Recurrence, schedule up to now,
+compute next_run) as the rule gets older, rrule_factory against cursor_factory.
+
+    PYTHONPATH=src python benchmarks/bench_recurrence.py [REPEAT]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+from domain.entity.recurrence import RecurrenceConfig, make_scheduler
+from infra.recurrence.cursor import cursor_factory
+from infra.recurrence.rruleadaptor import rrule_factory
+
+FACTORIES = {"rrule": rrule_factory, "cursor": cursor_factory}
+RULES = {
+    "daily": dict(freq="DAILY"),
+    "weekly MO,FR": dict(freq="WEEKLY", byweekday=["MO", "FR"]),
+}
+
+
+def tick_us(factory, rule: dict, age: timedelta, repeat: int) -> float:
+    now = datetime(2025, 4, 20, 12)
+    # the state a generator of that age is in: last run a few days ago
+    seed = RecurrenceConfig(dtstart=now - age, allow_infinite=True, **rule)
+    last_run = make_scheduler(rrule_factory, seed)._recur.after(now - timedelta(days=4))
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        cfg = seed.model_copy(update={"last_run": last_run, "next_run": None})
+        make_scheduler(factory, cfg).schedule(now)
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def main() -> None:
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{'rule':<14} {'age':>6}" + "".join(f"{f + ' us':>12}" for f in FACTORIES))
+    for name, rule in RULES.items():
+        for years in (1, 5, 20):
+            age = timedelta(days=365 * years)
+            row = [
+                tick_us(factory, rule, age, repeat) for factory in FACTORIES.values()
+            ]
+            print(f"{name:<14} {years:>5}y" + "".join(f"{us:>12.1f}" for us in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Throughput of the in-memory scheduler backends.
+
+    PYTHONPATH=src python benchmarks/bench_scheduler.py [N ...]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from infra.scheduler.scheduler import HeapqTaskScheduler, TaskSchedulerProtocol
+from infra.scheduler.timingwheel import TimingWheelTaskScheduler
+
+BACKENDS: dict[str, Callable[[], TaskSchedulerProtocol]] = {
+    "heapq": HeapqTaskScheduler,
+    "timingwheel": TimingWheelTaskScheduler,
+}
+
+
+async def stub(task_id: str) -> Optional[datetime]:
+    return None
+
+
+def spread(n: int, start: datetime, width: timedelta) -> list[datetime]:
+    # deterministic, unordered run times inside [start, start + width)
+    step = width / n
+    return [start + ((i * 7919) % n) * step for i in range(n)]
+
+
+async def bench_ops(
+    make: Callable[[], TaskSchedulerProtocol], n: int
+) -> dict[str, float]:
+    sch = make()
+    ids = [f"owner{i}" for i in range(n)]
+    times = spread(n, datetime.now() + timedelta(hours=1), timedelta(days=7))
+    later = spread(n, datetime.now() + timedelta(days=8), timedelta(days=7))
+
+    t0 = time.perf_counter()
+    for task_id, run_at in zip(ids, times):
+        await sch.schedule(task_id, stub, run_at)
+    t1 = time.perf_counter()
+    for task_id, run_at in zip(ids, later):
+        await sch.cancel(task_id)
+        await sch.schedule(task_id, stub, run_at)
+    t2 = time.perf_counter()
+    for task_id in ids:
+        await sch.cancel(task_id)
+    t3 = time.perf_counter()
+
+    return {
+        "schedule": n / (t1 - t0),
+        "reschedule": n / (t2 - t1),
+        "cancel": n / (t3 - t2),
+    }
+
+
+async def bench_expiry(make: Callable[[], TaskSchedulerProtocol], n: int) -> float:
+    sch = make()
+    done = asyncio.Event()
+    fired = 0
+
+    async def counting(task_id: str) -> Optional[datetime]:
+        nonlocal fired
+        fired += 1
+        if fired == n:
+            done.set()
+        return None
+
+    # everything already due: measures pure expiry/dispatch cost
+    start = datetime.now()
+    for i, run_at in enumerate(spread(n, start, timedelta(milliseconds=1))):
+        await sch.schedule(f"owner{i}", counting, run_at)
+
+    t0 = time.perf_counter()
+    await sch.start()
+    await done.wait()
+    elapsed = time.perf_counter() - t0
+    await sch.stop()
+    return n / elapsed
+
+
+async def main(sizes: list[int]) -> None:
+    print(
+        f"{'backend':<12} {'n':>9} {'schedule/s':>12} {'reschedule/s':>13} {'cancel/s':>12} {'fired/s':>10}"
+    )
+    for n in sizes:
+        for name, make in BACKENDS.items():
+            ops = await bench_ops(make, n)
+            fired = await bench_expiry(make, n)
+            print(
+                f"{name:<12} {n:>9} {ops['schedule']:>12,.0f} {ops['reschedule']:>13,.0f} "
+                f"{ops['cancel']:>12,.0f} {fired:>10,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(a) for a in sys.argv[1:]] or [10_000, 100_000]))
@@ -0,0 +1,66 @@
+"""
+Fire lag of HeapqTaskScheduler under load, inline vs worker pool.
+
+Every task simulates a RunTask tick with an awaited I/O delay, and 1% of
+owners are slow. Lag is the time between `run_at` and the coroutine start.
+
+    PYTHONPATH=src python benchmarks/bench_scheduler_lag.py [N]
+"""
+
+import asyncio
+import statistics
+import sys
+from datetime import datetime, timedelta
+from typing import Optional
+
+from infra.scheduler.scheduler import HeapqTaskScheduler
+
+FAST = 0.002
+SLOW = 0.2
+
+
+async def run(n: int, max_concurrency: Optional[int]) -> list[float]:
+    sch = HeapqTaskScheduler(max_concurrency=max_concurrency)
+    start = datetime.now() + timedelta(milliseconds=100)
+    # n owners due over one second
+    run_at = {f"owner{i}": start + timedelta(seconds=i / n) for i in range(n)}
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def tick(task_id: str) -> Optional[datetime]:
+        lags.append((datetime.now() - run_at[task_id]).total_seconds())
+        await asyncio.sleep(SLOW if int(task_id[5:]) % 100 == 0 else FAST)
+        if len(lags) == n:
+            done.set()
+        return None
+
+    for task_id, at in run_at.items():
+        await sch.schedule(task_id, tick, at)
+    await sch.start()
+    await done.wait()
+    await sch.stop()
+    return lags
+
+
+def pct(values: list[float], p: float) -> float:
+    return statistics.quantiles(values, n=100)[int(p) - 1] if p < 100 else max(values)
+
+
+async def main(n: int) -> None:
+    print(f"{'mode':<14} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for label, conc in [
+        ("inline", None),
+        ("pool=4", 4),
+        ("pool=16", 16),
+        ("pool=64", 64),
+        ("pool=256", 256),
+    ]:
+        lags = await run(n, conc)
+        print(
+            f"{label:<14} {pct(lags, 50) * 1000:>9.1f} "
+            f"{pct(lags, 99) * 1000:>9.1f} {pct(lags, 100) * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,59 @@
+"""
+Writing one tick's cursor updates: the per-row ORM load-and-mutate loop
+update_config used to run against the executemany UPDATE it runs now.
+
+    PYTHONPATH=src python benchmarks/bench_update_config.py [UPDATES]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from bench_occurrences import NOW, populate
+
+from infra.db.db import make_session
+from infra.db.models.base import Base
+from infra.db.models.fupgen import FupGen
+from infra.recurrence.cursor import cursor_factory
+from infra.repository.fupgenrepo import FupGenRepository
+
+
+def per_row(session, updates) -> None:
+    for fupgen_id, is_exhausted, count, last_run, next_run in updates:
+        fupgen = session.query(FupGen).filter_by(id=fupgen_id).one()
+        fupgen.recurrence.is_exhausted = is_exhausted
+        fupgen.recurrence.count = count
+        fupgen.recurrence.last_run = last_run
+        fupgen.recurrence.next_run = next_run
+    session.commit()
+
+
+def main(n: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        session = make_session(f"sqlite:///{os.path.join(tmp, 'ups.db')}", Base)()
+        populate(session, n)
+        repo = FupGenRepository(db=session, make_recurrence=cursor_factory, make_id=str)
+
+        for name, write in (
+            ("per-row ORM", lambda updates: per_row(session, updates)),
+            ("executemany", repo.update_config),
+        ):
+            tick = NOW + timedelta(days=1 if name == "per-row ORM" else 2)
+            updates = [
+                (f"gen{i}", False, None, tick, tick + timedelta(days=1))
+                for i in range(n)
+            ]
+            session.expunge_all()
+            t0 = time.perf_counter()
+            write(updates)
+            elapsed = time.perf_counter() - t0
+            print(
+                f"{name:<12} {n:,} updates in {elapsed:.2f}s " f"({n / elapsed:,.0f}/s)"
+            )
+        session.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
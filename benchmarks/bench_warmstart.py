@@ -0,0 +1,92 @@
+"""
+Warm start of the scheduler from the recurrence table.
+
+    PYTHONPATH=src python benchmarks/bench_warmstart.py [OWNERS] [GENS_PER_OWNER]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy import insert
+
+from app.usecase.task.runtask import RunTask
+from app.usecase.task.warmstart import WarmStart
+from infra.db.db import make_session
+from infra.db.models.base import Base
+from infra.db.models.fupgen import FupGen
+from infra.db.models.recurrenceconfig import Recurrence
+from infra.recurrence.rruleadaptor import rrule_factory
+from infra.repository.fupgenrepo import FupGenRepository
+from infra.scheduler.scheduler import HeapqTaskScheduler
+
+CHUNK = 50_000
+
+
+def populate(session, owners: int, gens: int) -> None:
+    start = datetime(2025, 1, 1)
+    fupgens, recs = [], []
+    for o in range(owners):
+        for g in range(gens):
+            id = f"{o}-{g}"
+            fupgens.append(
+                {
+                    "id": id,
+                    "hookid": "hook",
+                    "ownerid": f"owner{o}",
+                    "name": f"gen{g}",
+                    "message_id": id,
+                    "data_id": id,
+                }
+            )
+            recs.append(
+                {
+                    "id": id,
+                    "freq": "DAILY",
+                    "dtstart": start,
+                    "next_run": start + timedelta(minutes=(o * 7 + g * 13) % 1440),
+                    "is_exhausted": g == gens - 1 and gens > 1,
+                }
+            )
+            if len(recs) >= CHUNK:
+                session.execute(insert(FupGen), fupgens)
+                session.execute(insert(Recurrence), recs)
+                fupgens, recs = [], []
+    if recs:
+        session.execute(insert(FupGen), fupgens)
+        session.execute(insert(Recurrence), recs)
+    session.commit()
+
+
+async def main(owners: int, gens: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'ups.db')}"
+        session = make_session(url, Base)()
+
+        t0 = time.perf_counter()
+        populate(session, owners, gens)
+        print(
+            f"populated {owners * gens:,} generators in {time.perf_counter() - t0:.1f}s"
+        )
+
+        repo = FupGenRepository(db=session, make_recurrence=rrule_factory, make_id=str)
+        scheduler = HeapqTaskScheduler()
+        runtask = RunTask(fupgenrepo=repo, fuprepo=MagicMock(), sendgateway=AsyncMock())
+        warmstart = WarmStart(fupgenrepo=repo, scheduler=scheduler, runtask=runtask)
+
+        t0 = time.perf_counter()
+        loaded = await warmstart.execute()
+        elapsed = time.perf_counter() - t0
+        print(
+            f"warm start: {loaded:,} owners in {elapsed:.2f}s ({loaded / elapsed:,.0f}/s)"
+        )
+        session.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    asyncio.run(main(*(args + [1_000_000, 2][len(args) :])))
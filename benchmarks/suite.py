@@ -0,0 +1,200 @@
+"""
+Benchmark suite for the scheduler backends, all driven through
+TaskSchedulerProtocol with a stub coroutine.
+
+For each backend and size it measures schedule, reschedule and cancel
+throughput, fire lag percentiles (time between run_at and the coroutine
+start) and peak RSS. Every (backend, size) pair runs in its own process so
+peak RSS is not shared between runs.
+
+The fire phase makes all n tasks due within --fire-window seconds, so at large
+n the lag shows how far each backend falls behind when it is saturated.
+
+    PYTHONPATH=src python benchmarks/suite.py [--sizes 1000,100000,1000000]
+        [--backends heapq,timingwheel,...] [--fire-window 1] [--timeout SECONDS]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from infra.scheduler.scheduler import (
+    APSchedulerTaskScheduler,
+    HeapqTaskScheduler,
+    TaskSchedulerProtocol,
+)
+from infra.scheduler.taskscheduler import AsyncioTaskScheduler
+from infra.scheduler.timingwheel import TimingWheelTaskScheduler
+
+BACKENDS: dict[str, Callable[[], TaskSchedulerProtocol]] = {
+    "heapq": HeapqTaskScheduler,
+    "heapq-pool": lambda: HeapqTaskScheduler(max_concurrency=64),
+    "timingwheel": lambda: TimingWheelTaskScheduler(
+        resolution=timedelta(milliseconds=10)
+    ),
+    "apscheduler": APSchedulerTaskScheduler,
+    "asyncio": AsyncioTaskScheduler,
+    "asyncio-single-loop": lambda: AsyncioTaskScheduler(single_loop=True),
+}
+
+
+async def stub(task_id: str) -> Optional[datetime]:
+    return None
+
+
+def spread(n: int, start: datetime, width: timedelta) -> list[datetime]:
+    # deterministic, unordered run times inside [start, start + width)
+    step = width / n
+    return [start + ((i * 7919) % n) * step for i in range(n)]
+
+
+def pct(values: list[float], p: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[p - 1]
+
+
+async def bench_ops(make: Callable[[], TaskSchedulerProtocol], n: int) -> dict:
+    sch = make()
+    await sch.start()
+    ids = [f"owner{i}" for i in range(n)]
+    times = spread(n, datetime.now() + timedelta(days=1), timedelta(days=7))
+    later = spread(n, datetime.now() + timedelta(days=8), timedelta(days=7))
+
+    t0 = time.perf_counter()
+    for task_id, run_at in zip(ids, times):
+        await sch.schedule(task_id, stub, run_at)
+    t1 = time.perf_counter()
+    for task_id, run_at in zip(ids, later):
+        await sch.reschedule(task_id, run_at)
+    t2 = time.perf_counter()
+    for task_id in ids:
+        await sch.cancel(task_id)
+    t3 = time.perf_counter()
+    await sch.stop()
+
+    return {
+        "schedule_per_s": n / (t1 - t0),
+        "reschedule_us": (t2 - t1) / n * 1e6,
+        "cancel_per_s": n / (t3 - t2),
+    }
+
+
+async def bench_fire(
+    make: Callable[[], TaskSchedulerProtocol],
+    n: int,
+    schedule_per_s: float,
+    window: timedelta,
+) -> dict:
+    sch = make()
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def record(task_id: str) -> Optional[datetime]:
+        lags.append((datetime.now() - run_at[task_id]).total_seconds())
+        if len(lags) == n:
+            done.set()
+        return None
+
+    # the first run_at comes after every task is queued, estimated from the
+    # schedule throughput measured before
+    start = datetime.now() + timedelta(seconds=0.2 + 1.5 * n / schedule_per_s)
+    run_at = dict(zip((f"owner{i}" for i in range(n)), spread(n, start, window)))
+    await sch.start()
+    for task_id, at in run_at.items():
+        await sch.schedule(task_id, record, at)
+    late_start = (datetime.now() - start).total_seconds()
+
+    await done.wait()
+    await sch.stop()
+    return {
+        "lag_p50_ms": pct(lags, 50) * 1000,
+        "lag_p99_ms": pct(lags, 99) * 1000,
+        "lag_max_ms": max(lags) * 1000,
+        # > 0 means scheduling overran the estimate and the lag is inflated
+        "fire_late_start_s": max(late_start, 0.0),
+    }
+
+
+async def run_one(backend: str, n: int, window: timedelta) -> dict:
+    logging.disable(logging.CRITICAL)
+    make = BACKENDS[backend]
+    base_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = {"backend": backend, "n": n}
+    result.update(await bench_ops(make, n))
+    result.update(await bench_fire(make, n, result["schedule_per_s"], window))
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mb"] = peak_kb / 1024
+    result["rss_per_task_b"] = (peak_kb - base_kb) * 1024 / n
+    return result
+
+
+def run_isolated(backend: str, n: int, window: float, timeout: float) -> dict:
+    cmd = [sys.executable, os.path.abspath(__file__), "--one", backend, str(n)]
+    cmd += ["--fire-window", str(window)]
+    try:
+        out = subprocess.run(
+            cmd, capture_output=True, text=True, timeout=timeout, check=True
+        ).stdout
+    except subprocess.TimeoutExpired:
+        return {"backend": backend, "n": n, "error": f"timeout after {timeout:.0f}s"}
+    except subprocess.CalledProcessError as e:
+        lines = e.stderr.strip().splitlines()
+        return {"backend": backend, "n": n, "error": lines[-1] if lines else "failed"}
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def print_row(r: dict) -> bool:
+    if "error" in r:
+        print(f"{r['backend']:<20} {r['n']:>9,}  {r['error']}")
+        return False
+    late = "*" if r["fire_late_start_s"] > 0 else ""
+    print(
+        f"{r['backend']:<20} {r['n']:>9,} {r['schedule_per_s']:>11,.0f} "
+        f"{r['reschedule_us']:>10.1f} {r['cancel_per_s']:>11,.0f} "
+        f"{r['lag_p50_ms']:>8.1f} {r['lag_p99_ms']:>8.1f}{late:<1} "
+        f"{r['peak_rss_mb']:>8.0f} {r['rss_per_task_b']:>8.0f}"
+    )
+    return bool(late)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--fire-window", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=1800)
+    parser.add_argument("--one", nargs=2, metavar=("BACKEND", "N"))
+    args = parser.parse_args()
+
+    if args.one:
+        backend, n = args.one
+        window = timedelta(seconds=args.fire_window)
+        print(json.dumps(asyncio.run(run_one(backend, int(n), window))))
+        return
+
+    print(
+        f"{'backend':<20} {'n':>9} {'sched/s':>11} {'resched us':>10} "
+        f"{'cancel/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8} {'B/task':>8}"
+    )
+    overran = False
+    for n in (int(s) for s in args.sizes.split(",")):
+        for backend in args.backends.split(","):
+            result = run_isolated(backend, n, args.fire_window, args.timeout)
+            overran |= print_row(result)
+            sys.stdout.flush()
+    if overran:
+        print("* scheduling overran the fire window estimate; lag includes it")
+
+
+if __name__ == "__main__":
+    main()
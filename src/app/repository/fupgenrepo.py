@@ -1,25 +1,107 @@
 from datetime import datetime
-from typing import Protocol
+from typing import AsyncIterator, Iterator, Protocol
 
 from domain.entity.fupgen import FollowupGenerator, FupGenInput
+from domain.entity.recurrence import RecurrenceConfig
 
 
 class FupGenRepository(Protocol):
     def create(self, input: FupGenInput) -> datetime | None: ...
 
+    def create_many(self, inputs: list[FupGenInput]) -> dict[str, datetime]: ...
+
     def get_fupgen_id_by_owner_name(self, ownerid: str, name: str) -> str | None: ...
 
     def get_fupgen(
         self, ownerid: str, active_only: bool
     ) -> list[FollowupGenerator]: ...
 
+    def get_fupgen_many(
+        self, ownerids: list[str], active_only: bool
+    ) -> list[FollowupGenerator]: ...
+
+    def get_recurrences(
+        self, ownerids: list[str]
+    ) -> list[tuple[str, str, str, str, RecurrenceConfig]]: ...
+
+    def iter_next_runs(
+        self, chunk_size: int, before: datetime | None = None
+    ) -> Iterator[list[tuple[str, datetime]]]: ...
+
+    def get_next_runs(self, ownerids: list[str]) -> dict[str, datetime]: ...
+
+    def get_due(
+        self,
+        before: datetime,
+        limit: int,
+        after_cursor: tuple[datetime, str] | None = None,
+    ) -> list[tuple[str, str, datetime]]: ...
+
     def update_config(
         self,
         updates: list[tuple[str, bool, int | None, datetime | None, datetime | None]],
     ) -> None: ...
 
+    def arm(self, ownerids: list[str]) -> None: ...
+
+    def disarm(self, ownerids: list[str]) -> None: ...
+
+    def reschedule(self, ownerid: str, run_at: datetime) -> bool: ...
+
     def update_exhaust_rule(
         self, fupgen_id: str, add_count: int | None, until: datetime | None
     ) -> None: ...
 
     def delete_fupgen(self, fupgen_id: str) -> None: ...
+
+
+class AsyncFupGenRepository(Protocol):
+    async def create(self, input: FupGenInput) -> datetime | None: ...
+
+    async def create_many(self, inputs: list[FupGenInput]) -> dict[str, datetime]: ...
+
+    async def get_fupgen_id_by_owner_name(
+        self, ownerid: str, name: str
+    ) -> str | None: ...
+
+    async def get_fupgen(
+        self, ownerid: str, active_only: bool
+    ) -> list[FollowupGenerator]: ...
+
+    async def get_fupgen_many(
+        self, ownerids: list[str], active_only: bool
+    ) -> list[FollowupGenerator]: ...
+
+    async def get_recurrences(
+        self, ownerids: list[str]
+    ) -> list[tuple[str, str, str, str, RecurrenceConfig]]: ...
+
+    def iter_next_runs(
+        self, chunk_size: int, before: datetime | None = None
+    ) -> AsyncIterator[list[tuple[str, datetime]]]: ...
+
+    async def get_next_runs(self, ownerids: list[str]) -> dict[str, datetime]: ...
+
+    async def get_due(
+        self,
+        before: datetime,
+        limit: int,
+        after_cursor: tuple[datetime, str] | None = None,
+    ) -> list[tuple[str, str, datetime]]: ...
+
+    async def update_config(
+        self,
+        updates: list[tuple[str, bool, int | None, datetime | None, datetime | None]],
+    ) -> None: ...
+
+    async def arm(self, ownerids: list[str]) -> None: ...
+
+    async def disarm(self, ownerids: list[str]) -> None: ...
+
+    async def reschedule(self, ownerid: str, run_at: datetime) -> bool: ...
+
+    async def update_exhaust_rule(
+        self, fupgen_id: str, add_count: int | None, until: datetime | None
+    ) -> None: ...
+
+    async def delete_fupgen(self, fupgen_id: str) -> None: ...
@@ -6,3 +6,8 @@ from domain.entity.fup import FollowUp
 class FupRepository(Protocol):
 
     def add(self, fups: list[FollowUp]) -> None: ...
+
+
+class AsyncFupRepository(Protocol):
+
+    async def add(self, fups: list[FollowUp]) -> None: ...
@@ -0,0 +1,12 @@
+from datetime import datetime
+from typing import Protocol
+
+
+class OccurrenceRepository(Protocol):
+    def refill(self, fupgen_ids: list[str]) -> None: ...
+
+    def rebuild(self, fupgen_ids: list[str]) -> None: ...
+
+    def due_between(
+        self, start: datetime, end: datetime, ownerids: list[str] | None = None
+    ) -> list[tuple[str, str, datetime]]: ...
@@ -3,8 +3,8 @@ from dataclasses import dataclass, field
 from logging import Logger
 from typing import Any
 
-from app.repository.fupgenrepo import FupGenRepository
-from app.usecase.task.runtask import RunTask
+from app.repository.fupgenrepo import AsyncFupGenRepository, FupGenRepository
+from app.usecase.task.runtask import RunTask, resolve
 from app.usecase.usecase import UseCase
 from domain.entity.fupgen import FupGenInput
 from infra.scheduler.interface import ITaskScheduler
@@ -12,7 +12,7 @@ from infra.scheduler.interface import ITaskScheduler
 
 @dataclass
 class CreateFupGenerator(UseCase):
-    fupgenrepo: FupGenRepository
+    fupgenrepo: FupGenRepository | AsyncFupGenRepository
     scheduler: ITaskScheduler
     runtask: RunTask
 
@@ -20,7 +20,7 @@ class CreateFupGenerator(UseCase):
 
     async def execute(self, fupgen: FupGenInput) -> None:
 
-        next_run = self.fupgenrepo.create(fupgen)
+        next_run = await resolve(self.fupgenrepo.create(fupgen))
 
         ownerid = fupgen.ownerid
 
@@ -33,6 +33,35 @@ class CreateFupGenerator(UseCase):
             self.logger.info(f"Next Run for '{ownerid}' has None as next_run")
             return
 
-        await self.scheduler.schedule(self.runtask.execute, ownerid, next_run)
+        await self.scheduler.schedule(
+            task_id=ownerid, coro=self.runtask.execute, run_at=next_run
+        )
 
         self.logger.info(f"[{ownerid}] Task added to the scheduler.")
+
+
+@dataclass
+class CreateFupGenerators(UseCase):
+    """Bulk CreateFupGenerator: one insert transaction, one schedule_many."""
+
+    fupgenrepo: FupGenRepository | AsyncFupGenRepository
+    scheduler: ITaskScheduler
+    runtask: RunTask
+
+    logger: Logger = field(default_factory=logging.getLogger)
+
+    async def execute(self, fupgens: list[FupGenInput]) -> int:
+
+        next_runs = await resolve(self.fupgenrepo.create_many(fupgens))
+        self.logger.info(f"Created {len(fupgens)} generators")
+
+        queued = await self.scheduler.next_run_many(list(next_runs))
+        tasks = [
+            (ownerid, next_run)
+            for ownerid, next_run in next_runs.items()
+            if queued[ownerid] is None
+        ]
+        await self.scheduler.schedule_many(coro=self.runtask.execute, tasks=tasks)
+
+        self.logger.info(f"{len(tasks)} owners added to the scheduler")
+        return len(tasks)
@@ -0,0 +1,72 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging import Logger
+
+from app.repository.fupgenrepo import AsyncFupGenRepository, FupGenRepository
+from app.usecase.task.runtask import resolve
+from app.usecase.usecase import UseCase
+from domain.entity.fup import FollowUp
+from domain.entity.recurrence import RecurrenceConfig, recurrenceFactory
+
+
+@dataclass
+class Forecast(UseCase):
+    """
+    Read-only preview of the FollowUps RunTask will produce up to a horizon.
+
+    Nothing is written and no SchedulerManager is advanced: each generator's
+    dates are projected from its stored next_run, honouring count, until and
+    past_events (a "lastonly" backlog collapses into its last date). Messages and data are not loaded; the FollowUps carry their
+    ids. Pass a cached factory (rrule_factory, cursor_factory).
+    """
+
+    fupgenrepo: FupGenRepository | AsyncFupGenRepository
+    make_recurrence: recurrenceFactory
+
+    logger: Logger = field(default_factory=logging.getLogger)
+
+    async def execute(
+        self, ownerid: str, until: datetime, ts: datetime | None = None
+    ) -> list[FollowUp]:
+        return (await self.execute_many([ownerid], until, ts))[ownerid]
+
+    async def execute_many(
+        self, ownerids: list[str], until: datetime, ts: datetime | None = None
+    ) -> dict[str, list[FollowUp]]:
+
+        ts = ts or datetime.now()
+        rows = await resolve(self.fupgenrepo.get_recurrences(ownerids))
+
+        forecast: dict[str, list[FollowUp]] = {ownerid: [] for ownerid in ownerids}
+        for fupgenid, ownerid, msgid, dataid, config in rows:
+            forecast[ownerid].extend(
+                # values come from the database: skip validation
+                FollowUp.model_construct(
+                    fupgenid=fupgenid, date=date, msgid=msgid, dataid=dataid
+                )
+                for date in self._project(config, until, ts)
+            )
+        for fups in forecast.values():
+            fups.sort(key=lambda fup: fup.date)
+
+        self.logger.info(
+            f"Forecast for {len(ownerids)} owners over {len(rows)} FupGens until {until}"
+        )
+        return forecast
+
+    def _project(
+        self, config: RecurrenceConfig, until: datetime, ts: datetime
+    ) -> list[datetime]:
+        if config.past_events == "none" or config.next_run is None:
+            return []
+
+        # the recurrence stops at config.count by itself
+        projected = self.make_recurrence(config).between(
+            config.next_run, until, inc=True
+        )
+
+        if config.past_events == "lastonly":
+            overdue = [date for date in projected if date <= ts]
+            projected = overdue[-1:] + projected[len(overdue) :]
+        return projected
@@ -1,76 +1,198 @@
+import asyncio
+import inspect
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime
 from logging import Logger
+from typing import AsyncIterable, AsyncIterator, Awaitable, Iterable, TypeVar
 
 from app.gateway.sendgateway import SendGateway
-from app.repository.fupgenrepo import FupGenRepository
-from app.repository.fuprepo import FupRepository
+from app.repository.fupgenrepo import AsyncFupGenRepository, FupGenRepository
+from app.repository.fuprepo import AsyncFupRepository, FupRepository
 from app.usecase.usecase import UseCase
-from domain.entity.fup import FollowUp, make_fup
+from domain.entity.fup import FollowUp, to_fups
 from domain.entity.fupgen import FollowupGenerator
+from domain.entity.recurrence import batchSchedule
+
+T = TypeVar("T")
+
+
+async def resolve(value: T | Awaitable[T]) -> T:
+    # the repositories may be sync (FupGenRepository) or async
+    # (AsyncFupGenRepository); the latter let other ticks run meanwhile
+    if inspect.isawaitable(value):
+        return await value
+    return value  # type: ignore
+
+
+async def iterate(values: Iterable[T] | AsyncIterable[T]) -> AsyncIterator[T]:
+    # iter_next_runs is a generator on FupGenRepository, an async generator on
+    # AsyncFupGenRepository
+    if isinstance(values, AsyncIterable):
+        async for value in values:
+            yield value
+    else:
+        for value in values:
+            yield value
+
+
+@dataclass
+class CatchUpPolicy:
+    """
+    How RunTask replays the dates missed by generators with past_events="all"
+    (after downtime): `chunk_size` dates at a time, each chunk persisted with
+    the generator's cursor and sent before the next one is built, waiting
+    `throttle` seconds in between. At most `max_dates` per generator and run;
+    its next_run is then left in the past so the next run goes on.
+    """
+
+    chunk_size: int = 500
+    max_dates: int | None = 10_000
+    throttle: float = 0.0
 
 
 @dataclass
 class RunTask(UseCase):
-    fupgenrepo: FupGenRepository
-    fuprepo: FupRepository
+    fupgenrepo: FupGenRepository | AsyncFupGenRepository
+    fuprepo: FupRepository | AsyncFupRepository
     sendgateway: SendGateway
+    # computes the dates of all generators of a tick at once (batch_schedule)
+    # instead of one SchedulerManager.schedule at a time
+    batch_schedule: batchSchedule | None = None
+    catchup: CatchUpPolicy | None = None
 
     logger: Logger = field(default_factory=logging.getLogger)
 
-    async def execute(self, ownerid: str, ts: datetime | None) -> datetime | None:
+    async def execute(
+        self, ownerid: str, ts: datetime | None = None
+    ) -> datetime | None:
 
-        fupgens: list[FollowupGenerator] = self.fupgenrepo.get_fupgen(
-            ownerid=ownerid, active_only=True
+        fupgens: list[FollowupGenerator] = await resolve(
+            self.fupgenrepo.get_fupgen(ownerid=ownerid, active_only=True)
         )
         self.logger.info(f'FupGen query for "{ownerid}" returned {len(fupgens)} items')
         self.logger.debug(str(fupgens))
 
+        nexts = await self._run(fupgens, ts or datetime.now())
+
+        next = min(nexts.values(), default=None)
+
+        self.logger.info(f'Next Task for "{ownerid}" scheduled for {next}')
+        return next
+
+    async def execute_many(
+        self, ownerids: list[str], ts: datetime | None = None
+    ) -> dict[str, datetime | None]:
+
+        fupgens: list[FollowupGenerator] = await resolve(
+            self.fupgenrepo.get_fupgen_many(ownerids=ownerids, active_only=True)
+        )
+        self.logger.info(
+            f"FupGen query for {len(ownerids)} owners returned {len(fupgens)} items"
+        )
+
+        nexts = await self._run(fupgens, ts or datetime.now())
+
+        owner_next: dict[str, datetime | None] = dict.fromkeys(ownerids)
+        for fupgen in fupgens:
+            next = nexts.get(fupgen.id)
+            current = owner_next.get(fupgen.ownerid)
+            if next is not None and (current is None or next < current):
+                owner_next[fupgen.ownerid] = next
+
+        self.logger.info(f"Next Tasks scheduled for {len(ownerids)} owners")
+        return owner_next
+
+    async def _run(
+        self, fupgens: list[FollowupGenerator], ts: datetime
+    ) -> dict[str, datetime]:
+
         nexts: dict[str, datetime] = {
             fupg.id: fupg.scheduler.next_run
             for fupg in fupgens
             if fupg.scheduler.next_run is not None
         }
 
-        ts = ts or datetime.now()
-
         fups: list[FollowUp] = []
         update_recurconf: list[
             tuple[str, bool, int | None, datetime | None, datetime | None]
         ] = []
 
-        for fupgen in fupgens:
+        streamed: list[FollowupGenerator] = []
+        if self.catchup is not None:
+            streamed = [f for f in fupgens if f.scheduler.config.past_events == "all"]
+            fupgens = [f for f in fupgens if f.scheduler.config.past_events != "all"]
+
+        if self.batch_schedule is not None:
+            planned = self.batch_schedule([f.scheduler.config for f in fupgens], ts)
+            dated = [
+                fupgen.scheduler.apply(dates, next_run)
+                for fupgen, (dates, next_run) in zip(fupgens, planned)
+            ]
+        else:
+            dated = [fupgen.scheduler.schedule(ts) for fupgen in fupgens]
 
-            items = make_fup(fupgen, ts)
+        for fupgen, dates in zip(fupgens, dated):
+
+            items = to_fups(fupgen, dates)
             self.logger.info(f'FupGen "{fupgen.id}" generated {len(items)} Fups.')
             self.logger.debug(str(items))
             fups.extend(items)
-            sch = fupgen.scheduler
-            is_exausted = fupgen.scheduler.is_exhausted(ts)
-
-            if sch.next_run is not None:
-                nexts[fupgen.id] = sch.next_run
-
-            update = (fupgen.id, is_exausted, sch.count, sch.last_run, sch.next_run)
-            self.logger.debug(
-                f"""
-                FupGen "{fupgen.id}" update set: 
-                is_exhausted:"{is_exausted}", count:"{sch.count}", 
-                last_run: "{sch.last_run}", next_run: "{sch.next_run}"
-                """
-            )
-            update_recurconf.append(update)
+            update_recurconf.append(self._update(fupgen, ts, nexts))
 
         # TODO logica aqui para salvar ou nao
-        self.fuprepo.add(fups)
-        self.fupgenrepo.update_config(update_recurconf)
+        await resolve(self.fuprepo.add(fups))
+        await resolve(self.fupgenrepo.update_config(update_recurconf))
         # TODO logica aqui para filtrar apenas alguns gateways. ex: apenas console
         await self.sendgateway.send(fups)
         # TODO faz asyncio
         # asyncio.create_task(self.sendgateway.send(fups))
 
-        next = min(nexts.values(), default=None)
+        for fupgen in streamed:
+            await self._catch_up(fupgen, ts, nexts)
+
+        return nexts
+
+    async def _catch_up(
+        self, fupgen: FollowupGenerator, ts: datetime, nexts: dict[str, datetime]
+    ) -> None:
+        policy: CatchUpPolicy = self.catchup  # type: ignore
+        sch = fupgen.scheduler
+        sent = 0
+        for dates in sch.iter_schedule(ts, policy.chunk_size, policy.max_dates):
+            if sent and policy.throttle:
+                await asyncio.sleep(policy.throttle)
+            fups = to_fups(fupgen, dates)
+            await resolve(self.fuprepo.add(fups))
+            # not exhausted while dates up to ts are still pending
+            at = min(ts, sch.next_run) if sch.next_run else ts
+            await resolve(
+                self.fupgenrepo.update_config([self._update(fupgen, at, nexts)])
+            )
+            await self.sendgateway.send(fups)
+            sent += len(fups)
 
-        self.logger.info(f'Next Task for "{ownerid}" scheduled for {next}')
-        return next
+        if not sent:
+            await resolve(
+                self.fupgenrepo.update_config([self._update(fupgen, ts, nexts)])
+            )
+        self.logger.info(f'FupGen "{fupgen.id}" caught up {sent} Fups.')
+
+    def _update(
+        self, fupgen: FollowupGenerator, ts: datetime, nexts: dict[str, datetime]
+    ) -> tuple[str, bool, int | None, datetime | None, datetime | None]:
+        sch = fupgen.scheduler
+        is_exausted = fupgen.scheduler.is_exhausted(ts)
+
+        if sch.next_run is not None:
+            nexts[fupgen.id] = sch.next_run
+
+        update = (fupgen.id, is_exausted, sch.count, sch.last_run, sch.next_run)
+        self.logger.debug(
+            f"""
+            FupGen "{fupgen.id}" update set: 
+            is_exhausted:"{is_exausted}", count:"{sch.count}", 
+            last_run: "{sch.last_run}", next_run: "{sch.next_run}"
+            """
+        )
+        return update
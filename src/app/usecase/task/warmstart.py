@@ -0,0 +1,37 @@
+import logging
+from dataclasses import dataclass, field
+from logging import Logger
+
+from app.repository.fupgenrepo import AsyncFupGenRepository, FupGenRepository
+from app.usecase.task.runtask import RunTask, iterate
+from app.usecase.usecase import UseCase
+from infra.scheduler.interface import ITaskScheduler
+
+
+@dataclass
+class WarmStart(UseCase):
+    fupgenrepo: FupGenRepository | AsyncFupGenRepository
+    scheduler: ITaskScheduler
+    runtask: RunTask
+    chunk_size: int = 10_000
+
+    logger: Logger = field(default_factory=logging.getLogger)
+
+    async def execute(self) -> int:
+
+        loaded = 0
+        async for chunk in iterate(self.fupgenrepo.iter_next_runs(self.chunk_size)):
+            queued = await self.scheduler.next_run_many(
+                [ownerid for ownerid, _ in chunk]
+            )
+            tasks = [
+                (ownerid, next_run)
+                for ownerid, next_run in chunk
+                if queued[ownerid] is None
+            ]
+            await self.scheduler.schedule_many(coro=self.runtask.execute, tasks=tasks)
+            loaded += len(tasks)
+            self.logger.info(f"Warm start loaded {loaded} owners so far")
+
+        self.logger.info(f"Warm start finished: {loaded} owners scheduled")
+        return loaded
@@ -17,7 +17,10 @@ class FollowUp(BaseModel):
 def make_fup(
     fupgen: FollowupGenerator, ts: datetime
 ) -> list[FollowUp]:  # , makeid: Callable[[], str]):
-    dates = fupgen.scheduler.schedule(ts)
+    return to_fups(fupgen, fupgen.scheduler.schedule(ts))
+
+
+def to_fups(fupgen: FollowupGenerator, dates: list[datetime]) -> list[FollowUp]:
     return [
         FollowUp(
             # fupid=makeid(),
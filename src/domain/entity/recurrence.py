@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import Any, Callable, List, Optional, Protocol, Sequence
+from itertools import islice
+from typing import Any, Callable, Iterator, List, Optional, Protocol, Sequence
 
 from pydantic import BaseModel, Field, PrivateAttr, model_validator
 from typing_extensions import Literal
@@ -15,6 +16,10 @@ class Recurrence(Protocol):
         self, dtstart: datetime, until: datetime, inc: bool = False
     ) -> list[datetime]: ...
 
+    def iter_between(
+        self, dtstart: datetime, until: datetime, inc: bool = False
+    ) -> Iterator[datetime]: ...
+
 
 freqtype = Literal["DAILY", "WEEKLY", "MONTHLY", "YEARLY"]
 
@@ -57,6 +62,13 @@ class RecurrenceConfig(BaseModel):
 
 recurrenceFactory = Callable[[RecurrenceConfig], Recurrence]
 
+# many configs at once: for each, the dates `schedule(until)` would return
+# before past_events filtering, and the occurrence after the last of them
+batchSchedule = Callable[
+    [Sequence[RecurrenceConfig], datetime],
+    list[tuple[list[datetime], datetime | None]],
+]
+
 
 class SchedulerManager(BaseModel):
     _recur: Recurrence = PrivateAttr()
@@ -96,8 +108,9 @@ class SchedulerManager(BaseModel):
         return False
 
     def _update_next(self, dt: datetime) -> None:
+        self._set_next(self._recur.after(dt))
 
-        nr = self._recur.after(dt)
+    def _set_next(self, nr: datetime | None) -> None:
         if nr is not None and not self.is_exhausted(nr):
             if self.next_run is None or nr > self.next_run:
                 self.config.next_run = nr
@@ -108,16 +121,38 @@ class SchedulerManager(BaseModel):
 
         # last_run = self.config.last_run or self.config.dtstart
         dates = self._recur.between(self.last_run, until, inc=True)
-
+        return self.apply(dates, self._recur.after(dates[-1]) if dates else None)
+
+    def apply(self, dates: list[datetime], next_run: datetime | None) -> list[datetime]:
+        """
+        State step of `schedule`, for dates computed elsewhere (batchSchedule):
+        `dates` are the occurrences from last_run up to the tick and
+        `next_run` the occurrence after the last of them.
+        """
         if self.config.count is not None:
             self.config.count = max(0, self.config.count - len(dates))
 
         self.config.last_run = dates[-1] if dates else self.last_run
         if dates:
-            self._update_next(dates[-1])
+            self._set_next(next_run)
 
         return self._filtdates(dates)
 
+    def iter_schedule(
+        self, until: datetime, chunk_size: int, limit: int | None = None
+    ) -> Iterator[list[datetime]]:
+        """
+        `schedule(until)` for past_events="all", in chunks of at most
+        `chunk_size` dates generated lazily. The state is applied before each
+        chunk is yielded, so it can be persisted with it. Stops after `limit`
+        dates, leaving the rest for the next call (next_run stays in the past).
+        """
+        dates = self._recur.iter_between(self.last_run, until, inc=True)
+        if limit is not None:
+            dates = islice(dates, limit)
+        while chunk := list(islice(dates, chunk_size)):
+            yield self.apply(chunk, self._recur.after(chunk[-1]))
+
 
 def make_scheduler(
     make_recurrence: recurrenceFactory, config: RecurrenceConfig
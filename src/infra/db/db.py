@@ -1,7 +1,14 @@
-from sqlalchemy import create_engine
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 from sqlalchemy.orm.session import Session
 
+# bound parameters per IN (...) list, under SQLite's 999 variable limit
+IN_CHUNK = 900
+
 
 def make_session(
     url: str, base: type[DeclarativeBase], echo=False
@@ -13,6 +20,53 @@ def make_session(
     return sessionmaker(bind=engine)
 
 
+async def make_async_session(
+    url: str,
+    base: type[DeclarativeBase],
+    echo=False,
+    pool_size: int = 10,
+    max_overflow: int = 20,
+    pool_timeout: float = 30,
+) -> async_sessionmaker[AsyncSession]:
+    """
+    Session factory for an async driver URL (sqlite+aiosqlite://,
+    postgresql+asyncpg://). Each concurrent tick checks out its own pooled
+    connection; `pool_size` are kept open and up to `max_overflow` more are
+    opened under load.
+    """
+    parsed = make_url(url)
+    sqlite = parsed.get_backend_name() == "sqlite"
+    # an in-memory database is one shared connection (StaticPool)
+    pooled = not sqlite or parsed.database not in (None, "", ":memory:")
+
+    options: dict[str, Any] = {}
+    if pooled:
+        options.update(
+            pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout
+        )
+    if sqlite and pooled:
+        # writers wait for the file lock instead of failing right away
+        options["connect_args"] = {"timeout": pool_timeout}
+    elif pooled:
+        options.update(pool_pre_ping=True, pool_recycle=1800)
+    engine = create_async_engine(url, echo=echo, **options)
+
+    if sqlite and pooled:
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def wal(dbapi_connection, connection_record):
+            # readers do not wait for a tick that is writing
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.close()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(base.metadata.create_all)
+
+    # loaded objects stay readable after commit without another round trip
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
 def get_db(sessionLocal: sessionmaker[Session]):
 
     db = sessionLocal()
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from infra.db.models.base import Base
+
+
+class Occurrence(Base):
+    """The next few dates of a generator, precomputed for range queries."""
+
+    __tablename__ = "occurrence"
+
+    fupgen_id: Mapped[str] = mapped_column(
+        ForeignKey("fupgen.id", ondelete="CASCADE"), primary_key=True
+    )
+    date: Mapped[datetime] = mapped_column(primary_key=True, index=True)
+    # copied from fupgen so a horizon query needs no join
+    ownerid: Mapped[str]
+
+    def __str__(self) -> str:
+        return (
+            f"Occurrence(fupgen_id={self.fupgen_id}, date={self.date}, "
+            f"ownerid={self.ownerid})"
+        )
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from infra.db.models.base import Base, json_column
@@ -23,9 +23,14 @@ class Recurrence(Base):
     next_run: Mapped[Optional[datetime]] = mapped_column(nullable=True)
     is_exhausted: Mapped[bool] = mapped_column(default=False)
     past_events: Mapped[str] = mapped_column(default="lastonly")
+    lease_owner: Mapped[Optional[str]] = mapped_column(nullable=True)
+    lease_until: Mapped[Optional[datetime]] = mapped_column(nullable=True)
 
     fupgen: Mapped["FupGen"] = relationship(back_populates="recurrence", uselist=False)
 
+    # due generators in keyset order straight from the index (see get_due)
+    __table_args__ = (Index("ix_recurrence_due", "is_exhausted", "next_run", "id"),)
+
     def __str__(self) -> str:
         return (
             f"Recurrence(id={self.id}, freq={self.freq}, dtstart={self.dtstart}, "
@@ -33,5 +38,6 @@ class Recurrence(Base):
             f"byweekday={self.byweekday}, bymonthday={self.bymonthday}, "
             f"allow_infinite={self.allow_infinite}, last_run={self.last_run}, "
             f"next_run={self.next_run}, is_exhausted={self.is_exhausted}, "
-            f"past_events={self.past_events})"
+            f"past_events={self.past_events}, lease_owner={self.lease_owner}, "
+            f"lease_until={self.lease_until})"
         )
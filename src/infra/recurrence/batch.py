@@ -0,0 +1,150 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from domain.entity.recurrence import RecurrenceConfig
+from infra.recurrence.cursor import _has_gaps, cursor_factory
+
+Planned = Tuple[List[datetime], Optional[datetime]]
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+_DAY_US = 86_400_000_000
+_PERIOD = {"DAILY": 1, "WEEKLY": 7, "MONTHLY": 1, "YEARLY": 12}
+# stand-ins for "no count" / "no until" that never limit anything
+_NO_COUNT = np.iinfo(np.int64).max // 2
+_NO_UNTIL = datetime(9999, 1, 1)
+
+
+def _us(values: Sequence[datetime]) -> np.ndarray:
+    # microseconds since the epoch; several times faster than letting numpy
+    # convert the datetime objects itself
+    return np.fromiter(((v - _EPOCH) // _US for v in values), np.int64, len(values))
+
+
+def _months(us: np.ndarray) -> np.ndarray:
+    return us.astype("datetime64[us]").astype("datetime64[M]").astype(np.int64)
+
+
+def _month_start(months: np.ndarray) -> np.ndarray:
+    return months.astype("datetime64[M]").astype("datetime64[us]").astype(np.int64)
+
+
+class _Shape:
+    """
+    One rule shape, evaluated for many rows at once: occurrence k of a row is
+    dtstart + k * interval days (DAILY, WEEKLY) or months (MONTHLY, YEARLY).
+    """
+
+    def __init__(self, freq: str, configs: List[RecurrenceConfig]):
+        step = np.array([c.interval * _PERIOD[freq] for c in configs], np.int64)
+        dtstart = _us([c.dtstart.replace(microsecond=0) for c in configs])
+        if freq in ("DAILY", "WEEKLY"):
+            self.step_us: Optional[np.ndarray] = step * _DAY_US
+        else:
+            self.step_us = None
+            self.step_months = step
+            self.first_month = _months(dtstart)
+            # day and time inside the month, the same every occurrence
+            self.offset = dtstart - _month_start(self.first_month)
+        self.dtstart = dtstart
+
+    def nth(self, k: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        sl = slice(None) if rows is None else rows
+        if self.step_us is not None:
+            return self.dtstart[sl] + k * self.step_us[sl]
+        months = self.first_month[sl] + k * self.step_months[sl]
+        return _month_start(months) + self.offset[sl]
+
+    def last_at_or_before(self, t: np.ndarray) -> np.ndarray:
+        if self.step_us is not None:
+            return (t - self.dtstart) // self.step_us
+        k = (_months(t) - self.first_month) // self.step_months
+        return k - (self.nth(k) > t)
+
+    def first_at_or_after(self, t: np.ndarray) -> np.ndarray:
+        if self.step_us is not None:
+            return -((self.dtstart - t) // self.step_us)
+        k = (_months(t) - self.first_month) // self.step_months
+        return k + (self.nth(k) < t)
+
+
+def _plan_shape(
+    freq: str, configs: List[RecurrenceConfig], until: datetime
+) -> List[Planned]:
+    shape = _Shape(freq, configs)
+    last_run = _us([c.last_run or c.dtstart for c in configs])
+    count = np.array(
+        [_NO_COUNT if c.count is None else c.count for c in configs], np.int64
+    )
+    rule_until = _us([c.until or _NO_UNTIL for c in configs])
+
+    tick = np.full_like(last_run, _us([until])[0])
+
+    first = np.maximum(shape.first_at_or_after(last_run), 0)
+    last = np.minimum(shape.last_at_or_before(tick), count - 1)
+    last = np.minimum(last, shape.last_at_or_before(rule_until))
+    n = np.maximum(last - first + 1, 0)
+
+    # every date of every row in one vector, rows back to back
+    row = np.repeat(np.arange(len(configs)), n)
+    starts = np.cumsum(n) - n
+    k = np.repeat(first, n) + np.arange(int(n.sum())) - np.repeat(starts, n)
+    dates = shape.nth(k, row).astype("datetime64[us]").tolist()
+
+    after = last + 1
+    next_run = shape.nth(after)
+    has_next = (n > 0) & (after < count) & (next_run <= rule_until)
+    next_list = next_run.astype("datetime64[us]").tolist()
+
+    return [
+        (dates[s : s + m], next_list[i] if has_next[i] else None)
+        for i, (s, m) in enumerate(zip(starts.tolist(), n.tolist()))
+    ]
+
+
+def _vectorizable(config: RecurrenceConfig) -> bool:
+    return (
+        config.byweekday is None
+        and config.bymonthday is None
+        and not _has_gaps(config)
+        # numpy datetime64 has no time zones
+        and config.dtstart.tzinfo is None
+    )
+
+
+def _plan_one(config: RecurrenceConfig, until: datetime) -> Planned:
+    recur = cursor_factory(config)
+    dates = recur.between(config.last_run or config.dtstart, until, inc=True)
+    return dates, recur.after(dates[-1]) if dates else None
+
+
+def batch_schedule(
+    configs: Sequence[RecurrenceConfig], until: datetime
+) -> List[Planned]:
+    """
+    A batchSchedule: for each config, the dates from its last_run up to `until`
+    (inclusive) and the occurrence after the last of them, as
+    SchedulerManager.schedule computes them. Configs are not modified.
+
+    Rules without by-rules are grouped by frequency and computed with int64
+    microsecond arithmetic over all rows at once. By-rules, the MONTHLY and
+    YEARLY rules rrule skips periods for, and tz-aware configs go through
+    cursor_factory one at a time.
+    """
+    results: List[Optional[Planned]] = [None] * len(configs)
+    groups: Dict[str, List[int]] = defaultdict(list)
+    for i, config in enumerate(configs):
+        if _vectorizable(config):
+            groups[config.freq].append(i)
+        else:
+            results[i] = _plan_one(config, until)
+
+    for freq, rows in groups.items():
+        planned = _plan_shape(freq, [configs[i] for i in rows], until)
+        for i, plan in zip(rows, planned):
+            results[i] = plan
+
+    return results  # type: ignore
@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+from dateutil.relativedelta import relativedelta
+
+from domain.entity.recurrence import Recurrence, RecurrenceConfig
+from infra.recurrence.rruleadaptor import RRuleRecurrence, _compile, rrule_factory
+
+_DAYS = {"DAILY": 1, "WEEKLY": 7}
+_MONTHS = {"MONTHLY": 1, "YEARLY": 12}
+
+
+class ClosedFormRecurrence(Recurrence):
+    """
+    A rule without by-rules: occurrence k is dtstart + k * interval periods.
+
+    The occurrence at or after a date is found with arithmetic, so `after`
+    costs the same however old the rule is, and `between` only walks the
+    dates it returns. Only built for rules where every period has an
+    occurrence (see `cursor_factory`).
+    """
+
+    def __init__(self, config: RecurrenceConfig):
+        # rrule drops the microseconds of dtstart too
+        self.dtstart = config.dtstart.replace(microsecond=0)
+        self.count = config.count
+        self.until = config.until
+        if config.freq in _DAYS:
+            self._days = _DAYS[config.freq] * config.interval
+            self._months = 0
+        else:
+            self._days = 0
+            self._months = _MONTHS[config.freq] * config.interval
+
+    def _nth(self, k: int) -> datetime:
+        if self._days:
+            return self.dtstart + timedelta(days=k * self._days)
+        return self.dtstart + relativedelta(months=k * self._months)
+
+    def _index(self, dt: datetime, inclusive: bool) -> int:
+        """Index of the first occurrence after (or at) dt."""
+        if dt < self.dtstart:
+            return 0
+        if self._days:
+            k = (dt - self.dtstart).days // self._days
+        else:
+            months = (dt.year - self.dtstart.year) * 12 + dt.month - self.dtstart.month
+            k = max(months // self._months - 1, 0)
+        # the estimate is never past the answer and at most two steps short
+        while self._nth(k) < dt or (self._nth(k) == dt and not inclusive):
+            k += 1
+        return k
+
+    def _valid(self, k: int, occurrence: datetime) -> bool:
+        if self.count is not None and k >= self.count:
+            return False
+        return self.until is None or occurrence <= self.until
+
+    def _iter(self, k: int) -> Iterator[datetime]:
+        while True:
+            occurrence = self._nth(k)
+            if not self._valid(k, occurrence):
+                return
+            yield occurrence
+            k += 1
+
+    def after(self, dt: datetime, inclusive: bool = False) -> datetime | None:
+        return next(self._iter(self._index(dt, inclusive)), None)
+
+    def between(
+        self, dtstart: datetime, until: datetime, inc: bool = False
+    ) -> list[datetime]:
+        return list(self.iter_between(dtstart, until, inc))
+
+    def iter_between(
+        self, dtstart: datetime, until: datetime, inc: bool = False
+    ) -> Iterator[datetime]:
+        for occurrence in self._iter(self._index(dtstart, inc)):
+            if occurrence > until or (occurrence == until and not inc):
+                return
+            yield occurrence
+
+
+class RebasedRecurrence(Recurrence):
+    """
+    A by-rule recurrence evaluated from a cursor instead of from dtstart.
+
+    The cursor is an occurrence the rule already produced (last_run), so a
+    rule restarted there yields the same dates from the cursor on. Queries
+    before the cursor go to the rule anchored at dtstart.
+    """
+
+    def __init__(self, rebased: Recurrence, cursor: datetime, config: RecurrenceConfig):
+        self._rebased = rebased
+        self._cursor = cursor
+        self._config = config
+
+    def _full(self, dt: datetime) -> Optional[Recurrence]:
+        return rrule_factory(self._config) if dt < self._cursor else None
+
+    def after(self, dt: datetime, inclusive: bool = False) -> datetime | None:
+        return (self._full(dt) or self._rebased).after(dt, inclusive)
+
+    def between(
+        self, dtstart: datetime, until: datetime, inc: bool = False
+    ) -> list[datetime]:
+        return (self._full(dtstart) or self._rebased).between(dtstart, until, inc)
+
+    def iter_between(
+        self, dtstart: datetime, until: datetime, inc: bool = False
+    ) -> Iterator[datetime]:
+        recur = self._full(dtstart) or self._rebased
+        return recur.iter_between(dtstart, until, inc)
+
+
+def _has_gaps(config: RecurrenceConfig) -> bool:
+    # rrule skips the months (years) without dtstart's day, which breaks
+    # "occurrence k is k periods after dtstart"
+    if config.freq == "MONTHLY":
+        return config.dtstart.day > 28
+    if config.freq == "YEARLY":
+        return (config.dtstart.month, config.dtstart.day) == (2, 29)
+    return False
+
+
+def cursor_factory(config: RecurrenceConfig) -> Recurrence:
+    """
+    Recurrence factory whose evaluation cost does not grow with the rule's age.
+
+    Rules without by-rules get the closed form. The rest are rebased on
+    `config.last_run` when that is safe, and otherwise evaluated by rrule
+    from dtstart: a counted rule never walks more than `count` dates anyway.
+    """
+    simple = config.byweekday is None and config.bymonthday is None
+    if simple and not _has_gaps(config):
+        return ClosedFormRecurrence(config)
+
+    cursor = config.last_run
+    if (
+        cursor is None
+        or cursor <= config.dtstart
+        or cursor.time() != config.dtstart.replace(microsecond=0).time()
+        or config.count is not None
+    ):
+        return rrule_factory(config)
+
+    rebased = _compile(
+        config.freq,
+        cursor,
+        config.interval,
+        config.until,
+        tuple(config.byweekday) if config.byweekday else None,
+        tuple(config.bymonthday) if config.bymonthday else None,
+    )
+    if rebased.after(cursor, inc=True) != cursor.replace(microsecond=0):
+        # not an occurrence of the rule: restarting there would shift it
+        return rrule_factory(config)
+    return RebasedRecurrence(RRuleRecurrence(_rule=rebased), cursor, config)
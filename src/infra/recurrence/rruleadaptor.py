@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Sequence
+from functools import lru_cache
+from itertools import islice
+from typing import Iterator, NamedTuple, Optional, Sequence, Tuple
 
 from dateutil.rrule import (
     DAILY,
@@ -19,44 +21,114 @@ from dateutil.rrule import (
 
 from domain.entity.recurrence import Recurrence, RecurrenceConfig
 
+FREQ_MAP = {
+    "DAILY": DAILY,
+    "WEEKLY": WEEKLY,
+    "MONTHLY": MONTHLY,
+    "YEARLY": YEARLY,
+}
+WEEKDAYS = {"MO": MO, "TU": TU, "WE": WE, "TH": TH, "FR": FR, "SA": SA, "SU": SU}
+
+RRULE_CACHE_SIZE = 1024
+
+_UNSET = object()
+
 
 @dataclass
 class RRuleRecurrence(Recurrence):
     _rule: rrule
+    # the rule is shared through the cache, so the config's count is applied
+    # here: only the first `_count` occurrences from dtstart exist
+    _count: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self._last: object = _UNSET
+
+    def _within(self, dt: datetime) -> bool:
+        if self._count is None:
+            return True
+        if self._count <= 0:
+            return False
+        if self._last is _UNSET:
+            # None when the rule ends (until) before reaching count
+            self._last = next(islice(self._rule, self._count - 1, None), None)
+        return self._last is None or dt <= self._last  # type: ignore
 
     def take(self, n: int) -> Sequence[datetime]:
+        if self._count is not None:
+            n = min(n, self._count)
         return [dt for _, dt in zip(range(n), self._rule)]
 
     def after(self, dt: datetime, inclusive: bool = False) -> datetime | None:
-        return self._rule.after(dt, inc=inclusive)  # type: ignore
+        next_dt = self._rule.after(dt, inc=inclusive)
+        return next_dt if next_dt is not None and self._within(next_dt) else None
 
     def between(
         self, dtstart: datetime, until: datetime, inc: bool = False
     ) -> list[datetime]:
-        return list(self._rule.between(dtstart, until, inc=inc))  # type: ignore
+        dates = self._rule.between(dtstart, until, inc=inc)
+        return [dt for dt in dates if self._within(dt)]
 
+    def iter_between(
+        self, dtstart: datetime, until: datetime, inc: bool = False
+    ) -> Iterator[datetime]:
+        for dt in self._rule.xafter(dtstart, inc=inc):
+            if dt > until or (dt == until and not inc) or not self._within(dt):
+                return
+            yield dt
 
-def rrule_factory(config: RecurrenceConfig) -> Recurrence:
-    freq_map = {
-        "DAILY": DAILY,
-        "WEEKLY": WEEKLY,
-        "MONTHLY": MONTHLY,
-        "YEARLY": YEARLY,
-    }
-    WEEKDAYS = {"MO": MO, "TU": TU, "WE": WE, "TH": TH, "FR": FR, "SA": SA, "SU": SU}
-
-    rule = rrule(
-        freq=freq_map[config.freq],
-        dtstart=config.dtstart,
-        interval=config.interval,
-        count=config.count,
-        until=config.until,
-        byweekday=(
-            [WEEKDAYS[d] for d in config.byweekday] if config.byweekday else None
-        ),
-        bymonthday=config.bymonthday,
+
+@lru_cache(maxsize=RRULE_CACHE_SIZE)
+def _compile(
+    freq: str,
+    dtstart: datetime,
+    interval: int,
+    until: Optional[datetime],
+    byweekday: Optional[Tuple[str, ...]],
+    bymonthday: Optional[Tuple[int, ...]],
+) -> rrule:
+    return rrule(
+        freq=FREQ_MAP[freq],
+        dtstart=dtstart,
+        interval=interval,
+        until=until,
+        byweekday=[WEEKDAYS[d] for d in byweekday] if byweekday else None,
+        bymonthday=bymonthday,
+    )
+
+
+def rule_key(config: RecurrenceConfig) -> tuple:
+    """The fields that define the rule, hashable: equal keys, equal rrules."""
+    return (
+        config.freq,
+        config.dtstart,
+        config.interval,
+        config.until,
+        tuple(config.byweekday) if config.byweekday else None,
+        tuple(config.bymonthday) if config.bymonthday else None,
     )
-    return RRuleRecurrence(_rule=rule)
+
+
+def rrule_factory(config: RecurrenceConfig) -> Recurrence:
+    # count is left out of the key: SchedulerManager decrements it as the
+    # dates are consumed, so it would make every tick a miss
+    return RRuleRecurrence(_rule=_compile(*rule_key(config)), _count=config.count)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+def rrule_cache_info() -> CacheInfo:
+    """Hits, misses, maxsize and current size of the compiled rule cache."""
+    return CacheInfo(*_compile.cache_info())
+
+
+def rrule_cache_clear() -> None:
+    _compile.cache_clear()
 
 
 if __name__ == "__main__":
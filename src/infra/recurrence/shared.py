@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from domain.entity.recurrence import RecurrenceConfig, batchSchedule
+from infra.recurrence.batch import batch_schedule
+from infra.recurrence.rruleadaptor import rule_key
+
+Planned = Tuple[List[datetime], Optional[datetime]]
+
+
+class SharedSchedule:
+    """
+    A batchSchedule that evaluates generators sharing a rule, a cursor
+    (last_run) and a remaining count once, and hands every one of them the
+    same dates: a tick costs one evaluation per distinct rule state instead of
+    one per generator. `inner` computes the distinct ones.
+
+    The fan-out copies the date lists, so a generator can never see another's
+    results change under it.
+    """
+
+    def __init__(self, inner: batchSchedule = batch_schedule):
+        self.inner = inner
+        self.evaluated = 0
+        self.shared = 0
+
+    def __call__(
+        self, configs: Sequence[RecurrenceConfig], until: datetime
+    ) -> List[Planned]:
+        index: Dict[tuple, int] = {}
+        distinct: List[RecurrenceConfig] = []
+        slots: List[int] = []
+        for config in configs:
+            key = (rule_key(config), config.last_run or config.dtstart, config.count)
+            slot = index.get(key)
+            if slot is None:
+                slot = index[key] = len(distinct)
+                distinct.append(config)
+            slots.append(slot)
+
+        planned = self.inner(distinct, until)
+        self.evaluated += len(distinct)
+        self.shared += len(configs) - len(distinct)
+        return [(list(planned[slot][0]), planned[slot][1]) for slot in slots]
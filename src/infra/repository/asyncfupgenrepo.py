@@ -0,0 +1,208 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Callable
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.repository.fupgenrepo import (
+    AsyncFupGenRepository as IAsyncFupGenRepository,
+)
+from domain.entity.fupgen import FollowupGenerator, FupGenInput
+from domain.entity.recurrence import RecurrenceConfig, recurrenceFactory
+from infra.db.db import IN_CHUNK, Session
+from infra.db.models.fupgen import FupGen
+from infra.db.models.recurrenceconfig import Recurrence
+from infra.repository.fupgenrepo import (
+    EAGER,
+    UPDATE_CURSOR,
+    FupGenRepository,
+    cursor_params,
+    to_config,
+    to_domain,
+)
+from infra.repository.occurrencerepo import OccurrenceRepository
+
+
+@dataclass
+class AsyncFupGenRepository(IAsyncFupGenRepository):
+    """
+    FupGenRepository on an async driver, so a tick awaits the database instead
+    of blocking the event loop. Every call opens its own session from
+    `sessions` (see make_async_session): an AsyncSession must not be shared by
+    concurrent ticks, and each one gets a pooled connection.
+
+    create and create_many run FupGenRepository on the session through
+    run_sync, so they validate and write exactly as it does.
+    """
+
+    sessions: async_sessionmaker[AsyncSession]
+    make_recurrence: recurrenceFactory
+    make_id: Callable[[], str]
+    # keep the occurrence table this many dates deep, as FupGenRepository does
+    occurrence_depth: int | None = None
+
+    def _sync(self, db: Session) -> FupGenRepository:
+        return FupGenRepository(
+            db=db,
+            make_recurrence=self.make_recurrence,
+            make_id=self.make_id,
+            occurrences=self._occurrences(db),
+        )
+
+    def _occurrences(self, db: Session) -> OccurrenceRepository | None:
+        if self.occurrence_depth is None:
+            return None
+        return OccurrenceRepository(
+            db=db, make_recurrence=self.make_recurrence, depth=self.occurrence_depth
+        )
+
+    def _refill(self, db: Session, fupgen_ids: list[str]) -> None:
+        occurrences = self._occurrences(db)
+        if occurrences is not None:
+            occurrences.refill(fupgen_ids)
+
+    async def create(self, input: FupGenInput) -> datetime | None:
+        async with self.sessions() as db:
+            return await db.run_sync(lambda sync: self._sync(sync).create(input))
+
+    async def create_many(self, inputs: list[FupGenInput]) -> dict[str, datetime]:
+        async with self.sessions() as db:
+            return await db.run_sync(lambda sync: self._sync(sync).create_many(inputs))
+
+    async def get_fupgen_id_by_owner_name(self, ownerid: str, name: str) -> str:
+        async with self.sessions() as db:
+            result = await db.execute(
+                select(FupGen.id)
+                .where(FupGen.ownerid == ownerid)
+                .where(FupGen.name == name)
+            )
+            return result.scalar_one()
+
+    async def get_fupgen(
+        self, ownerid: str, active_only: bool
+    ) -> list[FollowupGenerator]:
+        return await self.get_fupgen_many([ownerid], active_only)
+
+    async def get_fupgen_many(
+        self, ownerids: list[str], active_only: bool
+    ) -> list[FollowupGenerator]:
+
+        found: list[FollowupGenerator] = []
+        async with self.sessions() as db:
+            for i in range(0, len(ownerids), IN_CHUNK):
+                stmt = (
+                    select(FupGen)
+                    .join(Recurrence)
+                    .options(*EAGER)
+                    .where(FupGen.ownerid.in_(ownerids[i : i + IN_CHUNK]))
+                )
+                if active_only:
+                    stmt = stmt.where(Recurrence.is_exhausted == False)
+                fupgens = (await db.execute(stmt)).unique().scalars()
+                found.extend(to_domain(self.make_recurrence, f) for f in fupgens)
+        return found
+
+    async def get_recurrences(
+        self, ownerids: list[str]
+    ) -> list[tuple[str, str, str, str, RecurrenceConfig]]:
+        found: list[tuple[str, str, str, str, RecurrenceConfig]] = []
+        async with self.sessions() as db:
+            for i in range(0, len(ownerids), IN_CHUNK):
+                rows = await db.execute(
+                    select(FupGen.id, FupGen.ownerid, FupGen.message_id, FupGen.data_id)
+                    .add_columns(Recurrence)
+                    .join(Recurrence, Recurrence.id == FupGen.id)
+                    .where(FupGen.ownerid.in_(ownerids[i : i + IN_CHUNK]))
+                    .where(Recurrence.is_exhausted == False)
+                )
+                found.extend(
+                    (id, ownerid, msgid, dataid, to_config(rec))
+                    for id, ownerid, msgid, dataid, rec in rows
+                )
+        return found
+
+    async def iter_next_runs(
+        self, chunk_size: int = 10_000, before: datetime | None = None
+    ) -> AsyncIterator[list[tuple[str, datetime]]]:
+        stmt = (
+            select(FupGen.ownerid, func.min(Recurrence.next_run))
+            .join(Recurrence, Recurrence.id == FupGen.id)
+            .where(Recurrence.is_exhausted == False)
+            .where(Recurrence.next_run.is_not(None))
+            .group_by(FupGen.ownerid)
+            .execution_options(yield_per=chunk_size)
+        )
+        if before is not None:
+            stmt = stmt.where(Recurrence.next_run < before)
+        async with self.sessions() as db:
+            result = await db.stream(stmt)
+            async for rows in result.partitions():
+                yield [(ownerid, next_run) for ownerid, next_run in rows]
+
+    async def get_next_runs(self, ownerids: list[str]) -> dict[str, datetime]:
+        found: dict[str, datetime] = {}
+        async with self.sessions() as db:
+            for i in range(0, len(ownerids), IN_CHUNK):
+                rows = await db.execute(
+                    select(FupGen.ownerid, func.min(Recurrence.next_run))
+                    .join(Recurrence, Recurrence.id == FupGen.id)
+                    .where(FupGen.ownerid.in_(ownerids[i : i + IN_CHUNK]))
+                    .where(Recurrence.is_exhausted == False)
+                    .where(Recurrence.next_run.is_not(None))
+                    .group_by(FupGen.ownerid)
+                )
+                found.update((ownerid, next_run) for ownerid, next_run in rows)
+        return found
+
+    async def get_due(
+        self,
+        before: datetime,
+        limit: int = 10_000,
+        after_cursor: tuple[datetime, str] | None = None,
+    ) -> list[tuple[str, str, datetime]]:
+        stmt = (
+            select(Recurrence.id, FupGen.ownerid, Recurrence.next_run)
+            .join(FupGen, FupGen.id == Recurrence.id)
+            .where(Recurrence.is_exhausted == False)
+            .where(Recurrence.next_run < before)
+            .order_by(Recurrence.next_run, Recurrence.id)
+            .limit(limit)
+        )
+        if after_cursor is not None:
+            stmt = stmt.where(
+                tuple_(Recurrence.next_run, Recurrence.id) > tuple_(*after_cursor)
+            )
+        async with self.sessions() as db:
+            return [tuple(row) for row in await db.execute(stmt)]  # type: ignore
+
+    async def update_config(
+        self,
+        updates: list[tuple[str, bool, int | None, datetime | None, datetime | None]],
+    ) -> None:
+        async with self.sessions() as db:
+            if updates:
+                await db.execute(UPDATE_CURSOR, cursor_params(updates))
+            if self.occurrence_depth is not None:
+                await db.run_sync(self._refill, [update[0] for update in updates])
+            await db.commit()
+
+    async def arm(self, ownerids: list[str]) -> None:
+        async with self.sessions() as db:
+            await db.run_sync(lambda sync: self._sync(sync).arm(ownerids))
+
+    async def disarm(self, ownerids: list[str]) -> None:
+        async with self.sessions() as db:
+            await db.run_sync(lambda sync: self._sync(sync).disarm(ownerids))
+
+    async def reschedule(self, ownerid: str, run_at: datetime) -> bool:
+        async with self.sessions() as db:
+            return await db.run_sync(
+                lambda sync: self._sync(sync).reschedule(ownerid, run_at)
+            )
+
+    async def update_exhaust_rule(
+        self, fupgen_id: str, add_count: int | None, until: datetime | None
+    ) -> None: ...
+
+    async def delete_fupgen(self, fupgen_id: str) -> None: ...
@@ -1,10 +1,12 @@
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Callable, List, cast
+from typing import Any, Callable, Iterator, List, cast
 
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy import and_, bindparam, func, insert, select, tuple_, update
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 
 from app.repository.fupgenrepo import FupGenRepository as IFupGenRepository
+from app.repository.occurrencerepo import OccurrenceRepository
 from domain.entity.channel import Channel as DomainChannel
 from domain.entity.fupgen import FollowupGenerator, FupGenInput
 from domain.entity.recurrence import (
@@ -16,21 +18,61 @@ from domain.entity.recurrence import (
     recurrenceFactory,
     weekdaytype,
 )
-from infra.db.db import Session
+from infra.db.db import IN_CHUNK, Session
 from infra.db.models.channel import ChannelDB
 from infra.db.models.data import Data
 from infra.db.models.fupgen import FupGen
 from infra.db.models.msg import Message
 from infra.db.models.recurrenceconfig import Recurrence
 
+INSERT_CHUNK = 5_000
 
-def to_domain(make_recurrence: recurrenceFactory, fup: FupGen) -> FollowupGenerator:
-    rec = fup.recurrence
+# everything to_domain touches, loaded with the query instead of one lazy load
+# per generator and relationship: recurrence comes from the join already,
+# message and data are one-to-one joins, channels one extra SELECT ... IN
+EAGER = (
+    contains_eager(FupGen.recurrence),
+    joinedload(FupGen.message),
+    joinedload(FupGen.data),
+    selectinload(FupGen.channels),
+)
+
+
+# update_config as one executemany; the id is bound as b_id so it does not
+# collide with the SET columns
+UPDATE_CURSOR = update(Recurrence.__table__).where(
+    Recurrence.__table__.c.id == bindparam("b_id")
+)
+
+
+def owner_rows(ownerids: list[str]):
+    """The recurrence rows of the owners' active generators."""
+    return and_(
+        Recurrence.is_exhausted == False,
+        Recurrence.id.in_(select(FupGen.id).where(FupGen.ownerid.in_(ownerids))),
+    )
 
+
+def cursor_params(
+    updates: list[tuple[str, bool, int | None, datetime | None, datetime | None]],
+) -> list[dict[str, Any]]:
+    return [
+        {
+            "b_id": fupgen_id,
+            "is_exhausted": is_exhausted,
+            "count": count,
+            "last_run": last_run,
+            "next_run": next_run,
+        }
+        for fupgen_id, is_exhausted, count, last_run, next_run in updates
+    ]
+
+
+def to_config(rec: Recurrence) -> RecurrenceConfig:
     freq = cast(freqtype, rec.freq)
     byweekday = cast(list[weekdaytype], rec.byweekday) if rec.byweekday else None
     past_events = cast(pasteventtype, rec.past_events)
-    config = RecurrenceConfig(
+    return RecurrenceConfig(
         freq=freq,
         dtstart=rec.dtstart,
         interval=rec.interval,
@@ -43,7 +85,10 @@ def to_domain(make_recurrence: recurrenceFactory, fup: FupGen) -> FollowupGenera
         next_run=rec.next_run,
         past_events=past_events,
     )
-    scheduler = make_scheduler(make_recurrence, config)
+
+
+def to_domain(make_recurrence: recurrenceFactory, fup: FupGen) -> FollowupGenerator:
+    scheduler = make_scheduler(make_recurrence, to_config(fup.recurrence))
 
     channels = [
         DomainChannel(id=c.id, type=c.type, configdata=c.configdata)
@@ -62,16 +107,16 @@ def to_domain(make_recurrence: recurrenceFactory, fup: FupGen) -> FollowupGenera
     )
 
 
-def to_db(
+def to_rows(
     make_id: Callable[[], str],
     sch: SchedulerManager,
     input: FupGenInput,
-):
-
-    now = datetime.now()
+    now: datetime,
+) -> dict[str, Any]:
+    """The column values of one generator, per table."""
     id = make_id()
     conf = sch.config
-    rec = Recurrence(
+    rec = dict(
         id=id,
         freq=conf.freq,
         dtstart=conf.dtstart,
@@ -86,28 +131,35 @@ def to_db(
         is_exhausted=sch.is_exhausted(now),
         past_events=conf.past_events,
     )
-    msgid = make_id()
-    msg = Message(id=msgid, msg=input.msg)
-
-    dataid = make_id()
-    data = Data(id=dataid, data=input.data)
-
-    chs: list[ChannelDB] = []
-    for ch in input.channel:
-        cid = make_id()
-        ch_db = ChannelDB(id=cid, fupgen_id=id, type=ch.type, configdata=ch.configdata)
-        chs.append(ch_db)
-
-    fupgen = FupGen(
+    msg = dict(id=make_id(), msg=input.msg)
+    data = dict(id=make_id(), data=input.data)
+    chs = [
+        dict(id=make_id(), fupgen_id=id, type=ch.type, configdata=ch.configdata)
+        for ch in input.channel
+    ]
+    fupgen = dict(
         id=id,
         hookid=input.hookid,
         ownerid=input.ownerid,
         name=input.name,
         description=input.description,
-        recurrence=rec,
-        message_id=msg.id,
-        data_id=data.id,
+        message_id=msg["id"],
+        data_id=data["id"],
     )
+    return {"msg": msg, "data": data, "chs": chs, "rec": rec, "fupgen": fupgen}
+
+
+def to_db(
+    make_id: Callable[[], str],
+    sch: SchedulerManager,
+    input: FupGenInput,
+):
+    rows = to_rows(make_id, sch, input, datetime.now())
+    rec = Recurrence(**rows["rec"])
+    msg = Message(**rows["msg"])
+    data = Data(**rows["data"])
+    chs = [ChannelDB(**ch) for ch in rows["chs"]]
+    fupgen = FupGen(**rows["fupgen"], recurrence=rec)
     return msg, data, chs, rec, fupgen
 
 
@@ -117,6 +169,8 @@ class FupGenRepository(IFupGenRepository):
     db: Session
     make_recurrence: recurrenceFactory
     make_id: Callable[[], str]
+    # materialized upcoming dates, kept in step with the cursors (same session)
+    occurrences: OccurrenceRepository | None = None
 
     def create(self, input: FupGenInput) -> datetime | None:
 
@@ -125,10 +179,83 @@ class FupGenRepository(IFupGenRepository):
         msg, data, chs, rec, fupgen = to_db(self.make_id, sch, input)
         self.db.add_all([msg, data, *chs, rec, fupgen])
 
+        if self.occurrences is not None:
+            self.occurrences.refill([fupgen.id])
         self.db.commit()
 
         return sch.config.next_run
 
+    def create_many(self, inputs: list[FupGenInput]) -> dict[str, datetime]:
+        """
+        Creates every generator in one transaction, or none of them. Returns
+        the earliest next_run of the new generators per owner, for one
+        schedule_many.
+        """
+        self._check_names(inputs)
+
+        now = datetime.now()
+        tables: dict[str, list[dict[str, Any]]] = {
+            "msg": [],
+            "data": [],
+            "fupgen": [],
+            "rec": [],
+            "chs": [],
+        }
+        next_runs: dict[str, datetime] = {}
+        for input in inputs:
+            sch = make_scheduler(self.make_recurrence, input.recurconfig)
+            rows = to_rows(self.make_id, sch, input, now)
+            for table, value in rows.items():
+                if table == "chs":
+                    tables[table].extend(value)
+                else:
+                    tables[table].append(value)
+
+            next_run = rows["rec"]["next_run"]
+            if next_run is not None and not rows["rec"]["is_exhausted"]:
+                known = next_runs.get(input.ownerid)
+                if known is None or next_run < known:
+                    next_runs[input.ownerid] = next_run
+
+        # Core inserts in foreign key order: the ORM unit of work costs more
+        # than the rows do
+        for table, model in (
+            ("msg", Message),
+            ("data", Data),
+            ("fupgen", FupGen),
+            ("rec", Recurrence),
+            ("chs", ChannelDB),
+        ):
+            values = tables[table]
+            for i in range(0, len(values), INSERT_CHUNK):
+                self.db.execute(insert(model.__table__), values[i : i + INSERT_CHUNK])
+
+        if self.occurrences is not None:
+            self.occurrences.refill([fupgen["id"] for fupgen in tables["fupgen"]])
+        self.db.commit()
+
+        return next_runs
+
+    def _check_names(self, inputs: list[FupGenInput]) -> None:
+        # uq_owner_name, checked before anything is written
+        names = [(input.ownerid, input.name) for input in inputs]
+        seen: set[tuple[str, str]] = set()
+        for name in names:
+            if name in seen:
+                raise ValueError(f"Duplicate generator {name} in batch")
+            seen.add(name)
+
+        ownerids = list({ownerid for ownerid, _ in names})
+        for i in range(0, len(ownerids), IN_CHUNK):
+            rows = self.db.execute(
+                select(FupGen.ownerid, FupGen.name).where(
+                    FupGen.ownerid.in_(ownerids[i : i + IN_CHUNK])
+                )
+            )
+            clash = next((tuple(row) for row in rows if tuple(row) in seen), None)
+            if clash is not None:
+                raise ValueError(f"Generator {clash} already exists")
+
     def get_fupgen_id_by_owner_name(self, ownerid: str, name: str) -> str:
         query = (
             self.db.query(FupGen.id)
@@ -140,7 +267,12 @@ class FupGenRepository(IFupGenRepository):
 
     def get_fupgen(self, ownerid: str, active_only: bool) -> list[FollowupGenerator]:
 
-        query = self.db.query(FupGen).join(Recurrence).filter(FupGen.ownerid == ownerid)
+        query = (
+            self.db.query(FupGen)
+            .join(Recurrence)
+            .options(*EAGER)
+            .filter(FupGen.ownerid == ownerid)
+        )
 
         if active_only:
             query = query.filter(Recurrence.is_exhausted == False)
@@ -149,25 +281,175 @@ class FupGenRepository(IFupGenRepository):
 
         return [to_domain(self.make_recurrence, fupgen) for fupgen in fupgens]
 
+    def get_fupgen_many(
+        self, ownerids: list[str], active_only: bool
+    ) -> list[FollowupGenerator]:
+
+        fupgens: List[FupGen] = []
+        # keep the IN list under the bind parameter limit of older SQLite builds
+        for i in range(0, len(ownerids), IN_CHUNK):
+            query = (
+                self.db.query(FupGen)
+                .join(Recurrence)
+                .options(*EAGER)
+                .filter(FupGen.ownerid.in_(ownerids[i : i + IN_CHUNK]))
+            )
+            if active_only:
+                query = query.filter(Recurrence.is_exhausted == False)
+            fupgens.extend(query.all())
+
+        return [to_domain(self.make_recurrence, fupgen) for fupgen in fupgens]
+
+    def get_recurrences(
+        self, ownerids: list[str]
+    ) -> list[tuple[str, str, str, str, RecurrenceConfig]]:
+        # (id, ownerid, msgid, dataid, config) of the active generators, without
+        # loading channels, messages or data
+        found: list[tuple[str, str, str, str, RecurrenceConfig]] = []
+        for i in range(0, len(ownerids), IN_CHUNK):
+            rows = self.db.execute(
+                select(FupGen.id, FupGen.ownerid, FupGen.message_id, FupGen.data_id)
+                .add_columns(Recurrence)
+                .join(Recurrence, Recurrence.id == FupGen.id)
+                .where(FupGen.ownerid.in_(ownerids[i : i + IN_CHUNK]))
+                .where(Recurrence.is_exhausted == False)
+            )
+            found.extend(
+                (id, ownerid, msgid, dataid, to_config(rec))
+                for id, ownerid, msgid, dataid, rec in rows
+            )
+        return found
+
+    def iter_next_runs(
+        self, chunk_size: int = 10_000, before: datetime | None = None
+    ) -> Iterator[list[tuple[str, datetime]]]:
+        # one streamed GROUP BY for all owners, min(next_run) of active generators
+        stmt = (
+            select(FupGen.ownerid, func.min(Recurrence.next_run))
+            .join(Recurrence, Recurrence.id == FupGen.id)
+            .where(Recurrence.is_exhausted == False)
+            .where(Recurrence.next_run.is_not(None))
+            .group_by(FupGen.ownerid)
+            .execution_options(yield_per=chunk_size)
+        )
+        if before is not None:
+            # a range scan on ix_recurrence_due (is_exhausted, next_run) instead of
+            # the whole table
+            stmt = stmt.where(Recurrence.next_run < before)
+        for rows in self.db.execute(stmt).partitions():
+            yield [(ownerid, next_run) for ownerid, next_run in rows]
+
+    def get_next_runs(self, ownerids: list[str]) -> dict[str, datetime]:
+        found: dict[str, datetime] = {}
+        for i in range(0, len(ownerids), IN_CHUNK):
+            rows = self.db.execute(
+                select(FupGen.ownerid, func.min(Recurrence.next_run))
+                .join(Recurrence, Recurrence.id == FupGen.id)
+                .where(FupGen.ownerid.in_(ownerids[i : i + IN_CHUNK]))
+                .where(Recurrence.is_exhausted == False)
+                .where(Recurrence.next_run.is_not(None))
+                .group_by(FupGen.ownerid)
+            )
+            found.update((ownerid, next_run) for ownerid, next_run in rows)
+        return found
+
+    def get_due(
+        self,
+        before: datetime,
+        limit: int = 10_000,
+        after_cursor: tuple[datetime, str] | None = None,
+    ) -> list[tuple[str, str, datetime]]:
+        """
+        (id, ownerid, next_run) of the active generators due before `before`,
+        across owners, ordered by (next_run, id). Pass the (next_run, id) of
+        the last row as `after_cursor` for the next page.
+        """
+        stmt = (
+            select(Recurrence.id, FupGen.ownerid, Recurrence.next_run)
+            .join(FupGen, FupGen.id == Recurrence.id)
+            .where(Recurrence.is_exhausted == False)
+            .where(Recurrence.next_run < before)
+            .order_by(Recurrence.next_run, Recurrence.id)
+            .limit(limit)
+        )
+        if after_cursor is not None:
+            stmt = stmt.where(
+                tuple_(Recurrence.next_run, Recurrence.id) > tuple_(*after_cursor)
+            )
+        return [tuple(row) for row in self.db.execute(stmt)]  # type: ignore
+
     def update_config(
         self,
         updates: list[tuple[str, bool, int | None, datetime | None, datetime | None]],
     ) -> None:
-        for fupgen_id, is_exhausted, count, last_run, next_run in updates:
-            try:
-                fupgen = self.db.query(FupGen).filter_by(id=fupgen_id).one()
-            except NoResultFound:
-                # Pode logar: f"FupGen {fupgen_id} não encontrado."
-                continue
-
-            if fupgen.recurrence:
-                fupgen.recurrence.is_exhausted = is_exhausted
-                fupgen.recurrence.count = count
-                fupgen.recurrence.last_run = last_run
-                fupgen.recurrence.next_run = next_run
+        if updates:
+            # one executemany for the whole tick; ids without a recurrence row
+            # match nothing and are skipped
+            self.db.execute(UPDATE_CURSOR, cursor_params(updates))
 
+        if self.occurrences is not None:
+            self.occurrences.refill([update[0] for update in updates])
         self.db.commit()
 
+    def arm(self, ownerids: list[str]) -> None:
+        """
+        Re-arms the generators `disarm` left without a next_run, each at its
+        own next date after its last_run, as create computes it.
+        """
+        params: list[dict[str, Any]] = []
+        for i in range(0, len(ownerids), IN_CHUNK):
+            recs = self.db.scalars(
+                select(Recurrence)
+                .where(owner_rows(ownerids[i : i + IN_CHUNK]))
+                .where(Recurrence.next_run.is_(None))
+            )
+            for rec in recs:
+                sch = make_scheduler(self.make_recurrence, to_config(rec))
+                if sch.next_run is not None:
+                    params.append({"b_id": rec.id, "next_run": sch.next_run})
+        if params:
+            self.db.execute(UPDATE_CURSOR, params)
+        self._refill_owners(ownerids)
+        self.db.commit()
+
+    def disarm(self, ownerids: list[str]) -> None:
+        """
+        Clears the next_run (and any lease) of the owners' active generators,
+        so nothing picks them up again until `arm`. Their cursors are kept.
+        """
+        for i in range(0, len(ownerids), IN_CHUNK):
+            self.db.execute(
+                update(Recurrence.__table__)
+                .where(owner_rows(ownerids[i : i + IN_CHUNK]))
+                .values(next_run=None, lease_owner=None, lease_until=None)
+            )
+        self._refill_owners(ownerids)
+        self.db.commit()
+
+    def reschedule(self, ownerid: str, run_at: datetime) -> bool:
+        """
+        Moves the owner's next tick to `run_at` by setting it as the next_run
+        of its armed generators. False when there are none.
+        """
+        result = self.db.execute(
+            update(Recurrence.__table__)
+            .where(owner_rows([ownerid]))
+            .where(Recurrence.next_run.is_not(None))
+            .values(next_run=run_at)
+        )
+        self._refill_owners([ownerid])
+        self.db.commit()
+        return bool(result.rowcount)
+
+    def _refill_owners(self, ownerids: list[str]) -> None:
+        if self.occurrences is None:
+            return
+        for i in range(0, len(ownerids), IN_CHUNK):
+            ids = self.db.scalars(
+                select(FupGen.id).where(FupGen.ownerid.in_(ownerids[i : i + IN_CHUNK]))
+            )
+            self.occurrences.refill(list(ids))
+
     def update_exhaust_rule(
         self, fupgen_id: str, add_count: int | None, until: datetime | None
     ) -> None:
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.repository.fuprepo import AsyncFupRepository as IAsyncFupRepository
+from domain.entity.fup import FollowUp
+from infra.db.models.fup import fup
+
+
+@dataclass
+class AsyncFupRepository(IAsyncFupRepository):
+    """Appends a tick's follow-ups to the fup table in one executemany."""
+
+    sessions: async_sessionmaker[AsyncSession]
+    make_id: Callable[[], str]
+
+    async def add(self, fups: list[FollowUp]) -> None:
+        if not fups:
+            return
+        async with self.sessions() as db:
+            await db.execute(
+                insert(fup.__table__),
+                [
+                    {
+                        "id": self.make_id(),
+                        "fupgenid": f.fupgenid,
+                        "msgid": f.msgid,
+                        "dataid": f.dataid,
+                        "date": f.date,
+                    }
+                    for f in fups
+                ],
+            )
+            await db.commit()
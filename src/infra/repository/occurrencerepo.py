@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import delete, func, insert, or_, select
+
+from app.repository.occurrencerepo import OccurrenceRepository as IOccurrenceRepository
+from domain.entity.recurrence import recurrenceFactory
+from infra.db.db import IN_CHUNK, Session
+from infra.db.models.fupgen import FupGen
+from infra.db.models.occurrence import Occurrence
+from infra.db.models.recurrenceconfig import Recurrence
+from infra.repository.fupgenrepo import to_config
+
+
+@dataclass
+class OccurrenceRepository(IOccurrenceRepository):
+    """
+    Keeps the next `depth` dates of every active generator in the occurrence
+    table, so "what fires between t0 and t1" is one range scan on its date
+    index instead of evaluating every rule.
+
+    `refill` is incremental: it drops the dates before the generator's
+    next_run and only computes the missing ones after the last date kept.
+    FupGenRepository calls it when update_config moves the cursor; share its
+    session so both land in one commit. `rebuild` is for rule changes.
+    Neither commits: that is left to the session's owner.
+
+    A window is answered in full up to the depth-th date of each generator.
+    """
+
+    db: Session
+    make_recurrence: recurrenceFactory
+    depth: int = 10
+
+    def refill(self, fupgen_ids: list[str]) -> None:
+        for i in range(0, len(fupgen_ids), IN_CHUNK):
+            self._refill(fupgen_ids[i : i + IN_CHUNK])
+
+    def rebuild(self, fupgen_ids: list[str]) -> None:
+        for i in range(0, len(fupgen_ids), IN_CHUNK):
+            self.db.execute(
+                delete(Occurrence).where(
+                    Occurrence.fupgen_id.in_(fupgen_ids[i : i + IN_CHUNK])
+                )
+            )
+        self.refill(fupgen_ids)
+
+    def due_between(
+        self, start: datetime, end: datetime, ownerids: list[str] | None = None
+    ) -> list[tuple[str, str, datetime]]:
+        stmt = (
+            select(Occurrence.ownerid, Occurrence.fupgen_id, Occurrence.date)
+            .where(Occurrence.date >= start)
+            .where(Occurrence.date < end)
+            .order_by(Occurrence.date)
+        )
+        if ownerids is None:
+            return [tuple(row) for row in self.db.execute(stmt)]  # type: ignore
+
+        found: list[tuple[str, str, datetime]] = []
+        for i in range(0, len(ownerids), IN_CHUNK):
+            rows = self.db.execute(
+                stmt.where(Occurrence.ownerid.in_(ownerids[i : i + IN_CHUNK]))
+            )
+            found.extend(tuple(row) for row in rows)  # type: ignore
+        return sorted(found, key=lambda row: row[2])
+
+    def _refill(self, fupgen_ids: list[str]) -> None:
+        # consumed dates, and every date of generators that stopped
+        next_run = (
+            select(Recurrence.next_run)
+            .where(Recurrence.id == Occurrence.fupgen_id)
+            .where(Recurrence.is_exhausted == False)
+            .scalar_subquery()
+        )
+        self.db.execute(
+            delete(Occurrence)
+            .where(Occurrence.fupgen_id.in_(fupgen_ids))
+            .where(or_(next_run.is_(None), Occurrence.date < next_run))
+        )
+
+        kept = {
+            fupgen_id: (last, n)
+            for fupgen_id, last, n in self.db.execute(
+                select(Occurrence.fupgen_id, func.max(Occurrence.date), func.count())
+                .where(Occurrence.fupgen_id.in_(fupgen_ids))
+                .group_by(Occurrence.fupgen_id)
+            )
+        }
+        rows = self.db.execute(
+            select(FupGen.id, FupGen.ownerid, Recurrence)
+            .join(Recurrence, Recurrence.id == FupGen.id)
+            .where(FupGen.id.in_(fupgen_ids))
+            .where(Recurrence.is_exhausted == False)
+            .where(Recurrence.next_run.is_not(None))
+        )
+
+        new: list[dict] = []
+        for fupgen_id, ownerid, rec in rows:
+            last, n = kept.get(fupgen_id, (None, 0))
+            if n >= self.depth:
+                continue
+            recur = self.make_recurrence(to_config(rec))
+            if last is None:
+                dates = recur.iter_between(rec.next_run, datetime.max, inc=True)
+            else:
+                dates = recur.iter_between(last, datetime.max)
+            new.extend(
+                {"fupgen_id": fupgen_id, "ownerid": ownerid, "date": date}
+                for date in islice(dates, self.depth - n)
+            )
+        if new:
+            # Core insert: the ORM bulk path costs more than the rules do
+            self.db.execute(insert(Occurrence.__table__), new)
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import socket
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from domain.entity.recurrence import recurrenceFactory
+from infra.db.db import IN_CHUNK
+from infra.db.models.fupgen import FupGen
+from infra.db.models.recurrenceconfig import Recurrence
+from infra.recurrence.rruleadaptor import rrule_factory
+from infra.repository.fupgenrepo import FupGenRepository, owner_rows
+from infra.scheduler.scheduler import TaskSchedulerProtocol, check_new_tasks
+
+Coro = Callable[[str], Awaitable[Optional[datetime]]]
+
+
+class DBQueueTaskScheduler(TaskSchedulerProtocol):
+    """
+    Uses `recurrence.next_run` as a queue shared by every node on the database.
+
+    Each poll takes up to `batch_size` due rows and claims their owners by
+    stamping every row of those owners with a time-limited lease, so no two
+    nodes run one owner at once. It fires the coroutine once per owner and
+    releases the rows the coroutine moved forward (RunTask does so through
+    `update_config`). Rows whose run failed, or that are still due, keep their
+    lease until it expires and are then claimed again, by any node.
+
+    The table is the source of truth: `schedule` registers the coroutine and
+    re-arms owners disarmed by `cancel` at their generators' own next dates
+    (FupGenRepository.arm, with `make_recurrence`); it does not move rows that
+    already have a next_run. `reschedule` moves the owner's rows to run_at.
+
+    `session_factory` is a sync sessionmaker (make_session); an
+    async_sessionmaker is rejected.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        node_id: Optional[str] = None,
+        batch_size: int = 100,
+        lease: timedelta = timedelta(minutes=5),
+        poll_interval: timedelta = timedelta(seconds=1),
+        make_recurrence: recurrenceFactory = rrule_factory,
+    ):
+        if isinstance(session_factory, async_sessionmaker):
+            raise TypeError("DBQueueTaskScheduler needs a sync sessionmaker")
+        self._session_factory = session_factory
+        self.node_id = node_id or f"{socket.gethostname()}:{id(self):x}"
+        self._batch_size = batch_size
+        self._lease = lease
+        self._poll_interval = poll_interval
+        self._make_recurrence = make_recurrence
+        self._coro: Optional[Coro] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._running = False
+        self.logger = logging.getLogger("DBQueue")
+
+    async def start(self) -> None:
+        if not self._running:
+            self._running = True
+            self._loop_task = asyncio.create_task(self._run_loop())
+
+    async def stop(self) -> None:
+        self._running = False
+        self._wakeup.set()
+        if self._loop_task:
+            await self._loop_task
+
+    async def schedule(self, task_id: str, coro: Coro, run_at: datetime) -> None:
+        self._coro = coro
+        with self._session_factory() as db:
+            self._repo(db).arm([task_id])
+        self._wakeup.set()
+
+    async def schedule_many(
+        self, coro: Coro, tasks: List[Tuple[str, datetime]]
+    ) -> None:
+        check_new_tasks(tasks, ())
+        self._coro = coro
+        # one transaction for the whole batch
+        with self._session_factory() as db:
+            self._repo(db).arm([task_id for task_id, _ in tasks])
+        self._wakeup.set()
+
+    async def cancel(self, task_id: str) -> None:
+        await self.cancel_many([task_id])
+
+    async def cancel_many(self, task_ids: List[str]) -> None:
+        with self._session_factory() as db:
+            self._repo(db).disarm(task_ids)
+
+    async def reschedule(self, task_id: str, run_at: datetime) -> None:
+        with self._session_factory() as db:
+            if not self._repo(db).reschedule(task_id, run_at):
+                raise ValueError(f"Task '{task_id}' is not queued")
+        self._wakeup.set()
+
+    async def is_active(self, task_id: str) -> bool:
+        return await self.next_run(task_id) is not None
+
+    async def next_run(self, task_id: str) -> Optional[datetime]:
+        with self._session_factory() as db:
+            return db.scalar(
+                select(func.min(Recurrence.next_run))
+                .where(owner_rows([task_id]))
+                .where(Recurrence.next_run.is_not(None))
+            )
+
+    async def next_run_many(self, task_ids: List[str]) -> Dict[str, Optional[datetime]]:
+        found: Dict[str, Optional[datetime]] = {}
+        with self._session_factory() as db:
+            for i in range(0, len(task_ids), IN_CHUNK):
+                rows = db.execute(
+                    select(FupGen.ownerid, func.min(Recurrence.next_run))
+                    .join(Recurrence, Recurrence.id == FupGen.id)
+                    .where(FupGen.ownerid.in_(task_ids[i : i + IN_CHUNK]))
+                    .where(Recurrence.is_exhausted == False)
+                    .where(Recurrence.next_run.is_not(None))
+                    .group_by(FupGen.ownerid)
+                )
+                found.update((ownerid, next_run) for ownerid, next_run in rows)
+        return {task_id: found.get(task_id) for task_id in task_ids}
+
+    def claim(self, now: Optional[datetime] = None) -> Tuple[List[str], datetime]:
+        """
+        Leases the owners of due rows to this node. The coroutine runs for
+        every generator of an owner, so every active row of the owner is
+        leased, and an owner with a row leased elsewhere is left out. Returns
+        the owners and the lease end.
+        """
+        now = now or datetime.now()
+        until = now + self._lease
+        free = or_(Recurrence.lease_until.is_(None), Recurrence.lease_until < now)
+        due = (
+            select(Recurrence.id)
+            .where(Recurrence.is_exhausted == False)
+            .where(Recurrence.next_run <= now)
+            .where(free)
+            .order_by(Recurrence.next_run)
+            .limit(self._batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        with self._session_factory() as db:
+            ids = db.scalars(due).all()
+            if not ids:
+                return [], until
+            owner_of = {
+                id: ownerid
+                for id, ownerid in db.execute(
+                    select(FupGen.id, FupGen.ownerid).where(FupGen.id.in_(ids))
+                )
+            }
+            # in due order, without the owners another node is running
+            owners = list(dict.fromkeys(owner_of[id] for id in ids))
+            owners = self._unheld(db, owners, now)
+            if not owners:
+                db.commit()
+                return [], until
+
+            db.execute(
+                update(Recurrence)
+                .where(owner_rows(owners))
+                # re-checked here for databases that ignore SKIP LOCKED
+                .where(free)
+                .values(lease_owner=self.node_id, lease_until=until)
+                .execution_options(synchronize_session=False)
+            )
+            # a node that leased rows of the same owner meanwhile keeps it
+            mine = self._unheld(db, owners, now, until)
+            lost = sorted(set(owners) - set(mine))
+            if lost:
+                self._unlease(db, lost, until)
+            db.commit()
+        return mine, until
+
+    def _unheld(
+        self,
+        db: Session,
+        owners: List[str],
+        now: datetime,
+        until: Optional[datetime] = None,
+    ) -> List[str]:
+        # the owners without a row under a live lease other than ours (`until`)
+        held = (
+            select(FupGen.ownerid)
+            .join(Recurrence, Recurrence.id == FupGen.id)
+            .where(FupGen.ownerid.in_(owners))
+            .where(Recurrence.lease_until >= now)
+        )
+        if until is not None:
+            held = held.where(
+                or_(
+                    Recurrence.lease_owner != self.node_id,
+                    Recurrence.lease_until != until,
+                )
+            )
+        taken = set(db.scalars(held))
+        return [ownerid for ownerid in owners if ownerid not in taken]
+
+    def _unlease(self, db: Session, owners: List[str], until: datetime) -> None:
+        db.execute(
+            update(Recurrence)
+            .where(Recurrence.lease_owner == self.node_id)
+            .where(Recurrence.lease_until == until)
+            .where(owner_rows(owners))
+            .values(lease_owner=None, lease_until=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    def release(self, owners: List[str], until: datetime, now: datetime) -> None:
+        if not owners:
+            return
+        with self._session_factory() as db:
+            db.execute(
+                update(Recurrence)
+                .where(Recurrence.lease_owner == self.node_id)
+                .where(Recurrence.lease_until == until)
+                .where(
+                    Recurrence.id.in_(
+                        select(FupGen.id).where(FupGen.ownerid.in_(owners))
+                    )
+                )
+                # rows that are still due keep the lease: retried once it expires
+                .where(or_(Recurrence.next_run.is_(None), Recurrence.next_run > now))
+                .values(lease_owner=None, lease_until=None)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        if self._coro is None:
+            return 0
+        now = now or datetime.now()
+        owners, until = self.claim(now)
+
+        done: List[str] = []
+        for ownerid in owners:
+            try:
+                await self._coro(ownerid)
+                done.append(ownerid)
+            except Exception as e:
+                self.logger.error(f"Error in task '{ownerid}': {e}", exc_info=True)
+
+        self.release(done, until, now)
+        if owners:
+            self.logger.info(f"[{self.node_id}] fired {len(owners)} owners")
+        return len(owners)
+
+    async def _run_loop(self) -> None:
+        while self._running:
+            if await self.run_once() >= self._batch_size:
+                # a full batch: there may be more due rows right away
+                continue
+            try:
+                self._wakeup.clear()
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self._poll_interval.total_seconds()
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def _repo(self, db: Session) -> FupGenRepository:
+        # arm, disarm and reschedule only; ids are made by create
+        return FupGenRepository(
+            db=db, make_recurrence=self._make_recurrence, make_id=lambda: str(uuid4())
+        )
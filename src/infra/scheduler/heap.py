@@ -0,0 +1,131 @@
+from datetime import datetime
+from typing import Generic, Iterator, List, Optional, Protocol, TypeVar
+
+
+class HeapItem(Protocol):
+    run_at: datetime
+    index: int
+
+
+T = TypeVar("T", bound=HeapItem)
+
+
+class IndexedHeap(Generic[T]):
+    """
+    Binary min-heap on `run_at` that keeps each item's position in `item.index`,
+    so items can be removed or re-keyed in O(log n). `index` is -1 when the item
+    is not in the heap.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[T] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._heap)
+
+    def peek(self) -> Optional[T]:
+        return self._heap[0] if self._heap else None
+
+    def push(self, item: T) -> None:
+        item.index = len(self._heap)
+        self._heap.append(item)
+        self._sift_up(item.index)
+
+    def pop(self) -> T:
+        heap = self._heap
+        top = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            last.index = 0
+            self._sift_down(0)
+        top.index = -1
+        return top
+
+    def remove(self, item: T) -> None:
+        heap = self._heap
+        i = item.index
+        last = heap.pop()
+        if i < len(heap):
+            heap[i] = last
+            last.index = i
+            self._fix(i)
+        item.index = -1
+
+    def extend(self, items: List[T]) -> None:
+        # pushing k items costs O(k log n), re-heapifying O(n + k): take the
+        # rebuild once the batch is a sizeable part of the heap
+        if len(items) < len(self._heap) // 8:
+            for item in items:
+                self.push(item)
+            return
+        self._heap.extend(items)
+        self._heapify()
+
+    def remove_many(self, items: List[T]) -> None:
+        if len(items) < len(self._heap) // 8:
+            for item in items:
+                if item.index >= 0:
+                    self.remove(item)
+            return
+        for item in items:
+            item.index = -1
+        self._heap = [item for item in self._heap if item.index >= 0]
+        self._heapify()
+
+    def update(self, item: T, run_at: datetime) -> None:
+        item.run_at = run_at
+        self._fix(item.index)
+
+    def _heapify(self) -> None:
+        heap = self._heap
+        for i, item in enumerate(heap):
+            item.index = i
+        for i in reversed(range(len(heap) // 2)):
+            self._sift_down(i)
+
+    def _fix(self, i: int) -> None:
+        if i > 0 and self._heap[i].run_at < self._heap[(i - 1) >> 1].run_at:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def _sift_up(self, i: int) -> None:
+        heap = self._heap
+        item = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            other = heap[parent]
+            if not item.run_at < other.run_at:
+                break
+            heap[i] = other
+            other.index = i
+            i = parent
+        heap[i] = item
+        item.index = i
+
+    def _sift_down(self, i: int) -> None:
+        heap = self._heap
+        n = len(heap)
+        item = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            right = child + 1
+            if right < n and heap[right].run_at < heap[child].run_at:
+                child = right
+            other = heap[child]
+            if not other.run_at < item.run_at:
+                break
+            heap[i] = other
+            other.index = i
+            i = child
+        heap[i] = item
+        item.index = i
@@ -1,6 +1,5 @@
-from asyncio import Protocol
 from datetime import datetime
-from typing import Awaitable, Callable
+from typing import Awaitable, Callable, Protocol
 
 
 class ITaskScheduler(Protocol):
@@ -8,10 +7,20 @@ class ITaskScheduler(Protocol):
     async def stop(self) -> None: ...
     async def schedule(
         self,
-        coro: Callable[[str], Awaitable[datetime | None]],
         task_id: str,
+        coro: Callable[[str], Awaitable[datetime | None]],
         run_at: datetime,
     ) -> None: ...
     async def cancel(self, task_id: str) -> None: ...
+    async def reschedule(self, task_id: str, run_at: datetime) -> None: ...
     async def is_active(self, task_id: str) -> bool: ...
     async def next_run(self, task_id: str) -> datetime | None: ...
+    async def schedule_many(
+        self,
+        coro: Callable[[str], Awaitable[datetime | None]],
+        tasks: list[tuple[str, datetime]],
+    ) -> None: ...
+    async def cancel_many(self, task_ids: list[str]) -> None: ...
+    async def next_run_many(
+        self, task_ids: list[str]
+    ) -> dict[str, datetime | None]: ...
@@ -0,0 +1,72 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+_US = timedelta(microseconds=1)
+
+
+class JitterPolicy:
+    """
+    Spreads fire times of tasks that share a run_at over `window`.
+
+    Each task id gets a fixed offset in [0, window), derived from a hash of the
+    id, so an owner always fires at the same place inside the window across
+    restarts and nodes. `overrides` sets a different window for some ids
+    (timedelta(0) opts them out). Offsets only ever delay a fire.
+    """
+
+    def __init__(
+        self,
+        window: timedelta,
+        overrides: Optional[Dict[str, timedelta]] = None,
+        salt: str = "",
+    ):
+        if window < timedelta(0):
+            raise ValueError("window must not be negative")
+        self.window = window
+        self.overrides = overrides or {}
+        self._salt = salt.encode()
+
+    def offset(self, task_id: str) -> timedelta:
+        window_us = self.overrides.get(task_id, self.window) // _US
+        if window_us <= 0:
+            return timedelta(0)
+        digest = hashlib.blake2b(
+            task_id.encode(), digest_size=8, salt=self._salt[:16]
+        ).digest()
+        return timedelta(microseconds=int.from_bytes(digest) % window_us)
+
+    def apply(self, task_id: str, run_at: datetime) -> datetime:
+        return run_at + self.offset(task_id)
+
+
+class JitteredCoro:
+    """
+    Wraps a task coroutine so the next run it returns is shifted by the task's
+    offset. The coroutine itself still sees (and stores) the exact dates.
+    A class rather than a closure so it stays picklable for the sharded backend.
+    """
+
+    def __init__(
+        self,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        policy: JitterPolicy,
+    ):
+        self.coro = coro
+        self.policy = policy
+
+    async def __call__(self, task_id: str) -> Optional[datetime]:
+        result = await self.coro(task_id)
+        return self.policy.apply(task_id, result) if result else None
+
+
+def batch_next_run(
+    coro: Callable[[str], Awaitable[Optional[datetime]]],
+    task_id: str,
+    result: Optional[datetime],
+) -> Optional[datetime]:
+    # a coalesced batch runs the owners without their task coroutine, so the
+    # offset JitteredCoro would have added is applied to the batch result here
+    if result and isinstance(coro, JitteredCoro):
+        return coro.policy.apply(task_id, result)
+    return result
@@ -0,0 +1,138 @@
+from bisect import bisect_left
+from typing import Dict, List, Optional, Protocol, Sequence
+
+# seconds; the last bucket (+Inf) is implicit
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+
+class SchedulerMetrics(Protocol):
+    """Hook the scheduler backends report to. Every call must be cheap and sync."""
+
+    def fired(self, lag: float) -> None:
+        """A task started `lag` seconds after its run_at."""
+
+    def executed(self, seconds: float, ok: bool) -> None:
+        """A coroutine (or batch call) finished after `seconds`."""
+
+    def rescheduled(self) -> None:
+        """A task was queued again, after a fire or by `reschedule`."""
+
+    def queue(self, depth: int, tombstones: int = 0) -> None:
+        """Current queued tasks and dead queue entries not yet dropped."""
+
+
+class NullMetrics:
+    def fired(self, lag: float) -> None:
+        pass
+
+    def executed(self, seconds: float, ok: bool) -> None:
+        pass
+
+    def rescheduled(self) -> None:
+        pass
+
+    def queue(self, depth: int, tombstones: int = 0) -> None:
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # counts[i] holds observations <= buckets[i] (not cumulative), the
+        # extra last one those above every bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if empty)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class InMemoryMetrics:
+    """In-process collector: fixed-bucket histograms, counters and gauges."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.lag = Histogram(buckets)
+        self.exec_time = Histogram(buckets)
+        self.errors = 0
+        self.reschedules = 0
+        self.depth = 0
+        self.tombstones = 0
+
+    def fired(self, lag: float) -> None:
+        self.lag.observe(lag if lag > 0 else 0.0)
+
+    def executed(self, seconds: float, ok: bool) -> None:
+        self.exec_time.observe(seconds)
+        if not ok:
+            self.errors += 1
+
+    def rescheduled(self) -> None:
+        self.reschedules += 1
+
+    def queue(self, depth: int, tombstones: int = 0) -> None:
+        self.depth = depth
+        self.tombstones = tombstones
+
+
+def _labels(labels: Dict[str, str], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels.items()]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _histogram(name: str, hist: Histogram, labels: Dict[str, str]) -> List[str]:
+    lines = [f"# TYPE {name} histogram"]
+    cumulative = 0
+    for bound, n in zip(hist.buckets, hist.counts):
+        cumulative += n
+        le = _labels(labels, f'le="{bound}"')
+        lines.append(f"{name}_bucket{le} {cumulative}")
+    le = _labels(labels, 'le="+Inf"')
+    lines.append(f"{name}_bucket{le} {hist.count}")
+    lines.append(f"{name}_sum{_labels(labels)} {hist.sum}")
+    lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+    return lines
+
+
+def to_prometheus(
+    metrics: InMemoryMetrics,
+    prefix: str = "ups_scheduler",
+    labels: Optional[Dict[str, str]] = None,
+) -> str:
+    """Renders the collector in the Prometheus text exposition format."""
+    labels = labels or {}
+    lbl = _labels(labels)
+    lines = [
+        *_histogram(f"{prefix}_fire_lag_seconds", metrics.lag, labels),
+        *_histogram(f"{prefix}_exec_seconds", metrics.exec_time, labels),
+        f"# TYPE {prefix}_errors_total counter",
+        f"{prefix}_errors_total{lbl} {metrics.errors}",
+        f"# TYPE {prefix}_reschedules_total counter",
+        f"{prefix}_reschedules_total{lbl} {metrics.reschedules}",
+        f"# TYPE {prefix}_queue_depth gauge",
+        f"{prefix}_queue_depth{lbl} {metrics.depth}",
+        f"# TYPE {prefix}_tombstones gauge",
+        f"{prefix}_tombstones{lbl} {metrics.tombstones}",
+    ]
+    return "\n".join(lines) + "\n"
@@ -1,17 +1,40 @@
 import asyncio
-import heapq
 import logging
-from datetime import datetime
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol
+import time
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+)
 
 from apscheduler.job import Job
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.base import STATE_RUNNING
 from apscheduler.triggers.date import DateTrigger
 
+from infra.scheduler.heap import IndexedHeap
+from infra.scheduler.jitter import JitteredCoro, JitterPolicy, batch_next_run
+from infra.scheduler.metrics import NULL_METRICS, SchedulerMetrics
+
+logger = logging.getLogger(__name__)
+
 # -----------------------------
 # 🔌 Protocol
 # -----------------------------
 
+# fires many task ids at once, returning each one's next run (or None to stop)
+BatchCoro = Callable[[List[str]], Awaitable[Dict[str, Optional[datetime]]]]
+
 
 class TaskSchedulerProtocol(Protocol):
     async def start(self) -> None: ...
@@ -23,8 +46,30 @@ class TaskSchedulerProtocol(Protocol):
         run_at: datetime,
     ) -> None: ...
     async def cancel(self, task_id: str) -> None: ...
+    async def reschedule(self, task_id: str, run_at: datetime) -> None: ...
     async def is_active(self, task_id: str) -> bool: ...
     async def next_run(self, task_id: str) -> Optional[datetime]: ...
+    async def schedule_many(
+        self,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        tasks: List[Tuple[str, datetime]],
+    ) -> None: ...
+    async def cancel_many(self, task_ids: List[str]) -> None: ...
+    async def next_run_many(
+        self, task_ids: List[str]
+    ) -> Dict[str, Optional[datetime]]: ...
+
+
+def check_new_tasks(
+    tasks: List[Tuple[str, datetime]], scheduled: Iterable[str]
+) -> None:
+    """Rejects a bulk schedule up front if any id repeats or is already queued."""
+    ids = [task_id for task_id, _ in tasks]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Duplicate task ids in batch")
+    clash = next((task_id for task_id in ids if task_id in scheduled), None)
+    if clash is not None:
+        raise ValueError(f"Task '{clash}' already scheduled")
 
 
 # -----------------------------
@@ -33,8 +78,20 @@ class TaskSchedulerProtocol(Protocol):
 
 
 class TaskScheduler:
-    def __init__(self, backend: TaskSchedulerProtocol):
+    def __init__(
+        self,
+        backend: TaskSchedulerProtocol,
+        metrics: Optional[SchedulerMetrics] = None,
+        jitter: Optional[JitterPolicy] = None,
+    ):
         self._backend = backend
+        # fire times are spread by jitter; the dates the coroutine computes
+        # and persists stay exact
+        self._jitter = jitter
+        # backends report to their `metrics` attribute (a no-op by default)
+        if metrics is not None:
+            setattr(backend, "metrics", metrics)
+        self.metrics = getattr(backend, "metrics", NULL_METRICS)
 
     async def start(self) -> None:
         await self._backend.start()
@@ -48,17 +105,42 @@ class TaskScheduler:
         coro: Callable[[str], Awaitable[Optional[datetime]]],
         run_at: datetime,
     ) -> None:
+        if self._jitter is not None:
+            coro = JitteredCoro(coro, self._jitter)
+            run_at = self._jitter.apply(task_id, run_at)
         await self._backend.schedule(task_id, coro, run_at)
 
     async def cancel(self, task_id: str) -> None:
         await self._backend.cancel(task_id)
 
+    async def reschedule(self, task_id: str, run_at: datetime) -> None:
+        if self._jitter is not None:
+            run_at = self._jitter.apply(task_id, run_at)
+        await self._backend.reschedule(task_id, run_at)
+
     async def is_active(self, task_id: str) -> bool:
         return await self._backend.is_active(task_id)
 
     async def next_run(self, task_id: str) -> Optional[datetime]:
         return await self._backend.next_run(task_id)
 
+    async def schedule_many(
+        self,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        tasks: List[Tuple[str, datetime]],
+    ) -> None:
+        if self._jitter is not None:
+            jitter = self._jitter
+            coro = JitteredCoro(coro, jitter)
+            tasks = [(task_id, jitter.apply(task_id, at)) for task_id, at in tasks]
+        await self._backend.schedule_many(coro, tasks)
+
+    async def cancel_many(self, task_ids: List[str]) -> None:
+        await self._backend.cancel_many(task_ids)
+
+    async def next_run_many(self, task_ids: List[str]) -> Dict[str, Optional[datetime]]:
+        return await self._backend.next_run_many(task_ids)
+
 
 # -----------------------------
 # ⚙️ heapq Implementation
@@ -75,18 +157,40 @@ class ScheduledTask:
         self.run_at = run_at
         self.task_id = task_id
         self.coro = coro
+        self.index = -1
 
     def __lt__(self, other: Any) -> bool:
         return self.run_at < other.run_at
 
 
 class HeapqTaskScheduler(TaskSchedulerProtocol):
-    def __init__(self):
-        self._queue: List[ScheduledTask] = []
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        batch_coro: Optional[BatchCoro] = None,
+        coalesce_window: timedelta = timedelta(0),
+        max_batch: int = 1000,
+    ):
+        # max_concurrency=None runs due tasks inline, one at a time. Otherwise
+        # up to max_concurrency tasks run as a worker pool while the loop keeps
+        # timing the next ones.
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self._queue: IndexedHeap[ScheduledTask] = IndexedHeap()
         self._tasks: Dict[str, ScheduledTask] = {}
         self._loop_task: Optional[asyncio.Task] = None
         self._wakeup = asyncio.Event()
         self._running = False
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._inflight: Set[asyncio.Task] = set()
+
+        # coalescing mode: when the earliest task is due, wait coalesce_window
+        # more and fire everything due by then through one batch_coro call
+        self._batch_coro = batch_coro
+        self._window = coalesce_window if batch_coro else timedelta(0)
+        self._max_batch = max_batch
+        self.metrics: SchedulerMetrics = NULL_METRICS
 
     async def start(self) -> None:
         if not self._running:
@@ -98,6 +202,8 @@ class HeapqTaskScheduler(TaskSchedulerProtocol):
         self._wakeup.set()
         if self._loop_task:
             await self._loop_task
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
 
     async def schedule(
         self,
@@ -110,14 +216,41 @@ class HeapqTaskScheduler(TaskSchedulerProtocol):
 
         task = ScheduledTask(run_at, task_id, coro)
         self._tasks[task_id] = task
-        heapq.heappush(self._queue, task)
+        self._queue.push(task)
+        self._wakeup.set()
+
+    async def schedule_many(
+        self,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        tasks: List[Tuple[str, datetime]],
+    ) -> None:
+        check_new_tasks(tasks, self._tasks)
+        new = [ScheduledTask(run_at, task_id, coro) for task_id, run_at in tasks]
+        self._tasks.update((task.task_id, task) for task in new)
+        self._queue.extend(new)
         self._wakeup.set()
 
     async def cancel(self, task_id: str) -> None:
-        if task_id in self._tasks:
-            del self._tasks[task_id]
+        task = self._tasks.pop(task_id, None)
+        if task is not None and task.index >= 0:
+            self._queue.remove(task)
             self._wakeup.set()
 
+    async def cancel_many(self, task_ids: List[str]) -> None:
+        tasks = self._tasks
+        removed = [tasks.pop(task_id) for task_id in task_ids if task_id in tasks]
+        self._queue.remove_many([task for task in removed if task.index >= 0])
+        self._wakeup.set()
+
+    async def reschedule(self, task_id: str, run_at: datetime) -> None:
+        task = self._tasks.get(task_id)
+        if task is None or task.index < 0:
+            raise ValueError(f"Task '{task_id}' is not queued")
+
+        self._queue.update(task, run_at)
+        self._wakeup.set()
+        self.metrics.rescheduled()
+
     async def is_active(self, task_id: str) -> bool:
         return task_id in self._tasks
 
@@ -125,40 +258,112 @@ class HeapqTaskScheduler(TaskSchedulerProtocol):
         task = self._tasks.get(task_id)
         return task.run_at if task else None
 
+    async def next_run_many(self, task_ids: List[str]) -> Dict[str, Optional[datetime]]:
+        tasks = self._tasks
+        return {
+            task_id: tasks[task_id].run_at if task_id in tasks else None
+            for task_id in task_ids
+        }
+
     async def _run_loop(self) -> None:
         while self._running:
             now = datetime.now()
-            while self._queue and self._queue[0].task_id not in self._tasks:
-                heapq.heappop(self._queue)
+            next_task = self._queue.peek()
+            self.metrics.queue(len(self._queue))
 
-            if not self._queue:
+            if next_task is None:
                 self._wakeup.clear()
                 await self._wakeup.wait()
                 continue
 
-            next_task = self._queue[0]
-            delay = (next_task.run_at - now).total_seconds()
+            delay = (next_task.run_at + self._window - now).total_seconds()
             if delay > 0:
                 try:
                     self._wakeup.clear()
                     await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
-                    continue
                 except asyncio.TimeoutError:
                     pass
+                # look at the head again: a cancel or reschedule may have
+                # moved it while the timeout fired
+                continue
 
-            heapq.heappop(self._queue)
-            if next_task.task_id not in self._tasks:
+            if self._slots is None:
+                await self._dispatch()
                 continue
 
-            try:
-                result = await next_task.coro(next_task.task_id)
-                if result:
-                    await self.schedule(next_task.task_id, next_task.coro, result)
-                else:
-                    del self._tasks[next_task.task_id]
-            except Exception as e:
-                print(f"[heapq] Error in task '{next_task.task_id}': {e}")
-                del self._tasks[next_task.task_id]
+            await self._slots.acquire()
+            # the queue may have changed while every worker was busy
+            next_task = self._queue.peek()
+            if next_task is None or next_task.run_at + self._window > datetime.now():
+                self._slots.release()
+                continue
+
+            job = asyncio.create_task(self._dispatch())
+            self._inflight.add(job)
+            job.add_done_callback(self._release)
+
+    def _release(self, job: asyncio.Task) -> None:
+        self._inflight.discard(job)
+        if self._slots is not None:
+            self._slots.release()
+
+    def _dispatch(self) -> Awaitable[None]:
+        # pops synchronously, so the loop never sees a task that is already taken
+        if self._batch_coro is None:
+            return self._execute(self._queue.pop())
+
+        now = datetime.now()
+        batch: List[ScheduledTask] = []
+        while len(batch) < self._max_batch:
+            head = self._queue.peek()
+            if head is None or head.run_at > now:
+                break
+            batch.append(self._queue.pop())
+        return self._execute_batch(batch)
+
+    async def _execute(self, task: ScheduledTask) -> None:
+        self.metrics.fired((datetime.now() - task.run_at).total_seconds())
+        started = time.perf_counter()
+        ok = True
+        try:
+            result = await task.coro(task.task_id)
+        except Exception as e:
+            logger.error(f"Error in task '{task.task_id}': {e}", exc_info=True)
+            result = None
+            ok = False
+        self.metrics.executed(time.perf_counter() - started, ok)
+        self._finish(task, result)
+
+    async def _execute_batch(self, batch: List[ScheduledTask]) -> None:
+        assert self._batch_coro is not None
+        now = datetime.now()
+        for task in batch:
+            self.metrics.fired((now - task.run_at).total_seconds())
+        started = time.perf_counter()
+        ok = True
+        try:
+            results = await self._batch_coro([task.task_id for task in batch])
+        except Exception as e:
+            logger.error(f"Error in batch of {len(batch)} tasks: {e}", exc_info=True)
+            results = {}
+            ok = False
+        self.metrics.executed(time.perf_counter() - started, ok)
+        for task in batch:
+            self._finish(
+                task, batch_next_run(task.coro, task.task_id, results.get(task.task_id))
+            )
+
+    def _finish(self, task: ScheduledTask, result: Optional[datetime]) -> None:
+        if self._tasks.get(task.task_id) is not task:
+            # cancelled (or replaced) while running
+            return
+        if result:
+            task.run_at = result
+            self._queue.push(task)
+            self._wakeup.set()
+            self.metrics.rescheduled()
+        else:
+            del self._tasks[task.task_id]
 
 
 # -----------------------------
@@ -166,12 +371,34 @@ class HeapqTaskScheduler(TaskSchedulerProtocol):
 # -----------------------------
 
 
+def _local(run_at: datetime) -> datetime:
+    # APScheduler keeps run dates aware in its (local) timezone; the other
+    # backends and the callers work with naive local datetimes
+    return run_at.replace(tzinfo=None)
+
+
 class APSchedulerTaskScheduler(TaskSchedulerProtocol):
-    def __init__(self):
+    def __init__(
+        self,
+        batch_coro: Optional[BatchCoro] = None,
+        coalesce_window: timedelta = timedelta(0),
+        max_batch: int = 1000,
+    ):
         self.scheduler = AsyncIOScheduler()
         self.jobs: Dict[str, Job] = {}
         self.logger = logging.getLogger("APScheduler")
 
+        # coalescing mode: fired jobs are buffered for coalesce_window and then
+        # handed to batch_coro together
+        self._batch_coro = batch_coro
+        self._window = coalesce_window
+        self._max_batch = max_batch
+        self._pending: Dict[
+            str, Tuple[Callable[[str], Awaitable[Optional[datetime]]], Job]
+        ] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.metrics: SchedulerMetrics = NULL_METRICS
+
     async def start(self) -> None:
         self.scheduler.start()
 
@@ -188,32 +415,156 @@ class APSchedulerTaskScheduler(TaskSchedulerProtocol):
         if task_id in self.jobs:
             raise ValueError(f"Task '{task_id}' already exists")
 
+        self.jobs[task_id] = self._add_job(task_id, coro, run_at)
+        self.metrics.queue(len(self.jobs))
+        self.logger.info(f"Scheduled '{task_id}' at {run_at}")
+
+    async def schedule_many(
+        self,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        tasks: List[Tuple[str, datetime]],
+    ) -> None:
+        check_new_tasks(tasks, self.jobs)
+        # every add_job on a running scheduler restarts its timer; paused, the
+        # jobs are only stored and resume() wakes it up once
+        running = self.scheduler.state == STATE_RUNNING
+        if running:
+            self.scheduler.pause()
+        try:
+            for task_id, run_at in tasks:
+                self.jobs[task_id] = self._add_job(task_id, coro, run_at)
+        finally:
+            if running:
+                self.scheduler.resume()
+        self.metrics.queue(len(self.jobs))
+        self.logger.info(f"Scheduled {len(tasks)} tasks")
+
+    def _add_job(
+        self,
+        task_id: str,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        run_at: datetime,
+    ) -> Job:
         async def wrapper():
+            self.metrics.fired((datetime.now() - run_at).total_seconds())
+            if self._batch_coro is not None:
+                self._buffer(task_id, coro)
+                return
+            started = time.perf_counter()
+            ok = True
+            result: Optional[datetime] = None
             try:
                 self.logger.info(f"Running task '{task_id}'")
                 result = await coro(task_id)
-                if result:
-                    await self.schedule(task_id, coro, result)
             except Exception as e:
+                ok = False
                 self.logger.error(f"Task '{task_id}' failed: {e}", exc_info=True)
-            finally:
-                self.jobs.pop(task_id, None)
-
+            self.metrics.executed(time.perf_counter() - started, ok)
+
+            if self.jobs.get(task_id) is not job:
+                # cancelled (or replaced) while running
+                return
+            # the fired job must go before the next one is scheduled
+            del self.jobs[task_id]
+            if result:
+                await self.schedule(task_id, coro, result)
+                self.metrics.rescheduled()
+            else:
+                self.metrics.queue(len(self.jobs))
+
+        # misfire_grace_time=None: a late job still runs, as on the other
+        # backends, instead of being dropped as a misfire after 1s
         job = self.scheduler.add_job(
-            wrapper, trigger=DateTrigger(run_date=run_at), id=task_id
+            wrapper,
+            trigger=DateTrigger(run_date=run_at),
+            id=task_id,
+            misfire_grace_time=None,
         )
-        self.jobs[task_id] = job
-        self.logger.info(f"Scheduled '{task_id}' at {run_at}")
+        return job
 
     async def cancel(self, task_id: str) -> None:
+        self._pending.pop(task_id, None)
         job = self.jobs.pop(task_id, None)
         if job:
-            job.remove()
+            with suppress(JobLookupError):
+                # already fired jobs are gone from the job store
+                job.remove()
+            self.metrics.queue(len(self.jobs))
             self.logger.info(f"Removed task '{task_id}'")
 
+    async def cancel_many(self, task_ids: List[str]) -> None:
+        removed = 0
+        for task_id in task_ids:
+            self._pending.pop(task_id, None)
+            job = self.jobs.pop(task_id, None)
+            if job:
+                with suppress(JobLookupError):
+                    job.remove()
+                removed += 1
+        self.metrics.queue(len(self.jobs))
+        self.logger.info(f"Removed {removed} tasks")
+
+    async def reschedule(self, task_id: str, run_at: datetime) -> None:
+        job = self.jobs.get(task_id)
+        if job is None:
+            raise ValueError(f"Task '{task_id}' is not queued")
+
+        self.jobs[task_id] = job.reschedule(trigger=DateTrigger(run_date=run_at))
+        self.metrics.rescheduled()
+        self.logger.info(f"Rescheduled '{task_id}' to {run_at}")
+
     async def is_active(self, task_id: str) -> bool:
         return task_id in self.jobs
 
     async def next_run(self, task_id: str) -> Optional[datetime]:
         job = self.jobs.get(task_id)
-        return job.next_run_time if job else None
+        return _local(job.next_run_time) if job else None
+
+    async def next_run_many(self, task_ids: List[str]) -> Dict[str, Optional[datetime]]:
+        jobs = self.jobs
+        return {
+            task_id: _local(jobs[task_id].next_run_time) if task_id in jobs else None
+            for task_id in task_ids
+        }
+
+    def _buffer(
+        self, task_id: str, coro: Callable[[str], Awaitable[Optional[datetime]]]
+    ) -> None:
+        job = self.jobs.get(task_id)
+        if job is None:
+            return
+        self._pending[task_id] = (coro, job)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        assert self._batch_coro is not None
+        await asyncio.sleep(self._window.total_seconds())
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+
+        ids = list(pending)
+        for i in range(0, len(ids), self._max_batch):
+            batch = ids[i : i + self._max_batch]
+            self.logger.info(f"Running batch of {len(batch)} tasks")
+            results: Dict[str, Optional[datetime]] = {}
+            started = time.perf_counter()
+            ok = True
+            try:
+                results = await self._batch_coro(batch)
+            except Exception as e:
+                ok = False
+                self.logger.error(f"Batch of {len(batch)} failed: {e}", exc_info=True)
+            self.metrics.executed(time.perf_counter() - started, ok)
+
+            for task_id in batch:
+                coro, job = pending[task_id]
+                if self.jobs.get(task_id) is not job:
+                    # cancelled (or replaced) meanwhile
+                    continue
+                del self.jobs[task_id]
+                result = batch_next_run(coro, task_id, results.get(task_id))
+                if result:
+                    await self.schedule(task_id, coro, result)
+                    self.metrics.rescheduled()
+            self.metrics.queue(len(self.jobs))
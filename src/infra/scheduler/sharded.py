@@ -0,0 +1,320 @@
+import asyncio
+import hashlib
+import itertools
+import logging
+import multiprocessing
+from bisect import bisect
+from datetime import datetime
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from infra.scheduler.scheduler import TaskSchedulerProtocol, check_new_tasks
+
+Coro = Callable[[str], Awaitable[Optional[datetime]]]
+BackendFactory = Callable[[], TaskSchedulerProtocol]
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest())
+
+
+class HashRing:
+    """
+    Consistent hash ring over shards 0..n-1. Changing n only moves the keys
+    whose nearest virtual node belongs to an added or removed shard.
+    """
+
+    def __init__(self, shards: int, vnodes: int = 64):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        points = sorted(
+            (_hash(f"shard-{shard}-{v}"), shard)
+            for shard in range(shards)
+            for v in range(vnodes)
+        )
+        self.shards = shards
+        self._keys = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_of(self, key: str) -> int:
+        i = bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._shards[i]
+
+
+# -----------------------------
+# 🛰️ Worker process
+# -----------------------------
+
+
+class _Forget:
+    """
+    Runs a task's coroutine inside the worker and drops the task from `coros`
+    once it has no next run, so finished tasks do not pile up there.
+    """
+
+    def __init__(self, coro: Coro, coros: Dict[str, Coro]):
+        self.coro = coro
+        self.coros = coros
+
+    async def __call__(self, task_id: str) -> Optional[datetime]:
+        result = None
+        try:
+            result = await self.coro(task_id)
+            return result
+        finally:
+            # a failed run is dropped by the backends too
+            if result is None and self.coros.get(task_id) is self.coro:
+                del self.coros[task_id]
+
+
+def _worker_main(
+    conn: Connection, shard: int, vnodes: int, make_backend: BackendFactory
+) -> None:
+    asyncio.run(_serve(conn, shard, vnodes, make_backend))
+
+
+async def _serve(
+    conn: Connection, shard: int, vnodes: int, make_backend: BackendFactory
+) -> None:
+    backend = make_backend()
+    # coroutines are kept here too, so tasks can be handed over on resize
+    coros: Dict[str, Coro] = {}
+    inbox: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    def on_readable() -> None:
+        try:
+            inbox.put_nowait(conn.recv())
+        except EOFError:
+            loop.remove_reader(conn.fileno())
+            inbox.put_nowait(None)
+
+    loop.add_reader(conn.fileno(), on_readable)
+    await backend.start()
+
+    async def export(shards: int) -> List[Tuple[str, Coro, datetime]]:
+        ring = HashRing(shards, vnodes)
+        moved: List[Tuple[str, Coro, datetime]] = []
+        for task_id in list(coros):
+            run_at = await backend.next_run(task_id)
+            if run_at is None:
+                del coros[task_id]
+            elif ring.shard_of(task_id) != shard:
+                await backend.cancel(task_id)
+                moved.append((task_id, coros.pop(task_id), run_at))
+        return moved
+
+    while True:
+        msg = await inbox.get()
+        if msg is None:
+            break
+        req_id, op, args = msg
+        try:
+            if op == "schedule":
+                task_id, coro, run_at = args
+                await backend.schedule(task_id, _Forget(coro, coros), run_at)
+                coros[task_id] = coro
+                result: Any = None
+            elif op == "schedule_many":
+                coro, tasks = args
+                await backend.schedule_many(_Forget(coro, coros), tasks)
+                coros.update((task_id, coro) for task_id, _ in tasks)
+                result = None
+            elif op == "cancel":
+                coros.pop(args[0], None)
+                result = await backend.cancel(args[0])
+            elif op == "cancel_many":
+                for task_id in args[0]:
+                    coros.pop(task_id, None)
+                result = await backend.cancel_many(args[0])
+            elif op == "export":
+                result = await export(*args)
+            elif op == "tracked":
+                result = len(coros)
+            elif op == "stop":
+                break
+            else:
+                result = await getattr(backend, op)(*args)
+            conn.send((req_id, True, result))
+        except Exception as e:
+            conn.send((req_id, False, e))
+
+    loop.remove_reader(conn.fileno())
+    await backend.stop()
+    if msg is not None:
+        conn.send((msg[0], True, None))
+    conn.close()
+
+
+# -----------------------------
+# 🔀 Sharded front-end
+# -----------------------------
+
+
+class ShardedTaskScheduler(TaskSchedulerProtocol):
+    """
+    Routes every task id to one of N worker processes, each running its own
+    backend from `make_backend`. `make_backend` and every scheduled coroutine
+    must be picklable (module level functions or classes): the coroutine runs
+    inside the worker, so it should open its own resources there.
+    """
+
+    def __init__(
+        self,
+        shards: int,
+        make_backend: BackendFactory,
+        vnodes: int = 64,
+        mp_context: str = "spawn",
+    ):
+        self._ring = HashRing(shards, vnodes)
+        self._vnodes = vnodes
+        self._make_backend = make_backend
+        self._ctx = multiprocessing.get_context(mp_context)
+        self._workers: List[Tuple[BaseProcess, Connection]] = []
+        self._pending: Dict[int, Tuple[Connection, asyncio.Future]] = {}
+        self._ids = itertools.count()
+        self.logger = logging.getLogger("ShardedScheduler")
+
+    @property
+    def shards(self) -> int:
+        return self._ring.shards
+
+    async def start(self) -> None:
+        if not self._workers:
+            self._spawn(range(self._ring.shards))
+
+    async def stop(self) -> None:
+        await asyncio.gather(
+            *(self._call(i, "stop") for i in range(len(self._workers)))
+        )
+        await self._join(0)
+
+    async def schedule(self, task_id: str, coro: Coro, run_at: datetime) -> None:
+        await self._call(
+            self._ring.shard_of(task_id), "schedule", task_id, coro, run_at
+        )
+
+    async def schedule_many(
+        self, coro: Coro, tasks: List[Tuple[str, datetime]]
+    ) -> None:
+        # duplicates within the batch are caught here, clashes by each shard
+        check_new_tasks(tasks, ())
+        by_shard: Dict[int, List[Tuple[str, datetime]]] = {}
+        for task in tasks:
+            by_shard.setdefault(self._ring.shard_of(task[0]), []).append(task)
+        await asyncio.gather(
+            *(
+                self._call(shard, "schedule_many", coro, part)
+                for shard, part in by_shard.items()
+            )
+        )
+
+    async def cancel(self, task_id: str) -> None:
+        await self._call(self._ring.shard_of(task_id), "cancel", task_id)
+
+    async def cancel_many(self, task_ids: List[str]) -> None:
+        await asyncio.gather(
+            *(
+                self._call(shard, "cancel_many", part)
+                for shard, part in self._split(task_ids).items()
+            )
+        )
+
+    async def reschedule(self, task_id: str, run_at: datetime) -> None:
+        await self._call(self._ring.shard_of(task_id), "reschedule", task_id, run_at)
+
+    async def is_active(self, task_id: str) -> bool:
+        return await self._call(self._ring.shard_of(task_id), "is_active", task_id)
+
+    async def next_run(self, task_id: str) -> Optional[datetime]:
+        return await self._call(self._ring.shard_of(task_id), "next_run", task_id)
+
+    async def next_run_many(self, task_ids: List[str]) -> Dict[str, Optional[datetime]]:
+        parts = await asyncio.gather(
+            *(
+                self._call(shard, "next_run_many", part)
+                for shard, part in self._split(task_ids).items()
+            )
+        )
+        found = {task_id: run_at for part in parts for task_id, run_at in part.items()}
+        return {task_id: found.get(task_id) for task_id in task_ids}
+
+    async def resize(self, shards: int) -> int:
+        """Changes the number of workers, moving only the owners whose shard changed."""
+        old = self._ring.shards
+        self._ring = HashRing(shards, self._vnodes)
+        if shards > old:
+            self._spawn(range(old, shards))
+
+        exported = await asyncio.gather(
+            *(self._call(i, "export", shards) for i in range(old))
+        )
+        moved = [task for tasks in exported for task in tasks]
+        for task_id, coro, run_at in moved:
+            await self.schedule(task_id, coro, run_at)
+
+        if shards < old:
+            await asyncio.gather(*(self._call(i, "stop") for i in range(shards, old)))
+            await self._join(shards)
+
+        self.logger.info(f"Resized from {old} to {shards} shards, moved {len(moved)}")
+        return len(moved)
+
+    def _split(self, task_ids: List[str]) -> Dict[int, List[str]]:
+        by_shard: Dict[int, List[str]] = {}
+        for task_id in task_ids:
+            by_shard.setdefault(self._ring.shard_of(task_id), []).append(task_id)
+        return by_shard
+
+    def _spawn(self, shards: range) -> None:
+        loop = asyncio.get_running_loop()
+        for shard in shards:
+            parent, child = self._ctx.Pipe()
+            proc = self._ctx.Process(
+                target=_worker_main,
+                args=(child, shard, self._vnodes, self._make_backend),
+                daemon=True,
+            )
+            proc.start()
+            child.close()
+            loop.add_reader(parent.fileno(), self._on_reply, parent)
+            self._workers.append((proc, parent))
+
+    async def _join(self, keep: int) -> None:
+        loop = asyncio.get_running_loop()
+        leaving = self._workers[keep:]
+        del self._workers[keep:]
+        for proc, conn in leaving:
+            loop.remove_reader(conn.fileno())
+            conn.close()
+        # joined off the loop: other tasks keep running while shards exit
+        await asyncio.gather(
+            *(loop.run_in_executor(None, proc.join) for proc, _ in leaving)
+        )
+
+    def _on_reply(self, conn: Connection) -> None:
+        try:
+            req_id, ok, value = conn.recv()
+        except EOFError:
+            asyncio.get_running_loop().remove_reader(conn.fileno())
+            for req_id, (sent_to, fut) in list(self._pending.items()):
+                if sent_to is conn:
+                    del self._pending[req_id]
+                    fut.set_exception(ConnectionError("scheduler worker exited"))
+            return
+        _, fut = self._pending.pop(req_id, (conn, None))
+        if fut is None or fut.done():
+            return
+        if ok:
+            fut.set_result(value)
+        else:
+            fut.set_exception(value)
+
+    async def _call(self, shard: int, op: str, *args: Any) -> Any:
+        req_id = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        conn = self._workers[shard][1]
+        self._pending[req_id] = (conn, fut)
+        conn.send((req_id, op, args))
+        return await fut
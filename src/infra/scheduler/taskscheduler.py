@@ -1,9 +1,15 @@
 import asyncio
+import heapq
+import itertools
 import logging
+import time
 from contextlib import suppress
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Awaitable, Callable, Optional
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from infra.scheduler.metrics import NULL_METRICS, SchedulerMetrics
+from infra.scheduler.scheduler import check_new_tasks
 
 
 @dataclass
@@ -12,13 +18,52 @@ class Task:
     task: asyncio.Task
     event: asyncio.Event
     next_run: datetime
+    coro: Optional[Callable[[str], Awaitable[Optional[datetime]]]] = None
+    firing: bool = False
+
+
+class LoopEntry:
+    """An owner in single-loop mode: no task, event or timer of its own."""
+
+    __slots__ = ("id", "coro", "next_run", "seq", "firing")
+
+    def __init__(
+        self,
+        id: str,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        next_run: datetime,
+    ):
+        self.id = id
+        self.coro = coro
+        self.next_run = next_run
+        # sequence number of the live heap entry, -1 when not queued
+        self.seq = -1
+        self.firing: Optional[asyncio.Task] = None
 
 
 @dataclass
 class AsyncioTaskScheduler:
-    tasks: dict[str, Task] = field(default_factory=dict)
+    """
+    By default every owner gets its own long-lived asyncio.Task, Event and
+    wait_for timer. With `single_loop=True` all owners share one driver task
+    and one timer: owners live in a heap, a fire runs in a short-lived task,
+    and re-scheduling after a fire is a heap push without the lock.
+
+    Besides add_task / remove_task / is_running it implements
+    TaskSchedulerProtocol, so it can be used wherever the other backends are.
+    """
+
+    tasks: dict[str, Task | LoopEntry] = field(default_factory=dict)
     logger: logging.Logger = field(default_factory=logging.getLogger)
+    single_loop: bool = False
+    metrics: SchedulerMetrics = NULL_METRICS
     _lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    _queue: list[tuple[datetime, int, LoopEntry]] = field(default_factory=list)
+    _seq: Iterator[int] = field(default_factory=itertools.count)
+    _wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    _driver: Optional[asyncio.Task] = None
+    # heap entries of owners removed or rescheduled while queued, not yet popped
+    _stale: int = 0
 
     def _log(self, msg: str) -> None:
         self.logger.info(msg)
@@ -33,6 +78,31 @@ class AsyncioTaskScheduler:
         if next_run <= datetime.now():
             raise ValueError("next_run must be in the future")
 
+        await self.schedule(task_id, coro, next_run)
+
+    # -----------------------------
+    # TaskSchedulerProtocol
+    # -----------------------------
+
+    async def start(self) -> None:
+        # owners start waiting as soon as they are added
+        pass
+
+    async def stop(self) -> None:
+        await self.cancel_many(list(self.tasks))
+
+    async def schedule(
+        self,
+        task_id: str,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        run_at: datetime,
+    ) -> None:
+        # unlike add_task, a run_at in the past fires right away
+        next_run = run_at
+        if self.single_loop:
+            self._add_entry(task_id, coro, next_run)
+            return
+
         async with self._lock:
             if task_id in self.tasks:
                 self.logger.warning(f"Task '{task_id}' already exists.")
@@ -55,8 +125,15 @@ class AsyncioTaskScheduler:
                             except asyncio.TimeoutError:
                                 pass  # Timeout occurred, continue task
 
+                        self.metrics.fired(
+                            (datetime.now() - scheduled_time).total_seconds()
+                        )
+                        started = time.perf_counter()
+                        this.firing = True
                         try:
                             result = await coro(task_id)
+                            this.firing = False
+                            self.metrics.executed(time.perf_counter() - started, True)
                             if result is None:
                                 self.logger.info(
                                     f"Task '{task_id}' finished (returned None)"
@@ -68,29 +145,106 @@ class AsyncioTaskScheduler:
                             async with self._lock:
                                 if task_id in self.tasks:
                                     self.tasks[task_id].next_run = scheduled_time
+                            self.metrics.rescheduled()
 
                             self.logger.info(
                                 f"Task '{task_id}' re-scheduled for '{scheduled_time}'"
                             )
                         except Exception as e:
+                            self.metrics.executed(time.perf_counter() - started, False)
                             self.logger.error(
                                 f"Error during task '{task_id}': {e}", exc_info=True
                             )
                             break  # Stop execution if an error occurs
                 finally:
                     async with self._lock:
-                        self.tasks.pop(task_id, None)
+                        if self.tasks.get(task_id) is this:
+                            del self.tasks[task_id]
+                        self.metrics.queue(len(self.tasks))
                     self.logger.info(f"Task '{task_id}' removed from scheduler")
 
             task = asyncio.create_task(_run())
-            self.tasks[task_id] = Task(
-                id=task_id, task=task, event=stop_event, next_run=next_run
+            this = Task(
+                id=task_id, task=task, event=stop_event, next_run=next_run, coro=coro
             )
+            self.tasks[task_id] = this
+            self.metrics.queue(len(self.tasks))
             self.logger.info(
                 f"Task '{task_id}' added to scheduler (next run: {next_run})"
             )
 
+    async def cancel(self, task_id: str) -> None:
+        await self.remove_task(task_id)
+
+    async def reschedule(self, task_id: str, run_at: datetime) -> None:
+        task = self.tasks.get(task_id)
+        if task is None or (task.firing if isinstance(task, Task) else task.seq < 0):
+            raise ValueError(f"Task '{task_id}' is not queued")
+
+        if isinstance(task, LoopEntry):
+            # lock-free: the old heap entry goes stale, a new one is pushed
+            task.next_run = run_at
+            self._push(task)
+            self._went_stale()
+        else:
+            # the owner's task sleeps on its own timer: start it over
+            assert task.coro is not None
+            await self.remove_task(task_id)
+            await self.schedule(task_id, task.coro, run_at)
+        self.metrics.rescheduled()
+
+    async def is_active(self, task_id: str) -> bool:
+        return task_id in self.tasks
+
+    async def next_run(self, task_id: str) -> Optional[datetime]:
+        task = self.tasks.get(task_id)
+        return task.next_run if task else None
+
+    async def schedule_many(
+        self,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        tasks: List[Tuple[str, datetime]],
+    ) -> None:
+        check_new_tasks(tasks, self.tasks)
+        if self.single_loop:
+            self._add_entries(coro, tasks)
+            return
+        for task_id, run_at in tasks:
+            await self.schedule(task_id, coro, run_at)
+
+    async def cancel_many(self, task_ids: List[str]) -> None:
+        if self.single_loop:
+            await self._remove_entries(task_ids)
+            return
+
+        async with self._lock:
+            removed = [self.tasks.pop(task_id, None) for task_id in task_ids]
+        running = [task_obj.task for task_obj in removed if task_obj is not None]
+        for task_obj in removed:
+            if task_obj is not None:
+                task_obj.event.set()
+                task_obj.task.cancel()
+        # stop them all, then wait for them together
+        if running:
+            await asyncio.wait(running, timeout=5.0)
+        self.logger.info(f"{len(running)} tasks removed")
+
+    async def next_run_many(self, task_ids: List[str]) -> Dict[str, Optional[datetime]]:
+        tasks = self.tasks
+        return {
+            task_id: tasks[task_id].next_run if task_id in tasks else None
+            for task_id in task_ids
+        }
+
+    # -----------------------------
+    # add_task API
+    # -----------------------------
+
     async def remove_task(self, task_id: str) -> None:
+        if self.single_loop:
+            await self._remove_entry(task_id)
+            return
+
         async with self._lock:
             task_obj = self.tasks.get(task_id)
             if not task_obj:
@@ -99,6 +253,8 @@ class AsyncioTaskScheduler:
 
             task_obj.event.set()  # Signal the task to stop
             task_obj.task.cancel()  # Cancel the asyncio task
+            # a task cancelled before it first ran never reaches its finally
+            del self.tasks[task_id]
 
         # Wait for the task to complete without blocking the lock
         with suppress(asyncio.CancelledError, asyncio.TimeoutError):
@@ -107,10 +263,164 @@ class AsyncioTaskScheduler:
         self.logger.info(f"Task '{task_id}' successfully removed")
 
     async def is_running(self, task_id: str) -> bool:
+        if self.single_loop:
+            return task_id in self.tasks
+
         async with self._lock:
             task = self.tasks.get(task_id)
             return task is not None and not task.task.done()
 
+    # -----------------------------
+    # single-loop mode
+    # -----------------------------
+
+    # Everything below runs on the event loop without awaiting between the
+    # check and the update, so it needs no lock.
+
+    def _add_entry(
+        self,
+        task_id: str,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        next_run: datetime,
+    ) -> None:
+        if task_id in self.tasks:
+            self.logger.warning(f"Task '{task_id}' already exists.")
+            raise ValueError(f"Task '{task_id}' already exists")
+
+        entry = LoopEntry(task_id, coro, next_run)
+        self.tasks[task_id] = entry
+        self._push(entry)
+        self._start_driver()
+        self.logger.info(f"Task '{task_id}' added to scheduler (next run: {next_run})")
+
+    def _add_entries(
+        self,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        tasks: List[Tuple[str, datetime]],
+    ) -> None:
+        # ids were checked by schedule_many
+        queue = self._queue
+        items = []
+        for task_id, run_at in tasks:
+            entry = LoopEntry(task_id, coro, run_at)
+            entry.seq = next(self._seq)
+            self.tasks[task_id] = entry
+            items.append((run_at, entry.seq, entry))
+        if not items:
+            return
+
+        head = queue[0][0] if queue else None
+        if len(items) * 4 >= len(queue):
+            # a large batch: one O(n) heapify beats a push per item
+            queue.extend(items)
+            heapq.heapify(queue)
+        else:
+            for item in items:
+                heapq.heappush(queue, item)
+        if head is None or queue[0][0] < head:
+            self._wakeup.set()
+        self._start_driver()
+        self.logger.info(f"{len(items)} tasks added to scheduler")
+
+    def _start_driver(self) -> None:
+        if self._driver is None or self._driver.done():
+            self._driver = asyncio.create_task(self._drive())
+
+    async def _remove_entry(self, task_id: str) -> None:
+        if task_id not in self.tasks:
+            self.logger.warning(f"Tried to remove inexistent task '{task_id}'")
+            return
+        await self._remove_entries([task_id])
+        self.logger.info(f"Task '{task_id}' successfully removed")
+
+    async def _remove_entries(self, task_ids: List[str]) -> None:
+        stale = 0
+        firing = []
+        for task_id in task_ids:
+            entry = self.tasks.pop(task_id, None)
+            if not isinstance(entry, LoopEntry):
+                continue
+            # the heap entry becomes stale and is dropped when it reaches the
+            # top, or by the compaction below
+            if entry.seq >= 0:
+                stale += 1
+            entry.seq = -1
+            if entry.firing is not None:
+                entry.firing.cancel()
+                firing.append(entry.firing)
+        if stale:
+            self._went_stale(stale)
+        self._wakeup.set()
+        if firing:
+            await asyncio.wait(firing, timeout=5.0)
+
+    def _push(self, entry: LoopEntry) -> None:
+        entry.seq = next(self._seq)
+        if not self._queue or entry.next_run < self._queue[0][0]:
+            self._wakeup.set()
+        heapq.heappush(self._queue, (entry.next_run, entry.seq, entry))
+
+    def _went_stale(self, n: int = 1) -> None:
+        # lazy deletion leaves dead entries until they reach the top: rebuild
+        # the heap once they are half of it, so churn cannot grow it unbounded
+        self._stale += n
+        queue = self._queue
+        if self._stale > len(queue) // 2:
+            queue[:] = [item for item in queue if item[2].seq == item[1]]
+            heapq.heapify(queue)
+            self._stale = 0
+
+    async def _drive(self) -> None:
+        queue = self._queue
+        while self.tasks:
+            while queue and queue[0][2].seq != queue[0][1]:
+                heapq.heappop(queue)  # removed or rescheduled since
+                self._stale -= 1
+            self.metrics.queue(len(queue) - self._stale, self._stale)
+
+            self._wakeup.clear()
+            if not queue:
+                # only owners that are firing right now: wait for their push
+                await self._wakeup.wait()
+                continue
+
+            delay = (queue[0][0] - datetime.now()).total_seconds()
+            if delay > 0:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                continue
+
+            run_at, _, entry = heapq.heappop(queue)
+            entry.seq = -1
+            self.metrics.fired((datetime.now() - run_at).total_seconds())
+            entry.firing = asyncio.create_task(self._fire(entry))
+
+    async def _fire(self, entry: LoopEntry) -> None:
+        task_id = entry.id
+        started = time.perf_counter()
+        ok = True
+        try:
+            result = await entry.coro(task_id)
+        except Exception as e:
+            ok = False
+            self.logger.error(f"Error during task '{task_id}': {e}", exc_info=True)
+            result = None
+        finally:
+            entry.firing = None
+        self.metrics.executed(time.perf_counter() - started, ok)
+
+        if self.tasks.get(task_id) is not entry:
+            return  # removed while firing
+        if result is None:
+            del self.tasks[task_id]
+            self.logger.info(f"Task '{task_id}' removed from scheduler")
+            return
+
+        entry.next_run = result
+        self._push(entry)
+        self.metrics.rescheduled()
+        self.logger.info(f"Task '{task_id}' re-scheduled for '{result}'")
+
 
 if __name__ == "__main__":
 
@@ -0,0 +1,167 @@
+import asyncio
+import inspect
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.repository.fupgenrepo import FupGenRepository
+from infra.scheduler.scheduler import TaskSchedulerProtocol, check_new_tasks
+
+Coro = Callable[[str], Awaitable[Optional[datetime]]]
+
+
+class ParkFarRuns:
+    """
+    Wraps a task coroutine so a next run beyond the horizon is not re-queued
+    in memory: the task drops out of the backend and is promoted again by the
+    sweep from the next_run the coroutine persisted. A class so it pickles.
+    """
+
+    def __init__(self, coro: Coro, horizon: timedelta):
+        self.coro = coro
+        self.horizon = horizon
+
+    async def __call__(self, task_id: str) -> Optional[datetime]:
+        result = await self.coro(task_id)
+        if result is not None and result > datetime.now() + self.horizon:
+            return None
+        return result
+
+
+class TieredTaskScheduler(TaskSchedulerProtocol):
+    """
+    Keeps only the tasks due within `horizon` in the in-memory `backend`.
+
+    Tasks further out stay in the recurrence table, whose next_run RunTask
+    keeps up to date. Every `sweep_interval` a range query on the next_run
+    index promotes the owners that came within the horizon, so memory follows
+    the near-term load instead of the number of owners.
+
+    Promoted tasks run `coro`, which should be the same coroutine the tasks
+    are scheduled with (RunTask.execute). `cancel` disarms the owner in the
+    repository, so it is not promoted again, restarts included, until
+    `schedule` re-arms its generators at their own next dates. `reschedule`
+    writes the new run to the repository before picking the tier.
+
+    It calls the repository synchronously, so it takes a sync
+    FupGenRepository; an AsyncFupGenRepository is rejected.
+    """
+
+    def __init__(
+        self,
+        backend: TaskSchedulerProtocol,
+        fupgenrepo: FupGenRepository,
+        coro: Coro,
+        horizon: timedelta = timedelta(hours=1),
+        sweep_interval: timedelta = timedelta(minutes=5),
+        chunk_size: int = 10_000,
+    ):
+        if sweep_interval * 2 > horizon:
+            # a task parked just past the horizon must be promoted before it
+            # is due, with a sweep to spare
+            raise ValueError("sweep_interval must be at most half the horizon")
+        if inspect.iscoroutinefunction(fupgenrepo.get_next_runs):
+            raise TypeError("TieredTaskScheduler needs a sync FupGenRepository")
+
+        self._backend = backend
+        self._repo = fupgenrepo
+        self._coro = ParkFarRuns(coro, horizon)
+        self._horizon = horizon
+        self._sweep_interval = sweep_interval
+        self._chunk_size = chunk_size
+        self._loop_task: Optional[asyncio.Task] = None
+        self._running = False
+        self.logger = logging.getLogger("TieredScheduler")
+
+    async def start(self) -> None:
+        if not self._running:
+            self._running = True
+            await self._backend.start()
+            await self.sweep()
+            self._loop_task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._loop_task:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+        await self._backend.stop()
+
+    async def schedule(self, task_id: str, coro: Coro, run_at: datetime) -> None:
+        if await self._backend.is_active(task_id):
+            raise ValueError(f"Task '{task_id}' already scheduled")
+        self._repo.arm([task_id])
+        if self._is_near(run_at):
+            await self._backend.schedule(
+                task_id, ParkFarRuns(coro, self._horizon), run_at
+            )
+
+    async def schedule_many(
+        self, coro: Coro, tasks: List[Tuple[str, datetime]]
+    ) -> None:
+        queued = await self._backend.next_run_many([task_id for task_id, _ in tasks])
+        check_new_tasks(tasks, [task_id for task_id, at in queued.items() if at])
+        self._repo.arm([task_id for task_id, _ in tasks])
+        near = [(task_id, run_at) for task_id, run_at in tasks if self._is_near(run_at)]
+        await self._backend.schedule_many(ParkFarRuns(coro, self._horizon), near)
+
+    async def cancel(self, task_id: str) -> None:
+        self._repo.disarm([task_id])
+        await self._backend.cancel(task_id)
+
+    async def cancel_many(self, task_ids: List[str]) -> None:
+        self._repo.disarm(task_ids)
+        await self._backend.cancel_many(task_ids)
+
+    async def reschedule(self, task_id: str, run_at: datetime) -> None:
+        # the sweep promotes from the repository, so it must hold run_at too
+        persisted = self._repo.reschedule(task_id, run_at)
+        if await self._backend.is_active(task_id):
+            if self._is_near(run_at):
+                await self._backend.reschedule(task_id, run_at)
+            else:
+                await self._backend.cancel(task_id)
+            return
+        if not persisted:
+            raise ValueError(f"Task '{task_id}' is not queued")
+        if self._is_near(run_at):
+            await self._backend.schedule(task_id, self._coro, run_at)
+
+    async def is_active(self, task_id: str) -> bool:
+        return await self.next_run(task_id) is not None
+
+    async def next_run(self, task_id: str) -> Optional[datetime]:
+        return (await self.next_run_many([task_id]))[task_id]
+
+    async def next_run_many(self, task_ids: List[str]) -> Dict[str, Optional[datetime]]:
+        found = await self._backend.next_run_many(task_ids)
+        parked = [task_id for task_id, run_at in found.items() if run_at is None]
+        if parked:
+            found.update(self._repo.get_next_runs(parked))
+        return found
+
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """Promotes the parked owners due within the horizon. Returns how many."""
+        before = (now or datetime.now()) + self._horizon
+        promoted = 0
+        for chunk in self._repo.iter_next_runs(self._chunk_size, before=before):
+            queued = await self._backend.next_run_many([owner for owner, _ in chunk])
+            tasks = [
+                (owner, next_run) for owner, next_run in chunk if queued[owner] is None
+            ]
+            await self._backend.schedule_many(self._coro, tasks)
+            promoted += len(tasks)
+        if promoted:
+            self.logger.info(f"Promoted {promoted} owners due before {before}")
+        return promoted
+
+    async def _sweep_loop(self) -> None:
+        while self._running:
+            await asyncio.sleep(self._sweep_interval.total_seconds())
+            try:
+                await self.sweep()
+            except Exception as e:
+                self.logger.error(f"Sweep failed: {e}", exc_info=True)
+
+    def _is_near(self, run_at: datetime) -> bool:
+        return run_at <= datetime.now() + self._horizon
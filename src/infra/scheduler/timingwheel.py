@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from infra.scheduler.jitter import batch_next_run
+from infra.scheduler.metrics import NULL_METRICS, SchedulerMetrics
+from infra.scheduler.scheduler import (
+    BatchCoro,
+    TaskSchedulerProtocol,
+    check_new_tasks,
+)
+
+_US = timedelta(microseconds=1)
+
+
+class WheelEntry:
+    __slots__ = ("task_id", "coro", "run_at", "due_tick", "level", "slot")
+
+    def __init__(
+        self,
+        task_id: str,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        run_at: datetime,
+    ):
+        self.task_id = task_id
+        self.coro = coro
+        self.run_at = run_at
+        self.due_tick = 0
+        # level == -1 means the entry is not in the wheel (firing or removed)
+        self.level = -1
+        self.slot = -1
+
+
+class TimingWheelTaskScheduler(TaskSchedulerProtocol):
+    """
+    Hierarchical timing wheel: O(1) schedule, cancel and expiry.
+
+    Time is split in ticks of `resolution`. Level 0 holds the next `slots` ticks,
+    each higher level covers `slots` times the range of the level below and is
+    cascaded down when the lower level wraps. Tasks fire at most one tick late
+    (one coalesce window late in coalescing mode).
+    """
+
+    def __init__(
+        self,
+        resolution: timedelta = timedelta(milliseconds=100),
+        slots: int = 64,
+        levels: int = 4,
+        batch_coro: Optional[BatchCoro] = None,
+        coalesce_window: timedelta = timedelta(0),
+        max_batch: int = 1000,
+    ):
+        if slots < 2 or slots & (slots - 1):
+            raise ValueError("slots must be a power of two")
+        if levels < 1:
+            raise ValueError("levels must be at least 1")
+        if resolution <= timedelta(0):
+            raise ValueError("resolution must be positive")
+
+        self._resolution = resolution
+        self._res_us = resolution // _US
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._levels = levels
+        self._span = 1 << (self._bits * levels)
+
+        self._origin = datetime.now()
+        self._tick = 0
+        self._wheels: List[List[Dict[str, WheelEntry]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._tasks: Dict[str, WheelEntry] = {}
+
+        # coalescing mode: due ticks are rounded up to whole windows, so every
+        # task due in the same window fires through one batch_coro call
+        self._batch_coro = batch_coro
+        self._window_ticks = max(1, -(-coalesce_window // resolution))
+        self._max_batch = max_batch
+
+        self._loop_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._running = False
+        self.logger = logging.getLogger("TimingWheel")
+        self.metrics: SchedulerMetrics = NULL_METRICS
+
+    async def start(self) -> None:
+        if not self._running:
+            self._running = True
+            self._loop_task = asyncio.create_task(self._run_loop())
+
+    async def stop(self) -> None:
+        self._running = False
+        self._wakeup.set()
+        if self._loop_task:
+            await self._loop_task
+
+    async def schedule(
+        self,
+        task_id: str,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        run_at: datetime,
+    ) -> None:
+        if task_id in self._tasks:
+            raise ValueError(f"Task '{task_id}' already scheduled")
+
+        entry = WheelEntry(task_id, coro, run_at)
+        self._tasks[task_id] = entry
+        self._insert(entry)
+        self._wakeup.set()
+
+    async def schedule_many(
+        self,
+        coro: Callable[[str], Awaitable[Optional[datetime]]],
+        tasks: List[Tuple[str, datetime]],
+    ) -> None:
+        check_new_tasks(tasks, self._tasks)
+        for task_id, run_at in tasks:
+            entry = WheelEntry(task_id, coro, run_at)
+            self._tasks[task_id] = entry
+            self._insert(entry)
+        self._wakeup.set()
+
+    async def cancel(self, task_id: str) -> None:
+        entry = self._tasks.pop(task_id, None)
+        if entry is not None:
+            self._unlink(entry)
+
+    async def cancel_many(self, task_ids: List[str]) -> None:
+        for task_id in task_ids:
+            entry = self._tasks.pop(task_id, None)
+            if entry is not None:
+                self._unlink(entry)
+
+    async def reschedule(self, task_id: str, run_at: datetime) -> None:
+        entry = self._tasks.get(task_id)
+        if entry is None or entry.level < 0:
+            raise ValueError(f"Task '{task_id}' is not queued")
+
+        self._unlink(entry)
+        entry.run_at = run_at
+        self._insert(entry)
+        self._wakeup.set()
+        self.metrics.rescheduled()
+
+    async def is_active(self, task_id: str) -> bool:
+        return task_id in self._tasks
+
+    async def next_run(self, task_id: str) -> Optional[datetime]:
+        entry = self._tasks.get(task_id)
+        return entry.run_at if entry else None
+
+    async def next_run_many(self, task_ids: List[str]) -> Dict[str, Optional[datetime]]:
+        tasks = self._tasks
+        return {
+            task_id: tasks[task_id].run_at if task_id in tasks else None
+            for task_id in task_ids
+        }
+
+    def _insert(self, entry: WheelEntry) -> None:
+        # rounded up, so a task never fires before its run_at
+        us = (entry.run_at - self._origin) // _US
+        due = -(-us // self._res_us)
+        if self._batch_coro is not None:
+            due = -(-due // self._window_ticks) * self._window_ticks
+        entry.due_tick = due if due > self._tick else self._tick + 1
+        self._place(entry)
+
+    def _place(self, entry: WheelEntry) -> None:
+        tick = entry.due_tick
+        delta = tick - self._tick
+        level = (delta.bit_length() - 1) // self._bits if delta > 0 else 0
+        if level >= self._levels:
+            # beyond the top level: park at its far end and re-place on cascade
+            level = self._levels - 1
+            tick = self._tick + self._span - 1
+
+        slot = (tick >> (self._bits * level)) & self._mask
+        self._wheels[level][slot][entry.task_id] = entry
+        entry.level = level
+        entry.slot = slot
+
+    def _unlink(self, entry: WheelEntry) -> None:
+        if entry.level >= 0:
+            del self._wheels[entry.level][entry.slot][entry.task_id]
+            entry.level = -1
+
+    def _advance(self) -> List[WheelEntry]:
+        self._tick += 1
+        tick = self._tick
+
+        level = 1
+        while level < self._levels and not tick & ((1 << (self._bits * level)) - 1):
+            idx = (tick >> (self._bits * level)) & self._mask
+            bucket = self._wheels[level][idx]
+            self._wheels[level][idx] = {}
+            for entry in bucket.values():
+                self._place(entry)
+            level += 1
+
+        idx = tick & self._mask
+        bucket = self._wheels[0][idx]
+        self._wheels[0][idx] = {}
+        for entry in bucket.values():
+            entry.level = -1
+        return list(bucket.values())
+
+    def _skip_idle(self, until_tick: int) -> None:
+        # next tick, at most until_tick, that cascades a non-empty bucket of a
+        # higher level or reaches a non-empty level 0 slot
+        tick = self._tick
+        target = until_tick
+        for level in range(1, self._levels):
+            shift = self._bits * level
+            for idx, bucket in enumerate(self._wheels[level]):
+                if bucket:
+                    turn = (tick >> shift) + 1
+                    turn += (idx - turn) & self._mask
+                    target = min(target, turn << shift)
+        wheel = self._wheels[0]
+        for t in range(tick + 1, min(target, tick + self._mask + 1)):
+            if wheel[t & self._mask]:
+                target = t
+                break
+        self._tick = target - 1
+
+    async def _run_loop(self) -> None:
+        while self._running:
+            self.metrics.queue(len(self._tasks))
+            if not self._tasks:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = datetime.now()
+            now_tick = (now - self._origin) // self._resolution
+            if now_tick <= self._tick:
+                next_tick_at = self._origin + (self._tick + 1) * self._resolution
+                try:
+                    self._wakeup.clear()
+                    await asyncio.wait_for(
+                        self._wakeup.wait(),
+                        timeout=(next_tick_at - now).total_seconds(),
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            while self._tick < now_tick and self._running:
+                if now_tick - self._tick > 1:
+                    # catching up (after a busy tick or an idle stretch): jump
+                    # over the ticks with nothing to fire or cascade
+                    self._skip_idle(now_tick)
+                due = self._advance()
+                if self._batch_coro is None:
+                    for entry in due:
+                        await self._fire(entry)
+                    continue
+                for i in range(0, len(due), self._max_batch):
+                    await self._fire_batch(due[i : i + self._max_batch])
+
+    async def _fire(self, entry: WheelEntry) -> None:
+        self.metrics.fired((datetime.now() - entry.run_at).total_seconds())
+        started = time.perf_counter()
+        ok = True
+        result: Optional[datetime] = None
+        try:
+            result = await entry.coro(entry.task_id)
+        except Exception as e:
+            ok = False
+            self.logger.error(f"Error in task '{entry.task_id}': {e}", exc_info=True)
+        self.metrics.executed(time.perf_counter() - started, ok)
+        self._finish(entry, result)
+
+    async def _fire_batch(self, batch: List[WheelEntry]) -> None:
+        assert self._batch_coro is not None
+        now = datetime.now()
+        for entry in batch:
+            self.metrics.fired((now - entry.run_at).total_seconds())
+        started = time.perf_counter()
+        ok = True
+        results: Dict[str, Optional[datetime]] = {}
+        try:
+            results = await self._batch_coro([entry.task_id for entry in batch])
+        except Exception as e:
+            ok = False
+            self.logger.error(
+                f"Error in batch of {len(batch)} tasks: {e}", exc_info=True
+            )
+        self.metrics.executed(time.perf_counter() - started, ok)
+        for entry in batch:
+            self._finish(
+                entry,
+                batch_next_run(entry.coro, entry.task_id, results.get(entry.task_id)),
+            )
+
+    def _finish(self, entry: WheelEntry, result: Optional[datetime]) -> None:
+        if self._tasks.get(entry.task_id) is not entry:
+            # cancelled (or replaced) while running
+            return
+        if result:
+            entry.run_at = result
+            self._insert(entry)
+            self.metrics.rescheduled()
+        else:
+            del self._tasks[entry.task_id]
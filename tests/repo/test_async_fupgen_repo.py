@@ -0,0 +1,183 @@
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.usecase.fup.createfupgen import CreateFupGenerator, CreateFupGenerators
+from app.usecase.task.forecast import Forecast
+from app.usecase.task.runtask import RunTask
+from app.usecase.task.warmstart import WarmStart
+from domain.entity.channel import Channel
+from domain.entity.fupgen import FupGenInput
+from domain.entity.recurrence import RecurrenceConfig
+from infra.db.db import make_async_session, make_session
+from infra.db.models.base import Base
+from infra.db.models.fup import fup
+from infra.db.models.occurrence import Occurrence
+from infra.recurrence.cursor import cursor_factory
+from infra.repository.asyncfupgenrepo import AsyncFupGenRepository
+from infra.repository.fupgenrepo import FupGenRepository
+from infra.repository.fuprepo import AsyncFupRepository
+from infra.scheduler.dbqueue import DBQueueTaskScheduler
+from infra.scheduler.scheduler import HeapqTaskScheduler
+from infra.scheduler.tiered import TieredTaskScheduler
+
+
+def make_inputs(ownerid: str, n: int) -> list[FupGenInput]:
+    return [
+        FupGenInput(
+            hookid="hook",
+            ownerid=ownerid,
+            name=f"gen{i}",
+            channel=[Channel(id="a", type="email", configdata={"i": i})],
+            recurconfig=RecurrenceConfig(
+                freq="DAILY",
+                dtstart=datetime(2025, 5, 1) + timedelta(days=i),
+                allow_infinite=True,
+            ),
+            msg=f"message {i}",
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def url(tmp_path: Path) -> str:
+    return f"sqlite+aiosqlite:///{tmp_path / 'ups.db'}"
+
+
+@pytest_asyncio.fixture
+async def sessions(url: str) -> async_sessionmaker[AsyncSession]:
+    factory = await make_async_session(url, Base, pool_size=2, max_overflow=2)
+    yield factory
+    await factory.kw["bind"].dispose()
+
+
+@pytest.fixture
+def repo(sessions: async_sessionmaker[AsyncSession]) -> AsyncFupGenRepository:
+    return AsyncFupGenRepository(
+        sessions=sessions,
+        make_recurrence=cursor_factory,
+        make_id=lambda: str(uuid4()),
+    )
+
+
+@pytest.mark.asyncio
+async def test_reads_match_the_sync_repository(repo: AsyncFupGenRepository, url: str):
+    assert await repo.create_many(make_inputs("a", 3) + make_inputs("b", 2)) == {
+        "a": datetime(2025, 5, 2),
+        "b": datetime(2025, 5, 2),
+    }
+    await repo.create(make_inputs("c", 1)[0])
+
+    sync = FupGenRepository(
+        db=make_session(url.replace("+aiosqlite", ""), Base)(),
+        make_recurrence=cursor_factory,
+        make_id=lambda: str(uuid4()),
+    )
+
+    def key(f):
+        return (f.id, f.msg, [c.configdata for c in f.channel], f.scheduler.config)
+
+    for ownerid in ("a", "b", "c"):
+        assert sorted(map(key, await repo.get_fupgen(ownerid, True))) == sorted(
+            map(key, sync.get_fupgen(ownerid, True))
+        )
+    owners = ["a", "b", "c"]
+    assert await repo.get_next_runs(owners) == sync.get_next_runs(owners)
+    assert await repo.get_due(datetime(2025, 5, 4), 10) == sync.get_due(
+        datetime(2025, 5, 4), 10
+    )
+    assert [chunk async for chunk in repo.iter_next_runs(2)] == list(
+        sync.iter_next_runs(2)
+    )
+    assert await repo.get_fupgen_id_by_owner_name(
+        "c", "gen0"
+    ) == sync.get_fupgen_id_by_owner_name("c", "gen0")
+
+
+@pytest.mark.asyncio
+async def test_update_config_and_occurrences(repo: AsyncFupGenRepository):
+    repo.occurrence_depth = 3
+    await repo.create_many(make_inputs("a", 2))
+    first, second = await repo.get_fupgen("a", True)
+
+    await repo.update_config(
+        [
+            (first.id, True, None, datetime(2025, 5, 9), None),
+            (second.id, False, None, datetime(2025, 5, 9), datetime(2025, 5, 10)),
+            ("nonexistent-id", True, 1, None, None),
+        ]
+    )
+
+    assert [f.id for f in await repo.get_fupgen("a", True)] == [second.id]
+    assert await repo.get_next_runs(["a"]) == {"a": datetime(2025, 5, 10)}
+    async with repo.sessions() as db:
+        dates = (
+            await db.execute(select(Occurrence.date).order_by(Occurrence.date))
+        ).scalars()
+        assert list(dates) == [datetime(2025, 5, d) for d in (10, 11, 12)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ticks(repo: AsyncFupGenRepository):
+    owners = [f"owner{i}" for i in range(8)]
+    for ownerid in owners:
+        await repo.create_many(make_inputs(ownerid, 2))
+    fuprepo = AsyncFupRepository(sessions=repo.sessions, make_id=lambda: str(uuid4()))
+    task = RunTask(fupgenrepo=repo, fuprepo=fuprepo, sendgateway=AsyncMock())
+
+    ts = datetime(2025, 5, 4, 12)
+    nexts = await asyncio.gather(*(task.execute(ownerid, ts) for ownerid in owners))
+
+    # both generators of every owner were due, each sends its last date
+    assert nexts == [datetime(2025, 5, 5)] * len(owners)
+    async with repo.sessions() as db:
+        sent = await db.scalar(select(func.count()).select_from(fup))
+    assert sent == 2 * len(owners)
+    assert await repo.get_next_runs(owners) == dict.fromkeys(
+        owners, datetime(2025, 5, 5)
+    )
+
+
+@pytest.mark.asyncio
+async def test_use_cases_await_the_async_repository(repo: AsyncFupGenRepository):
+    scheduler = HeapqTaskScheduler()
+    runtask = RunTask(fupgenrepo=repo, fuprepo=AsyncMock(), sendgateway=AsyncMock())
+
+    create = CreateFupGenerator(fupgenrepo=repo, scheduler=scheduler, runtask=runtask)
+    await create.execute(make_inputs("a", 1)[0])
+    bulk = CreateFupGenerators(fupgenrepo=repo, scheduler=scheduler, runtask=runtask)
+    assert await bulk.execute(make_inputs("b", 2) + make_inputs("c", 1)) == 2
+    assert await scheduler.next_run("a") == datetime(2025, 5, 2)
+
+    restarted = HeapqTaskScheduler()
+    warmstart = WarmStart(
+        fupgenrepo=repo, scheduler=restarted, runtask=runtask, chunk_size=2
+    )
+    assert await warmstart.execute() == 3
+    assert await restarted.next_run_many(["a", "b", "c"]) == dict.fromkeys(
+        ["a", "b", "c"], datetime(2025, 5, 2)
+    )
+
+    forecast = Forecast(fupgenrepo=repo, make_recurrence=cursor_factory)
+    fups = await forecast.execute(
+        "b", until=datetime(2025, 5, 3), ts=datetime(2025, 4, 20)
+    )
+    assert [fup.date.day for fup in fups] == [2, 3, 3]
+
+
+@pytest.mark.asyncio
+async def test_sync_only_schedulers_reject_async_repositories(
+    repo: AsyncFupGenRepository,
+):
+    with pytest.raises(TypeError):
+        TieredTaskScheduler(HeapqTaskScheduler(), repo, AsyncMock())  # type: ignore
+    with pytest.raises(TypeError):
+        DBQueueTaskScheduler(repo.sessions)  # type: ignore
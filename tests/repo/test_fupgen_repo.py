@@ -1,8 +1,11 @@
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from typing import Iterator
 from unittest.mock import MagicMock
 from uuid import uuid4
 
 import pytest
+from sqlalchemy import event
 
 from domain.entity.channel import Channel
 from domain.entity.fupgen import FupGenInput
@@ -218,3 +221,262 @@ def test_update_config_commits(session: Session):
     service.update_config([(fupgen_id, True, 10, datetime.now(), datetime.now())])
 
     assert called["committed"] is True
+
+
+@contextmanager
+def count_statements(session: Session) -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def add_generators(repo: FupGenRepository, ownerid: str, n: int) -> None:
+    for i in range(n):
+        repo.create(
+            FupGenInput(
+                hookid="hook",
+                ownerid=ownerid,
+                name=f"gen{i}",
+                channel=[
+                    Channel(id="a", type="email", configdata={}),
+                    Channel(id="b", type="sms", configdata={}),
+                ],
+                recurconfig=RecurrenceConfig(
+                    freq="DAILY", dtstart=datetime(2025, 1, 1), allow_infinite=True
+                ),
+                msg=f"message {i}",
+            )
+        )
+
+
+def test_get_fupgen_statement_count_is_constant(repo: FupGenRepository):
+    add_generators(repo, "small", 2)
+    add_generators(repo, "large", 40)
+
+    counts = {}
+    for ownerid in ("small", "large"):
+        repo.db.expunge_all()  # nothing from the identity map
+        with count_statements(repo.db) as statements:
+            fupgens = repo.get_fupgen(ownerid, active_only=True)
+        counts[ownerid] = len(statements)
+        assert all(len(f.channel) == 2 for f in fupgens)
+        assert {f.msg[1] for f in fupgens} == {
+            f"message {i}" for i in range(len(fupgens))
+        }
+
+    # the generators with their recurrence, message and data, then the channels
+    assert counts == {"small": 2, "large": 2}
+
+
+def test_get_fupgen_many_statement_count_is_constant(repo: FupGenRepository):
+    owners = [f"owner-{i}" for i in range(10)]
+    for ownerid in owners:
+        add_generators(repo, ownerid, 3)
+    repo.db.expunge_all()
+
+    with count_statements(repo.db) as statements:
+        fupgens = repo.get_fupgen_many(owners, active_only=True)
+
+    assert len(fupgens) == 30
+    assert len(statements) == 2
+
+
+def test_update_config_is_one_statement(repo: FupGenRepository):
+    add_generators(repo, "owner", 20)
+    ids = [f.id for f in repo.get_fupgen("owner", active_only=True)]
+    last_run = datetime(2025, 5, 1)
+    updates = [
+        (id, False, None, last_run, last_run + timedelta(days=i))
+        for i, id in enumerate(ids)
+    ]
+
+    with count_statements(repo.db) as statements:
+        repo.update_config(updates + [("nonexistent-id", True, 1, None, None)])
+
+    assert [s.split()[0] for s in statements] == ["UPDATE"]
+    next_runs = {
+        rec.id: rec.next_run
+        for rec in repo.db.query(Recurrence).filter(Recurrence.id.in_(ids))
+    }
+    assert next_runs == {id: next_run for id, _, _, _, next_run in updates}
+
+
+def make_inputs(ownerid: str, n: int, dtstart: datetime) -> list[FupGenInput]:
+    return [
+        FupGenInput(
+            hookid="hook",
+            ownerid=ownerid,
+            name=f"gen{i}",
+            channel=[Channel(id="a", type="email", configdata={"k": i})],
+            recurconfig=RecurrenceConfig(
+                freq="DAILY", dtstart=dtstart + timedelta(days=i), allow_infinite=True
+            ),
+            msg=f"message {i}",
+            data={"i": i},
+        )
+        for i in range(n)
+    ]
+
+
+def test_create_many_matches_create(repo: FupGenRepository):
+    inputs = make_inputs("bulk", 3, datetime(2025, 5, 1))
+    for input in make_inputs("single", 3, datetime(2025, 5, 1)):
+        repo.create(input)
+
+    next_runs = repo.create_many(inputs)
+
+    assert next_runs == {"bulk": datetime(2025, 5, 2)}
+
+    def shape(ownerid: str):
+        return sorted(
+            (
+                f.name,
+                f.msg[1],
+                f.data[1],
+                [(c.type, c.configdata) for c in f.channel],
+                f.scheduler.config,
+            )
+            for f in repo.get_fupgen(ownerid, active_only=True)
+        )
+
+    assert shape("bulk") == shape("single")
+
+
+def test_create_many_earliest_next_run_per_owner(repo: FupGenRepository):
+    exhausted = RecurrenceConfig(
+        freq="DAILY", dtstart=datetime(2025, 1, 1), until=datetime(2025, 1, 2)
+    )
+    inputs = make_inputs("a", 2, datetime(2025, 6, 1)) + make_inputs(
+        "b", 1, datetime(2025, 5, 1)
+    )
+    inputs.append(inputs[0].model_copy(update={"name": "x", "recurconfig": exhausted}))
+    inputs.append(
+        inputs[0].model_copy(update={"ownerid": "c", "recurconfig": exhausted})
+    )
+
+    assert repo.create_many(inputs) == {
+        "a": datetime(2025, 6, 2),
+        "b": datetime(2025, 5, 2),
+    }
+
+
+def test_create_many_rejects_duplicate_names(repo: FupGenRepository):
+    inputs = make_inputs("owner", 2, datetime(2025, 5, 1))
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        repo.create_many(inputs + inputs[:1])
+    with pytest.raises(ValueError, match="already exists"):
+        repo.create_many(
+            [inputs[0].model_copy(update={"ownerid": "owner1", "name": "Test FupGen"})]
+        )
+
+    # nothing was written
+    assert repo.get_fupgen("owner", active_only=False) == []
+
+
+def test_create_many_is_a_few_statements(repo: FupGenRepository):
+    with count_statements(repo.db) as statements:
+        repo.create_many(make_inputs("owner", 50, datetime(2025, 5, 1)))
+
+    # the name check, then one insert per table
+    assert len(statements) == 6
+    assert len(repo.get_fupgen("owner", active_only=True)) == 50
+
+
+def test_get_due_pages_across_owners(repo: FupGenRepository):
+    start = datetime(2025, 5, 1)
+    for ownerid in ("a", "b", "c"):
+        repo.create_many(make_inputs(ownerid, 4, start))
+    # gen0 and gen1 of every owner share next_run 5/2 and 5/3: ties go by id
+    expected = sorted(
+        (f.scheduler.config.next_run, f.id, f.ownerid)
+        for ownerid in ("a", "b", "c")
+        for f in repo.get_fupgen(ownerid, active_only=True)
+        if f.scheduler.config.next_run < datetime(2025, 5, 4)
+    )
+    exhausted = repo.get_fupgen("c", active_only=True)[0].id
+    repo.update_config([(exhausted, True, None, None, datetime(2025, 5, 2))])
+    expected = [row for row in expected if row[1] != exhausted]
+
+    pages = []
+    cursor = None
+    while True:
+        page = repo.get_due(datetime(2025, 5, 4), limit=2, after_cursor=cursor)
+        if not page:
+            break
+        assert len(page) <= 2
+        pages.extend(page)
+        cursor = (page[-1][2], page[-1][0])
+
+    assert len(expected) == 5
+    assert pages == [(id, ownerid, next_run) for next_run, id, ownerid in expected]
+
+
+def test_get_due_reads_the_due_index(repo: FupGenRepository):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, *args):
+        executed.append((statement, parameters))
+
+    engine = repo.db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    repo.get_due(
+        datetime(2025, 5, 4), limit=10, after_cursor=(datetime(2025, 5, 1), "x")
+    )
+    event.remove(engine, "before_cursor_execute", record)
+
+    statement, parameters = executed[0]
+    conn = repo.db.connection().connection
+    plan = " ".join(
+        row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+    )
+
+    # a covering range scan in keyset order, no sort
+    assert "COVERING INDEX ix_recurrence_due" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_disarm_and_arm_keep_each_generators_cursor(repo: FupGenRepository):
+    start = datetime(2025, 5, 1)
+    repo.create_many(make_inputs("a", 2, start))
+    add_generators(repo, "b", 1)
+    ids = [f.id for f in repo.get_fupgen("a", active_only=True)]
+    # one generator of "a" has already run up to May 19th
+    repo.update_config(
+        [(ids[1], False, None, datetime(2025, 5, 19), datetime(2025, 5, 20))]
+    )
+
+    def next_runs() -> dict[str, datetime | None]:
+        repo.db.expire_all()
+        return {id: repo.db.get(Recurrence, id).next_run for id in ids}
+
+    armed = next_runs()
+    b = repo.get_next_runs(["b"])
+
+    repo.disarm(["a", "ghost"])
+    assert next_runs() == dict.fromkeys(ids)
+    assert repo.get_next_runs(["a", "b"]) == b
+
+    repo.arm(["a", "b"])
+    assert next_runs() == armed
+    assert repo.get_next_runs(["b"]) == b
+
+
+def test_reschedule_moves_the_owners_next_tick(repo: FupGenRepository):
+    add_generators(repo, "a", 2)
+    run_at = datetime(2025, 6, 1)
+
+    assert repo.reschedule("a", run_at)
+    assert repo.get_next_runs(["a"]) == {"a": run_at}
+
+    repo.disarm(["a"])
+    assert not repo.reschedule("a", run_at)
+    assert not repo.reschedule("ghost", run_at)
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import pytest
+
+from domain.entity.channel import Channel
+from domain.entity.fupgen import FupGenInput
+from domain.entity.recurrence import RecurrenceConfig
+from infra.db.db import Session
+from infra.db.models.recurrenceconfig import Recurrence
+from infra.recurrence.rruleadaptor import rrule_factory
+from infra.repository.fupgenrepo import FupGenRepository
+from infra.repository.occurrencerepo import OccurrenceRepository
+
+
+def make_input(ownerid: str, **recurrence) -> FupGenInput:
+    return FupGenInput(
+        hookid="hook",
+        ownerid=ownerid,
+        name=f"{ownerid}-gen",
+        channel=[Channel(id="ch", type="email", configdata={})],
+        recurconfig=RecurrenceConfig(allow_infinite=True, **recurrence),
+        msg="hello",
+    )
+
+
+@pytest.fixture
+def repos(session: Session) -> tuple[FupGenRepository, OccurrenceRepository]:
+    occurrences = OccurrenceRepository(
+        db=session, make_recurrence=rrule_factory, depth=3
+    )
+    fupgens = FupGenRepository(
+        db=session,
+        make_recurrence=rrule_factory,
+        make_id=iter(f"id{i}" for i in range(100)).__next__,
+        occurrences=occurrences,
+    )
+    fupgens.create(make_input("daily", freq="DAILY", dtstart=datetime(2025, 4, 15)))
+    fupgens.create(make_input("weekly", freq="WEEKLY", dtstart=datetime(2025, 4, 16)))
+    return fupgens, occurrences
+
+
+def test_create_fills_next_dates(repos):
+    _, occurrences = repos
+
+    due = occurrences.due_between(datetime(2025, 4, 1), datetime(2025, 5, 7))
+
+    assert due == [
+        ("daily", "id0", datetime(2025, 4, 16)),
+        ("daily", "id0", datetime(2025, 4, 17)),
+        ("daily", "id0", datetime(2025, 4, 18)),
+        ("weekly", "id4", datetime(2025, 4, 23)),
+        ("weekly", "id4", datetime(2025, 4, 30)),
+    ]
+    weekly = occurrences.due_between(
+        datetime(2025, 4, 1), datetime(2025, 6, 1), ownerids=["weekly"]
+    )
+    assert [date.day for _, _, date in weekly] == [23, 30, 7]
+
+
+def test_update_config_refills_incrementally(repos):
+    fupgens, occurrences = repos
+    added = []
+    original = occurrences.make_recurrence
+
+    def counting(config):
+        added.append(config.next_run)
+        return original(config)
+
+    occurrences.make_recurrence = counting
+
+    fupgens.update_config(
+        [("id0", False, None, datetime(2025, 4, 17), datetime(2025, 4, 18))]
+    )
+
+    due = occurrences.due_between(datetime(2025, 4, 1), datetime(2025, 5, 1), ["daily"])
+    assert [date.day for _, _, date in due] == [18, 19, 20]
+    # only the daily generator was evaluated
+    assert added == [datetime(2025, 4, 18)]
+
+
+def test_exhausted_generator_is_dropped(repos):
+    fupgens, occurrences = repos
+
+    fupgens.update_config([("id4", True, None, datetime(2025, 4, 23), None)])
+
+    due = occurrences.due_between(datetime(2025, 4, 1), datetime(2026, 1, 1))
+    assert {owner for owner, _, _ in due} == {"daily"}
+
+
+def test_rebuild_after_rule_change(repos, session: Session):
+    _, occurrences = repos
+    rec = session.get(Recurrence, "id4")
+    rec.interval = 2  # type: ignore
+    rec.next_run = datetime(2025, 4, 30)  # type: ignore
+
+    occurrences.rebuild(["id4"])
+    session.commit()
+
+    due = occurrences.due_between(
+        datetime(2025, 4, 1), datetime(2026, 1, 1), ["weekly"]
+    )
+    assert [date for _, _, date in due] == [
+        datetime(2025, 4, 30),
+        datetime(2025, 5, 14),
+        datetime(2025, 5, 28),
+    ]
+
+
+def test_refill_leaves_the_commit_to_the_caller(repos, session: Session):
+    _, occurrences = repos
+    session.get(Recurrence, "id4").next_run = datetime(2025, 4, 30)  # type: ignore
+
+    occurrences.refill(["id4"])
+    session.rollback()
+
+    weekly = occurrences.due_between(
+        datetime(2025, 4, 1), datetime(2026, 1, 1), ["weekly"]
+    )
+    assert [date.day for _, _, date in weekly] == [23, 30, 7]
@@ -0,0 +1,104 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+
+from infra.scheduler.heap import IndexedHeap
+from infra.scheduler.scheduler import (
+    APSchedulerTaskScheduler,
+    HeapqTaskScheduler,
+    ScheduledTask,
+)
+from infra.scheduler.timingwheel import TimingWheelTaskScheduler
+
+
+async def noop(task_id: str) -> Optional[datetime]:
+    return None
+
+
+@pytest.mark.parametrize("existing,batch", [(1000, 50), (100, 1000), (0, 500)])
+def test_heap_extend_and_remove_many_keep_order(existing: int, batch: int):
+    rnd = random.Random(7)
+    base = datetime(2025, 1, 1)
+    heap: IndexedHeap[ScheduledTask] = IndexedHeap()
+
+    def make(n: int) -> list[ScheduledTask]:
+        return [
+            ScheduledTask(base + timedelta(seconds=rnd.randint(0, 10**6)), "", noop)
+            for _ in range(n)
+        ]
+
+    for task in make(existing):
+        heap.push(task)
+    added = make(batch)
+    heap.extend(added)
+    assert len(heap) == existing + batch
+    assert all(heap_item.index == i for i, heap_item in enumerate(heap))
+
+    gone = rnd.sample(list(heap), (existing + batch) // 2)
+    heap.remove_many(gone)
+    assert all(task.index == -1 for task in gone)
+
+    kept = sorted(t.run_at for t in heap)
+    assert [heap.pop().run_at for _ in range(len(heap))] == kept
+
+
+BACKENDS = {
+    "heapq": HeapqTaskScheduler,
+    "timingwheel": lambda: TimingWheelTaskScheduler(
+        resolution=timedelta(milliseconds=10)
+    ),
+    "apscheduler": APSchedulerTaskScheduler,
+}
+
+
+@pytest.mark.parametrize("make_backend", BACKENDS.values(), ids=BACKENDS.keys())
+@pytest.mark.asyncio
+async def test_bulk_schedule_cancel_and_lookup(make_backend):
+    sch = make_backend()
+    await sch.start()
+    try:
+        run_at = datetime.now() + timedelta(hours=1)
+        tasks = [(f"owner{i}", run_at + timedelta(minutes=i)) for i in range(200)]
+        await sch.schedule_many(noop, tasks)
+
+        found = await sch.next_run_many(["owner3", "owner150", "ghost"])
+        assert [k for k, v in found.items() if v is not None] == ["owner3", "owner150"]
+        assert await sch.is_active("owner199")
+
+        # rejected as a whole: nothing of the batch is queued
+        with pytest.raises(ValueError):
+            await sch.schedule_many(noop, [("new", run_at), ("owner5", run_at)])
+        with pytest.raises(ValueError):
+            await sch.schedule_many(noop, [("new", run_at), ("new", run_at)])
+        assert not await sch.is_active("new")
+
+        await sch.cancel_many([f"owner{i}" for i in range(0, 200, 2)] + ["ghost"])
+        found = await sch.next_run_many([f"owner{i}" for i in range(200)])
+        assert sum(v is not None for v in found.values()) == 100
+        assert found["owner0"] is None and found["owner1"] is not None
+    finally:
+        await sch.stop()
+
+
+@pytest.mark.parametrize("make_backend", BACKENDS.values(), ids=BACKENDS.keys())
+@pytest.mark.asyncio
+async def test_bulk_scheduled_tasks_fire(make_backend):
+    sch = make_backend()
+    fired: list[str] = []
+
+    async def tick(task_id: str) -> Optional[datetime]:
+        fired.append(task_id)
+        return None
+
+    await sch.start()
+    now = datetime.now()
+    await sch.schedule_many(
+        tick, [(f"owner{i}", now + timedelta(milliseconds=20 + i)) for i in range(20)]
+    )
+    await asyncio.sleep(0.2)
+    await sch.stop()
+
+    assert sorted(fired) == sorted(f"owner{i}" for i in range(20))
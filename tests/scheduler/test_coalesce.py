@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+import pytest
+
+from infra.scheduler.jitter import JitterPolicy
+from infra.scheduler.scheduler import (
+    APSchedulerTaskScheduler,
+    BatchCoro,
+    HeapqTaskScheduler,
+    TaskScheduler,
+    TaskSchedulerProtocol,
+)
+from infra.scheduler.timingwheel import TimingWheelTaskScheduler
+
+WINDOW = timedelta(milliseconds=100)
+
+BACKENDS: dict[str, Callable[[BatchCoro], TaskSchedulerProtocol]] = {
+    "heapq": lambda batch: HeapqTaskScheduler(batch_coro=batch, coalesce_window=WINDOW),
+    "heapq-pool": lambda batch: HeapqTaskScheduler(
+        max_concurrency=2, batch_coro=batch, coalesce_window=WINDOW
+    ),
+    "timingwheel": lambda batch: TimingWheelTaskScheduler(
+        resolution=timedelta(milliseconds=10), batch_coro=batch, coalesce_window=WINDOW
+    ),
+    "apscheduler": lambda batch: APSchedulerTaskScheduler(
+        batch_coro=batch, coalesce_window=WINDOW
+    ),
+}
+
+
+async def single(task_id: str) -> Optional[datetime]:
+    raise AssertionError("coalescing mode must not fire tasks one by one")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", BACKENDS)
+async def test_co_due_tasks_fire_as_one_batch(backend: str):
+    batches: list[list[str]] = []
+    again = datetime.now() + timedelta(hours=1)
+
+    async def batch(task_ids: list[str]) -> dict[str, Optional[datetime]]:
+        batches.append(sorted(task_ids))
+        return {task_id: again if task_id == "owner0" else None for task_id in task_ids}
+
+    scheduler = BACKENDS[backend](batch)
+    await scheduler.start()
+
+    base = datetime.now() + timedelta(milliseconds=300)
+    if isinstance(scheduler, TimingWheelTaskScheduler):
+        # the wheel coalesces aligned windows: start just after a window boundary
+        windows = -(-(base - scheduler._origin) // WINDOW)
+        base = scheduler._origin + windows * WINDOW + timedelta(milliseconds=1)
+    for i in range(5):
+        await scheduler.schedule(
+            f"owner{i}", single, base + timedelta(milliseconds=5 * i)
+        )
+    await scheduler.schedule("cancelled", single, base)
+    await scheduler.cancel("cancelled")
+
+    await asyncio.sleep(0.8)
+
+    assert batches == [[f"owner{i}" for i in range(5)]]
+    assert await scheduler.is_active("owner0")
+    assert not await scheduler.is_active("owner1")
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", BACKENDS)
+async def test_batch_results_keep_jitter(backend: str):
+    policy = JitterPolicy(timedelta(minutes=1))
+    again = datetime.now() + timedelta(hours=1)
+
+    async def batch(task_ids: list[str]) -> dict[str, Optional[datetime]]:
+        return {task_id: again for task_id in task_ids}
+
+    scheduler = TaskScheduler(BACKENDS[backend](batch), jitter=policy)
+    await scheduler.start()
+    # already due once jittered, so the batch fires straight away
+    base = datetime.now() - timedelta(minutes=1)
+    await scheduler.schedule_many(single, [("owner1", base), ("owner2", base)])
+    await asyncio.sleep(0.4)
+
+    # each owner's next run is re-jittered like a one-by-one fire would be
+    assert await scheduler.next_run("owner1") == again + policy.offset("owner1")
+    assert await scheduler.next_run("owner2") == again + policy.offset("owner2")
+    await scheduler.stop()
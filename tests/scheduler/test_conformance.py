@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+import pytest
+import pytest_asyncio
+
+from infra.scheduler.scheduler import (
+    APSchedulerTaskScheduler,
+    HeapqTaskScheduler,
+    TaskSchedulerProtocol,
+)
+from infra.scheduler.taskscheduler import AsyncioTaskScheduler
+from infra.scheduler.timingwheel import TimingWheelTaskScheduler
+
+# every backend must behave the same through TaskSchedulerProtocol
+BACKENDS: dict[str, Callable[[], TaskSchedulerProtocol]] = {
+    "heapq": HeapqTaskScheduler,
+    "heapq-pool": lambda: HeapqTaskScheduler(max_concurrency=4),
+    "timingwheel": lambda: TimingWheelTaskScheduler(
+        resolution=timedelta(milliseconds=5)
+    ),
+    "apscheduler": APSchedulerTaskScheduler,
+    "asyncio": AsyncioTaskScheduler,
+    "asyncio-single-loop": lambda: AsyncioTaskScheduler(single_loop=True),
+}
+
+
+@pytest_asyncio.fixture(params=BACKENDS.values(), ids=BACKENDS.keys())
+async def scheduler(request):
+    sch = request.param()
+    await sch.start()
+    yield sch
+    await sch.stop()
+
+
+async def idle(task_id: str) -> Optional[datetime]:
+    return None
+
+
+@pytest.mark.asyncio
+async def test_schedule_and_lookup(scheduler: TaskSchedulerProtocol):
+    run_at = datetime.now() + timedelta(hours=1)
+    await scheduler.schedule("owner1", idle, run_at)
+
+    assert await scheduler.is_active("owner1")
+    assert await scheduler.next_run("owner1") == run_at
+    assert not await scheduler.is_active("ghost")
+    assert await scheduler.next_run("ghost") is None
+    assert await scheduler.next_run_many(["owner1", "ghost"]) == {
+        "owner1": run_at,
+        "ghost": None,
+    }
+
+    with pytest.raises(ValueError):
+        await scheduler.schedule("owner1", idle, run_at)
+
+
+@pytest.mark.asyncio
+async def test_cancel_and_reschedule(scheduler: TaskSchedulerProtocol):
+    run_at = datetime.now() + timedelta(hours=1)
+    await scheduler.schedule("owner1", idle, run_at)
+    await scheduler.schedule("owner2", idle, run_at)
+
+    await scheduler.reschedule("owner1", run_at + timedelta(hours=1))
+    assert await scheduler.next_run("owner1") == run_at + timedelta(hours=1)
+    with pytest.raises(ValueError):
+        await scheduler.reschedule("ghost", run_at)
+
+    await scheduler.cancel("owner2")
+    await scheduler.cancel("ghost")
+    assert not await scheduler.is_active("owner2")
+
+    # a cancelled id can be scheduled again
+    await scheduler.schedule("owner2", idle, run_at)
+    assert await scheduler.next_run("owner2") == run_at
+
+
+@pytest.mark.asyncio
+async def test_fires_requeues_and_stops(scheduler: TaskSchedulerProtocol):
+    fired: list[tuple[str, datetime]] = []
+
+    async def twice(task_id: str) -> Optional[datetime]:
+        fired.append((task_id, datetime.now()))
+        if len(fired) == 1:
+            return datetime.now() + timedelta(milliseconds=40)
+        return None
+
+    run_at = datetime.now() + timedelta(milliseconds=30)
+    await scheduler.schedule("owner1", twice, run_at)
+    await asyncio.sleep(0.25)
+
+    assert [task_id for task_id, _ in fired] == ["owner1", "owner1"]
+    assert fired[0][1] >= run_at
+    assert not await scheduler.is_active("owner1")
+
+
+@pytest.mark.asyncio
+async def test_past_run_at_fires_right_away(scheduler: TaskSchedulerProtocol):
+    fired: list[str] = []
+
+    async def once(task_id: str) -> Optional[datetime]:
+        fired.append(task_id)
+        return None
+
+    await scheduler.schedule("late", once, datetime.now() - timedelta(seconds=5))
+    await asyncio.sleep(0.1)
+    assert fired == ["late"]
+
+
+@pytest.mark.asyncio
+async def test_failing_task_is_dropped(scheduler: TaskSchedulerProtocol):
+    fired: list[str] = []
+
+    async def boom(task_id: str) -> Optional[datetime]:
+        fired.append(task_id)
+        raise RuntimeError("boom")
+
+    await scheduler.schedule("bad", boom, datetime.now() + timedelta(milliseconds=20))
+    await scheduler.schedule("good", idle, datetime.now() + timedelta(hours=1))
+    await asyncio.sleep(0.15)
+
+    assert fired == ["bad"]
+    assert not await scheduler.is_active("bad")
+    assert await scheduler.is_active("good")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_task_does_not_fire(scheduler: TaskSchedulerProtocol):
+    fired: list[str] = []
+
+    async def once(task_id: str) -> Optional[datetime]:
+        fired.append(task_id)
+        return None
+
+    soon = datetime.now() + timedelta(milliseconds=50)
+    await scheduler.schedule_many(once, [("owner1", soon), ("owner2", soon)])
+    await scheduler.cancel_many(["owner1"])
+    await asyncio.sleep(0.15)
+
+    assert fired == ["owner2"]
@@ -0,0 +1,276 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+from domain.entity.channel import Channel
+from domain.entity.fupgen import FupGenInput
+from domain.entity.recurrence import RecurrenceConfig
+from infra.db.models.recurrenceconfig import Recurrence
+from infra.recurrence.rruleadaptor import rrule_factory
+from infra.repository.fupgenrepo import FupGenRepository
+from infra.scheduler.dbqueue import DBQueueTaskScheduler
+
+NOW = datetime(2025, 4, 20, 12)
+
+
+@pytest.fixture
+def queue_db(session_local: sessionmaker[Session]) -> sessionmaker[Session]:
+    with session_local() as db:
+        repo = FupGenRepository(
+            db=db, make_recurrence=rrule_factory, make_id=lambda: str(uuid4())
+        )
+        for i in range(6):
+            repo.create(
+                FupGenInput(
+                    hookid="hook",
+                    ownerid=f"owner{i}",
+                    name="daily",
+                    channel=[Channel(id="ch", type="email", configdata={})],
+                    recurconfig=RecurrenceConfig(
+                        freq="DAILY",
+                        dtstart=datetime(2025, 4, 15 + i),
+                        allow_infinite=True,
+                    ),
+                    msg="hello",
+                )
+            )
+        # owners 0..3 are due at NOW, owners 4 and 5 later
+        for rec in db.query(Recurrence).all():
+            i = int(rec.fupgen.ownerid[5:])
+            rec.next_run = NOW + timedelta(hours=i - 3.5)
+        db.commit()
+    return session_local
+
+
+def advance(session_local: sessionmaker[Session]):
+    # stands in for RunTask: moves the owner's next_run past NOW
+    async def coro(ownerid: str) -> Optional[datetime]:
+        with session_local() as db:
+            for rec in db.query(Recurrence).all():
+                if rec.fupgen.ownerid == ownerid:
+                    rec.next_run = NOW + timedelta(days=1)
+            db.commit()
+        return NOW + timedelta(days=1)
+
+    return coro
+
+
+@pytest.mark.asyncio
+async def test_nodes_claim_disjoint_batches(queue_db: sessionmaker[Session]):
+    node_a = DBQueueTaskScheduler(queue_db, node_id="a", batch_size=2)
+    node_b = DBQueueTaskScheduler(queue_db, node_id="b", batch_size=2)
+
+    owners_a, _ = node_a.claim(NOW)
+    owners_b, _ = node_b.claim(NOW)
+    owners_a2, _ = node_a.claim(NOW)
+
+    assert sorted(owners_a + owners_b) == ["owner0", "owner1", "owner2", "owner3"]
+    assert not set(owners_a) & set(owners_b)
+    assert owners_a2 == []
+
+
+@pytest.mark.asyncio
+async def test_run_once_fires_and_releases(queue_db: sessionmaker[Session]):
+    fired: list[str] = []
+    advance_coro = advance(queue_db)
+
+    async def coro(ownerid: str) -> Optional[datetime]:
+        fired.append(ownerid)
+        return await advance_coro(ownerid)
+
+    node = DBQueueTaskScheduler(queue_db, node_id="a", batch_size=10)
+    await node.schedule("owner0", coro, NOW)
+
+    assert await node.run_once(NOW) == 4
+    assert sorted(fired) == ["owner0", "owner1", "owner2", "owner3"]
+    assert await node.run_once(NOW) == 0
+
+    with queue_db() as db:
+        assert all(r.lease_owner is None for r in db.query(Recurrence).all())
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed(queue_db: sessionmaker[Session]):
+    crashed = DBQueueTaskScheduler(
+        queue_db, node_id="crashed", lease=timedelta(minutes=1)
+    )
+    survivor = DBQueueTaskScheduler(queue_db, node_id="survivor")
+
+    owners, _ = crashed.claim(NOW)
+    assert len(owners) == 4
+    assert survivor.claim(NOW + timedelta(seconds=30))[0] == []
+
+    reclaimed, _ = survivor.claim(NOW + timedelta(minutes=2))
+    assert sorted(reclaimed) == sorted(owners)
+
+
+@pytest.mark.asyncio
+async def test_failed_run_keeps_lease(queue_db: sessionmaker[Session]):
+    async def failing(ownerid: str) -> Optional[datetime]:
+        raise RuntimeError("boom")
+
+    node = DBQueueTaskScheduler(queue_db, node_id="a", lease=timedelta(minutes=1))
+    await node.schedule("owner0", failing, NOW)
+
+    assert await node.run_once(NOW) == 4
+    assert await node.run_once(NOW + timedelta(seconds=10)) == 0
+    assert await node.run_once(NOW + timedelta(minutes=2)) == 4
+
+
+@pytest.mark.asyncio
+async def test_cancel_and_rearm(queue_db: sessionmaker[Session]):
+    node = DBQueueTaskScheduler(queue_db, node_id="a")
+
+    assert await node.next_run("owner5") == NOW + timedelta(hours=1.5)
+    await node.cancel("owner5")
+    assert not await node.is_active("owner5")
+
+    # re-armed at the generator's own next date after its dtstart
+    await node.schedule("owner5", advance(queue_db), datetime(2025, 4, 22))
+    assert await node.next_run("owner5") == datetime(2025, 4, 21)
+    await node.reschedule("owner5", datetime(2025, 4, 23))
+    assert await node.next_run("owner5") == datetime(2025, 4, 23)
+    with pytest.raises(ValueError):
+        await node.reschedule("ghost", datetime(2025, 4, 23))
+
+
+@pytest.mark.asyncio
+async def test_bulk_operations(queue_db: sessionmaker[Session]):
+    node = DBQueueTaskScheduler(queue_db, node_id="a")
+    owners = [f"owner{i}" for i in range(6)]
+
+    await node.cancel_many(owners[:3])
+    found = await node.next_run_many(owners + ["ghost"])
+    assert [o for o, at in found.items() if at is not None] == owners[3:]
+
+    later = NOW + timedelta(days=2)
+    await node.schedule_many(advance(queue_db), [(o, later) for o in owners])
+    found = await node.next_run_many(owners)
+    # only the disarmed owners are re-armed, each from its own cursor
+    assert [found[o] for o in owners[:3]] == [
+        datetime(2025, 4, d) for d in (16, 17, 18)
+    ]
+    assert found["owner3"] == NOW + timedelta(hours=-0.5)
+
+
+@pytest.mark.asyncio
+async def test_schedule_many_is_one_statement(queue_db: sessionmaker[Session]):
+    node = DBQueueTaskScheduler(queue_db, node_id="a")
+    owners = [f"owner{i}" for i in range(6)]
+    await node.cancel_many(owners)
+
+    updates: list[bool] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            updates.append(executemany)
+
+    engine = queue_db.kw["bind"]
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        runs = [(o, NOW + timedelta(days=i)) for i, o in enumerate(owners)]
+        await node.schedule_many(advance(queue_db), runs)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert updates == [True]
+    assert await node.next_run_many(owners) == {
+        o: datetime(2025, 4, 16 + i) for i, o in enumerate(owners)
+    }
+
+
+def add_owner(session_local: sessionmaker[Session], ownerid: str, n: int) -> list[str]:
+    # n generators, all due before every other owner
+    with session_local() as db:
+        repo = FupGenRepository(
+            db=db, make_recurrence=rrule_factory, make_id=lambda: str(uuid4())
+        )
+        for i in range(n):
+            repo.create(
+                FupGenInput(
+                    hookid="hook",
+                    ownerid=ownerid,
+                    name=f"gen{i}",
+                    channel=[],
+                    recurconfig=RecurrenceConfig(
+                        freq="DAILY", dtstart=datetime(2025, 4, 1), allow_infinite=True
+                    ),
+                    msg="hello",
+                )
+            )
+        recs = [r for r in db.query(Recurrence).all() if r.fupgen.ownerid == ownerid]
+        for i, rec in enumerate(recs):
+            rec.next_run = NOW - timedelta(hours=10 - i)
+        db.commit()
+        return [rec.id for rec in recs]
+
+
+def leases(session_local: sessionmaker[Session], ownerid: str) -> list:
+    with session_local() as db:
+        return [
+            (rec.lease_owner, rec.lease_until)
+            for rec in db.query(Recurrence).order_by(Recurrence.next_run).all()
+            if rec.fupgen.ownerid == ownerid
+        ]
+
+
+@pytest.mark.asyncio
+async def test_two_nodes_never_claim_one_owner(queue_db: sessionmaker[Session]):
+    add_owner(queue_db, "multi", 3)
+    # one due row per claim: with row leases node b would take the second row
+    # of "multi" and run the owner alongside node a
+    node_a = DBQueueTaskScheduler(queue_db, node_id="a", batch_size=1)
+    node_b = DBQueueTaskScheduler(queue_db, node_id="b", batch_size=1)
+
+    owners_a, until = node_a.claim(NOW)
+    owners_b, _ = node_b.claim(NOW)
+
+    assert owners_a == ["multi"]
+    assert owners_b == ["owner0"]
+    assert leases(queue_db, "multi") == [("a", until)] * 3
+
+
+@pytest.mark.asyncio
+async def test_owner_leased_elsewhere_is_skipped(queue_db: sessionmaker[Session]):
+    ids = add_owner(queue_db, "multi", 3)
+    # another node holds one row of the owner, e.g. from a concurrent claim
+    held = NOW + timedelta(minutes=5)
+    with queue_db() as db:
+        rec = db.get(Recurrence, ids[2])
+        rec.lease_owner, rec.lease_until = "b", held
+        db.commit()
+
+    node_a = DBQueueTaskScheduler(queue_db, node_id="a", batch_size=2)
+    owners, _ = node_a.claim(NOW)
+
+    # both due rows it saw belong to "multi"
+    assert owners == []
+    assert leases(queue_db, "multi") == [(None, None), (None, None), ("b", held)]
+
+
+@pytest.mark.asyncio
+async def test_owner_lost_to_a_concurrent_claim_is_released(
+    queue_db: sessionmaker[Session],
+):
+    ids = add_owner(queue_db, "multi", 3)
+    node_a = DBQueueTaskScheduler(queue_db, node_id="a", batch_size=1)
+    held = NOW + timedelta(minutes=5)
+
+    # node b leases a row of the owner between node a's check and its update
+    unheld = node_a._unheld
+
+    def racing(db, owners, now, until=None):
+        if until is None:
+            rec = db.get(Recurrence, ids[2])
+            rec.lease_owner, rec.lease_until = "b", held
+            db.flush()
+            return owners
+        return unheld(db, owners, now, until)
+
+    node_a._unheld = racing  # type: ignore
+    assert node_a.claim(NOW)[0] == []
+    assert leases(queue_db, "multi") == [(None, None), (None, None), ("b", held)]
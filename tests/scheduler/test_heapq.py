@@ -0,0 +1,188 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+
+from infra.scheduler.heap import IndexedHeap
+from infra.scheduler.scheduler import HeapqTaskScheduler, ScheduledTask
+
+
+async def noop(task_id: str) -> Optional[datetime]:
+    return None
+
+
+def assert_heap(heap: IndexedHeap[ScheduledTask]) -> None:
+    items = list(heap)
+    for i, item in enumerate(items):
+        assert item.index == i
+        if i:
+            assert not item.run_at < items[(i - 1) // 2].run_at
+
+
+def test_indexed_heap_remove_and_update_keep_invariant():
+    rnd = random.Random(42)
+    base = datetime(2025, 1, 1)
+    heap: IndexedHeap[ScheduledTask] = IndexedHeap()
+    live: list[ScheduledTask] = []
+
+    for i in range(2000):
+        op = rnd.random()
+        if op < 0.5 or not live:
+            task = ScheduledTask(
+                base + timedelta(seconds=rnd.randint(0, 10**6)), str(i), noop
+            )
+            heap.push(task)
+            live.append(task)
+        elif op < 0.75:
+            task = live.pop(rnd.randrange(len(live)))
+            heap.remove(task)
+            assert task.index == -1
+        else:
+            task = rnd.choice(live)
+            heap.update(task, base + timedelta(seconds=rnd.randint(0, 10**6)))
+        assert_heap(heap)
+
+    popped = [heap.pop().run_at for _ in range(len(heap))]
+    assert popped == sorted(t.run_at for t in live)
+
+
+@pytest.mark.asyncio
+async def test_churn_keeps_queue_proportional_to_live_tasks():
+    scheduler = HeapqTaskScheduler()
+    run_at = datetime.now() + timedelta(hours=1)
+
+    for i in range(100):
+        await scheduler.schedule(f"owner{i}", noop, run_at)
+    for _ in range(10):
+        for i in range(100):
+            await scheduler.cancel(f"owner{i}")
+            await scheduler.schedule(f"owner{i}", noop, run_at)
+    for i in range(50):
+        await scheduler.cancel(f"owner{i}")
+
+    assert len(scheduler._queue) == len(scheduler._tasks) == 50
+
+
+@pytest.mark.asyncio
+async def test_reschedule_moves_task():
+    scheduler = HeapqTaskScheduler()
+    calls: list[str] = []
+
+    async def task(task_id: str) -> Optional[datetime]:
+        calls.append(task_id)
+        return None
+
+    now = datetime.now()
+    await scheduler.schedule("late", task, now + timedelta(milliseconds=100))
+    await scheduler.schedule("early", task, now + timedelta(milliseconds=200))
+    await scheduler.reschedule("early", now + timedelta(milliseconds=50))
+    assert await scheduler.next_run("early") == now + timedelta(milliseconds=50)
+
+    await scheduler.start()
+    await asyncio.sleep(0.3)
+    await scheduler.stop()
+
+    assert calls == ["early", "late"]
+    assert len(scheduler._queue) == 0
+
+    with pytest.raises(ValueError):
+        await scheduler.reschedule("early", now)
+
+
+@pytest.mark.asyncio
+async def test_task_is_requeued_with_returned_run_at():
+    scheduler = HeapqTaskScheduler()
+    calls: list[datetime] = []
+
+    async def task(task_id: str) -> Optional[datetime]:
+        calls.append(datetime.now())
+        return datetime.now() + timedelta(milliseconds=30) if len(calls) < 3 else None
+
+    await scheduler.start()
+    await scheduler.schedule("task1", task, datetime.now() + timedelta(milliseconds=10))
+    await asyncio.sleep(0.3)
+    await scheduler.stop()
+
+    assert len(calls) == 3
+    assert not await scheduler.is_active("task1")
+
+
+@pytest.mark.asyncio
+async def test_slow_task_does_not_delay_others_with_worker_pool():
+    scheduler = HeapqTaskScheduler(max_concurrency=4)
+    finished: dict[str, datetime] = {}
+
+    async def task(task_id: str) -> Optional[datetime]:
+        if task_id == "slow":
+            await asyncio.sleep(0.3)
+        finished[task_id] = datetime.now()
+        return None
+
+    now = datetime.now()
+    await scheduler.schedule("slow", task, now + timedelta(milliseconds=10))
+    await scheduler.schedule("fast", task, now + timedelta(milliseconds=20))
+
+    await scheduler.start()
+    await asyncio.sleep(0.1)
+    assert "fast" in finished and "slow" not in finished
+    await scheduler.stop()
+
+    assert finished["slow"] > finished["fast"]
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_caps_concurrency():
+    scheduler = HeapqTaskScheduler(max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def task(task_id: str) -> Optional[datetime]:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return None
+
+    run_at = datetime.now()
+    for i in range(10):
+        await scheduler.schedule(f"owner{i}", task, run_at)
+
+    await scheduler.start()
+    await asyncio.sleep(0.2)
+    await scheduler.stop()
+
+    assert peak == 2
+    assert not scheduler._tasks
+
+
+@pytest.mark.asyncio
+async def test_timeout_rechecks_the_head(monkeypatch: pytest.MonkeyPatch):
+    scheduler = HeapqTaskScheduler()
+    calls: list[str] = []
+
+    async def task(task_id: str) -> Optional[datetime]:
+        calls.append(task_id)
+        return None
+
+    later = datetime.now() + timedelta(hours=1)
+    wait_for = asyncio.wait_for
+
+    async def reschedule_then_time_out(awaitable, timeout):
+        # a reschedule lands in the same iteration the timeout fires in
+        if await scheduler.next_run("head") != later:
+            await scheduler.reschedule("head", later)
+            awaitable.close()
+            raise asyncio.TimeoutError
+        return await wait_for(awaitable, timeout)
+
+    monkeypatch.setattr(asyncio, "wait_for", reschedule_then_time_out)
+    await scheduler.schedule("head", task, datetime.now() + timedelta(milliseconds=20))
+    await scheduler.start()
+    await asyncio.sleep(0.1)
+    await scheduler.stop()
+
+    assert calls == []
+    assert await scheduler.next_run("head") == later
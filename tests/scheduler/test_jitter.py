@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+
+from infra.scheduler.jitter import JitteredCoro, JitterPolicy
+from infra.scheduler.scheduler import HeapqTaskScheduler, TaskScheduler
+
+
+def test_offsets_are_deterministic_and_bounded():
+    window = timedelta(minutes=1)
+    policy = JitterPolicy(window)
+    offsets = [policy.offset(f"owner{i}") for i in range(1000)]
+
+    assert offsets == [JitterPolicy(window).offset(f"owner{i}") for i in range(1000)]
+    assert all(timedelta(0) <= o < window for o in offsets)
+    # spread over the whole window, not bunched up
+    per_10s = [0] * 6
+    for o in offsets:
+        per_10s[int(o.total_seconds() // 10)] += 1
+    assert min(per_10s) > 100
+
+    assert JitterPolicy(window, salt="other").offset("owner1") != offsets[1]
+
+
+def test_overrides_and_zero_window():
+    policy = JitterPolicy(
+        timedelta(minutes=1),
+        overrides={"vip": timedelta(0), "batch": timedelta(hours=1)},
+    )
+    assert policy.offset("vip") == timedelta(0)
+    assert policy.offset("batch") < timedelta(hours=1)
+    assert JitterPolicy(timedelta(0)).offset("owner1") == timedelta(0)
+
+    run_at = datetime(2025, 4, 15)
+    assert policy.apply("vip", run_at) == run_at
+
+    with pytest.raises(ValueError):
+        JitterPolicy(timedelta(seconds=-1))
+
+
+@pytest.mark.asyncio
+async def test_jittered_coro_shifts_next_run_only():
+    seen: list[str] = []
+
+    async def exact(task_id: str) -> Optional[datetime]:
+        seen.append(task_id)
+        return datetime(2025, 4, 16) if task_id == "again" else None
+
+    policy = JitterPolicy(timedelta(minutes=1))
+    coro = JitteredCoro(exact, policy)
+    assert await coro("again") == datetime(2025, 4, 16) + policy.offset("again")
+    assert await coro("stop") is None
+    assert seen == ["again", "stop"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_fires_with_offset_and_keeps_dates_exact():
+    policy = JitterPolicy(timedelta(milliseconds=200))
+    offset = policy.offset("owner1")
+    sch = TaskScheduler(HeapqTaskScheduler(), jitter=policy)
+    returned: list[datetime] = []
+    fired_at: list[datetime] = []
+
+    async def tick(task_id: str) -> Optional[datetime]:
+        fired_at.append(datetime.now())
+        if returned:
+            return None
+        returned.append(base + timedelta(seconds=1))
+        return returned[0]
+
+    base = datetime.now() + timedelta(milliseconds=50)
+    await sch.schedule("owner1", tick, base)
+    assert await sch.next_run("owner1") == base + offset
+
+    await sch.start()
+    await asyncio.sleep(0.3)
+    assert len(fired_at) == 1
+    assert fired_at[0] >= base + offset
+    # the backend re-queued the exact date returned by the task, plus the offset
+    assert await sch.next_run("owner1") == returned[0] + offset
+    await sch.stop()
@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+
+from infra.scheduler.metrics import Histogram, InMemoryMetrics, to_prometheus
+from infra.scheduler.scheduler import (
+    APSchedulerTaskScheduler,
+    HeapqTaskScheduler,
+    TaskScheduler,
+)
+from infra.scheduler.taskscheduler import AsyncioTaskScheduler
+from infra.scheduler.timingwheel import TimingWheelTaskScheduler
+
+
+def test_histogram_buckets_and_quantile():
+    hist = Histogram([0.01, 0.1, 1.0])
+    for value in [0.005, 0.05, 0.05, 0.5, 5.0]:
+        hist.observe(value)
+
+    assert hist.counts == [1, 2, 1, 1]
+    assert hist.count == 5
+    assert hist.quantile(0.5) == 0.1
+    assert hist.quantile(1.0) == float("inf")
+    assert Histogram().quantile(0.5) is None
+
+
+def test_prometheus_text_format():
+    metrics = InMemoryMetrics(buckets=[0.1, 1.0])
+    metrics.fired(0.05)
+    metrics.fired(-0.01)  # early fires count as no lag
+    metrics.executed(2.0, ok=False)
+    metrics.rescheduled()
+    metrics.queue(7, 2)
+
+    text = to_prometheus(metrics, labels={"backend": "heapq"})
+
+    assert "# TYPE ups_scheduler_fire_lag_seconds histogram" in text
+    assert 'ups_scheduler_fire_lag_seconds_bucket{backend="heapq",le="0.1"} 2' in text
+    assert 'ups_scheduler_exec_seconds_bucket{backend="heapq",le="1.0"} 0' in text
+    assert 'ups_scheduler_exec_seconds_bucket{backend="heapq",le="+Inf"} 1' in text
+    assert 'ups_scheduler_errors_total{backend="heapq"} 1' in text
+    assert 'ups_scheduler_reschedules_total{backend="heapq"} 1' in text
+    assert 'ups_scheduler_queue_depth{backend="heapq"} 7' in text
+    assert 'ups_scheduler_tombstones{backend="heapq"} 2' in text
+    assert text.endswith("\n")
+
+
+@pytest.mark.parametrize(
+    "make_backend",
+    [
+        HeapqTaskScheduler,
+        lambda: HeapqTaskScheduler(max_concurrency=4),
+        lambda: TimingWheelTaskScheduler(resolution=timedelta(milliseconds=10)),
+        APSchedulerTaskScheduler,
+    ],
+    ids=["heapq", "heapq-pool", "timingwheel", "apscheduler"],
+)
+@pytest.mark.asyncio
+async def test_backends_report_to_metrics(make_backend):
+    metrics = InMemoryMetrics()
+    sch = TaskScheduler(make_backend(), metrics=metrics)
+    runs: dict[str, int] = {}
+
+    async def tick(task_id: str) -> Optional[datetime]:
+        runs[task_id] = runs.get(task_id, 0) + 1
+        if task_id == "bad":
+            raise RuntimeError("boom")
+        return (
+            None if runs[task_id] == 2 else datetime.now() + timedelta(milliseconds=30)
+        )
+
+    await sch.start()
+    now = datetime.now()
+    await sch.schedule("good", tick, now + timedelta(milliseconds=20))
+    await sch.schedule("bad", tick, now + timedelta(milliseconds=20))
+    await asyncio.sleep(0.3)
+    await sch.stop()
+
+    assert sch.metrics is metrics
+    assert metrics.lag.count == 3
+    assert metrics.exec_time.count == 3
+    assert metrics.errors == 1
+    assert metrics.reschedules == 1
+    assert metrics.lag.sum < 0.2
+
+
+@pytest.mark.asyncio
+async def test_single_loop_reports_tombstones():
+    metrics = InMemoryMetrics()
+    sch = AsyncioTaskScheduler(single_loop=True, metrics=metrics)
+    run_at = datetime.now() + timedelta(seconds=10)
+
+    async def tick(task_id: str) -> Optional[datetime]:
+        return None
+
+    for i in range(10):
+        await sch.add_task(f"task{i}", tick, run_at)
+    # the heap top stays live, so the removed entries are not popped yet
+    for i in range(6, 10):
+        await sch.remove_task(f"task{i}")
+    await asyncio.sleep(0.01)
+
+    assert metrics.depth == 6
+    assert metrics.tombstones == 4
+
+    await sch.add_task("soon", tick, datetime.now() + timedelta(milliseconds=10))
+    await asyncio.sleep(0.05)
+    assert metrics.lag.count == 1
+    assert metrics.exec_time.count == 1
+
+    for i in range(6):
+        await sch.remove_task(f"task{i}")
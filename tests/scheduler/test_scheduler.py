@@ -1,4 +1,5 @@
 import asyncio
+import heapq
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -87,3 +88,174 @@ async def test_task_returns_none_and_stops():
     assert "task_stop" not in scheduler.tasks
 
     await scheduler.remove_task("task_stop")  # Garantia de limpeza
+
+
+# -----------------------------
+# single-loop mode
+# -----------------------------
+
+
+@pytest.mark.asyncio
+async def test_single_loop_reschedules_and_removes():
+    scheduler = AsyncioTaskScheduler(single_loop=True)
+    calls: list[str] = []
+
+    async def tick(task_id: str) -> Optional[datetime]:
+        calls.append(task_id)
+        return datetime.now() + timedelta(milliseconds=50)
+
+    await scheduler.add_task("task1", tick, datetime.now() + timedelta(milliseconds=50))
+    await asyncio.sleep(0.28)
+
+    assert 3 <= len(calls) <= 6
+    assert await scheduler.is_running("task1")
+    assert scheduler.tasks["task1"].next_run > datetime.now() - timedelta(
+        milliseconds=10
+    )
+
+    await scheduler.remove_task("task1")
+    fired = len(calls)
+    await asyncio.sleep(0.15)
+    assert len(calls) == fired
+    assert not await scheduler.is_running("task1")
+
+
+@pytest.mark.asyncio
+async def test_single_loop_uses_one_task_for_all_owners():
+    scheduler = AsyncioTaskScheduler(single_loop=True)
+    before = len(asyncio.all_tasks())
+    run_at = datetime.now() + timedelta(seconds=10)
+
+    for i in range(500):
+        await scheduler.add_task(f"task{i}", my_task, run_at)
+
+    assert len(asyncio.all_tasks()) == before + 1
+    with pytest.raises(ValueError):
+        await scheduler.add_task("task1", my_task, run_at)
+
+    for i in range(500):
+        await scheduler.remove_task(f"task{i}")
+    await asyncio.sleep(0)
+    assert scheduler._driver is not None and scheduler._driver.done()
+
+
+@pytest.mark.asyncio
+async def test_single_loop_heap_stays_bounded_under_churn():
+    scheduler = AsyncioTaskScheduler(single_loop=True)
+    run_at = datetime.now() + timedelta(seconds=10)
+    for i in range(10):
+        await scheduler.add_task(f"task{i}", my_task, run_at)
+
+    for n in range(1000):
+        await scheduler.reschedule(f"task{n % 10}", run_at + timedelta(seconds=n))
+        await scheduler.remove_task("churn")
+        await scheduler.add_task("churn", my_task, run_at)
+
+    # stale entries are compacted away instead of piling up in the heap
+    assert len(scheduler._queue) <= 2 * 11 + 1
+    assert scheduler._stale <= len(scheduler._queue) // 2
+    assert sum(e.seq == seq for _, seq, e in scheduler._queue) == 11
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_single_loop_fires_in_order_and_stops_on_none():
+    scheduler = AsyncioTaskScheduler(single_loop=True)
+    order: list[str] = []
+
+    async def once(task_id: str) -> Optional[datetime]:
+        order.append(task_id)
+        return None
+
+    now = datetime.now()
+    for i, ms in enumerate([90, 30, 60]):
+        await scheduler.add_task(f"task{i}", once, now + timedelta(milliseconds=ms))
+    await asyncio.sleep(0.2)
+
+    assert order == ["task1", "task2", "task0"]
+    assert scheduler.tasks == {}
+
+
+@pytest.mark.asyncio
+async def test_single_loop_slow_owner_does_not_block_others():
+    scheduler = AsyncioTaskScheduler(single_loop=True)
+    started = asyncio.Event()
+    fired: list[str] = []
+
+    async def slow(task_id: str) -> Optional[datetime]:
+        started.set()
+        await asyncio.sleep(10)
+        return None
+
+    async def fast(task_id: str) -> Optional[datetime]:
+        fired.append(task_id)
+        return None
+
+    now = datetime.now()
+    await scheduler.add_task("slow", slow, now + timedelta(milliseconds=20))
+    await scheduler.add_task("fast", fast, now + timedelta(milliseconds=60))
+    await started.wait()
+    await asyncio.sleep(0.1)
+
+    assert fired == ["fast"]
+    assert await scheduler.is_running("slow")
+    await scheduler.remove_task("slow")
+    assert not await scheduler.is_running("slow")
+
+
+@pytest.mark.asyncio
+async def test_single_loop_bulk_schedule_and_cancel(monkeypatch):
+    scheduler = AsyncioTaskScheduler(single_loop=True)
+    pushes: list[int] = []
+    push = heapq.heappush
+    monkeypatch.setattr(
+        heapq, "heappush", lambda queue, item: pushes.append(1) or push(queue, item)
+    )
+    order: list[str] = []
+
+    async def once(task_id: str) -> Optional[datetime]:
+        order.append(task_id)
+        return None
+
+    now = datetime.now()
+    far = now + timedelta(seconds=10)
+    await scheduler.schedule_many(
+        my_task, [(f"task{i}", far + timedelta(seconds=i)) for i in range(200)]
+    )
+    # one heapify for the batch, no push per item
+    assert pushes == []
+    assert [e[0] for e in sorted(scheduler._queue)] == [
+        far + timedelta(seconds=i) for i in range(200)
+    ]
+
+    # a small batch goes in with pushes, and the earlier head wakes the driver
+    await scheduler.schedule_many(
+        once,
+        [
+            ("b", now + timedelta(milliseconds=40)),
+            ("a", now + timedelta(milliseconds=20)),
+        ],
+    )
+    assert len(pushes) == 2
+    await asyncio.sleep(0.1)
+    assert order == ["a", "b"]
+
+    await scheduler.cancel_many([f"task{i}" for i in range(150)] + ["ghost"])
+    assert len(scheduler.tasks) == 50
+    # compacted in the same pass
+    assert len(scheduler._queue) == 50 and scheduler._stale == 0
+    await scheduler.cancel_many(list(scheduler.tasks))
+    assert scheduler.tasks == {}
+
+
+@pytest.mark.asyncio
+async def test_cancel_many_stops_every_task():
+    scheduler = AsyncioTaskScheduler()
+    run_at = datetime.now() + timedelta(seconds=10)
+    await scheduler.schedule_many(my_task, [(f"task{i}", run_at) for i in range(20)])
+    handles = [t.task for t in scheduler.tasks.values()]
+
+    await scheduler.cancel_many([f"task{i}" for i in range(20)] + ["ghost"])
+
+    assert scheduler.tasks == {}
+    assert all(h.done() for h in handles)
@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from infra.scheduler.scheduler import HeapqTaskScheduler
+from infra.scheduler.sharded import HashRing, ShardedTaskScheduler
+
+
+async def idle(task_id: str) -> Optional[datetime]:
+    return None
+
+
+async def touch(task_id: str) -> Optional[datetime]:
+    # runs inside the worker process; the task id is a file path
+    Path(task_id).write_text("fired")
+    return None
+
+
+def test_ring_moves_only_keys_of_the_new_shard():
+    keys = [f"owner{i}" for i in range(10_000)]
+    before = HashRing(4)
+    after = HashRing(5)
+
+    moved = [k for k in keys if before.shard_of(k) != after.shard_of(k)]
+
+    assert all(after.shard_of(k) == 4 for k in moved)
+    assert 0.1 < len(moved) / len(keys) < 0.3
+    assert {before.shard_of(k) for k in keys} == {0, 1, 2, 3}
+
+
+@pytest.mark.asyncio
+async def test_sharded_scheduler_routes_and_rebalances(tmp_path: Path):
+    scheduler = ShardedTaskScheduler(shards=2, make_backend=HeapqTaskScheduler)
+    await scheduler.start()
+    try:
+        run_at = datetime.now() + timedelta(hours=1)
+        owners = [f"owner{i}" for i in range(40)]
+        for i, ownerid in enumerate(owners):
+            await scheduler.schedule(ownerid, idle, run_at + timedelta(minutes=i))
+
+        assert await scheduler.is_active("owner3")
+        assert await scheduler.next_run("owner3") == run_at + timedelta(minutes=3)
+        with pytest.raises(ValueError):
+            await scheduler.schedule("owner3", idle, run_at)
+
+        await scheduler.cancel("owner0")
+        assert not await scheduler.is_active("owner0")
+
+        ring = HashRing(3)
+        expected = sum(
+            1 for o in owners[1:] if ring.shard_of(o) != HashRing(2).shard_of(o)
+        )
+        assert await scheduler.resize(3) == expected
+        for i, ownerid in enumerate(owners[1:], start=1):
+            assert await scheduler.next_run(ownerid) == run_at + timedelta(minutes=i)
+
+        await scheduler.resize(1)
+        assert scheduler.shards == 1
+        assert await scheduler.is_active("owner39")
+
+        target = tmp_path / "owner-fire"
+        await scheduler.schedule(str(target), touch, datetime.now())
+        for _ in range(50):
+            if target.exists():
+                break
+            await asyncio.sleep(0.05)
+        assert target.read_text() == "fired"
+        assert not await scheduler.is_active(str(target))
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_sharded_bulk_operations():
+    scheduler = ShardedTaskScheduler(shards=3, make_backend=HeapqTaskScheduler)
+    await scheduler.start()
+    try:
+        run_at = datetime.now() + timedelta(hours=1)
+        owners = [f"owner{i}" for i in range(60)]
+        await scheduler.schedule_many(idle, [(o, run_at) for o in owners])
+
+        found = await scheduler.next_run_many(owners + ["ghost"])
+        assert list(found) == owners + ["ghost"]
+        assert all(found[o] == run_at for o in owners) and found["ghost"] is None
+
+        await scheduler.cancel_many(owners[::2])
+        found = await scheduler.next_run_many(owners)
+        assert sum(at is not None for at in found.values()) == 30
+
+        with pytest.raises(ValueError):
+            await scheduler.schedule_many(idle, [("x", run_at), ("x", run_at)])
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_finished_tasks_are_forgotten_by_their_shard():
+    scheduler = ShardedTaskScheduler(shards=2, make_backend=HeapqTaskScheduler)
+    await scheduler.start()
+    try:
+        now = datetime.now()
+        done = [f"done{i}" for i in range(20)]
+        await scheduler.schedule_many(idle, [(o, now) for o in done])
+        await scheduler.schedule("once", idle, now)
+        await scheduler.schedule("later", idle, now + timedelta(hours=1))
+
+        for _ in range(50):
+            found = await scheduler.next_run_many(done + ["once"])
+            if all(at is None for at in found.values()):
+                break
+            await asyncio.sleep(0.05)
+
+        tracked = await asyncio.gather(*(scheduler._call(i, "tracked") for i in (0, 1)))
+        assert sum(tracked) == 1  # only "later"
+    finally:
+        await scheduler.stop()
@@ -0,0 +1,206 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from infra.db.models.fupgen import FupGen
+from infra.db.models.recurrenceconfig import Recurrence
+from infra.recurrence.rruleadaptor import rrule_factory
+from infra.repository.fupgenrepo import FupGenRepository
+from infra.scheduler.scheduler import HeapqTaskScheduler
+from infra.scheduler.tiered import TieredTaskScheduler
+
+HORIZON = timedelta(hours=1)
+
+
+def add_owners(session: Session, next_runs: dict[str, datetime]) -> None:
+    session.execute(
+        insert(FupGen),
+        [
+            {
+                "id": owner,
+                "hookid": "hook",
+                "ownerid": owner,
+                "name": "gen",
+                "message_id": owner,
+                "data_id": owner,
+            }
+            for owner in next_runs
+        ],
+    )
+    session.execute(
+        insert(Recurrence),
+        [
+            {
+                "id": owner,
+                "freq": "DAILY",
+                # a daily rule whose next date after dtstart is next_run
+                "dtstart": next_run - timedelta(days=1),
+                "allow_infinite": True,
+                "next_run": next_run,
+            }
+            for owner, next_run in next_runs.items()
+        ],
+    )
+    session.commit()
+
+
+def set_next_run(session: Session, owner: str, next_run: datetime) -> None:
+    session.get(Recurrence, owner).next_run = next_run
+    session.commit()
+
+
+async def idle(task_id: str) -> Optional[datetime]:
+    return None
+
+
+@pytest.fixture
+def repo(session: Session) -> FupGenRepository:
+    now = datetime.now()
+    add_owners(
+        session,
+        {
+            "soon": now + timedelta(minutes=10),
+            "later": now + timedelta(minutes=70),
+            "far": now + timedelta(days=30),
+        },
+    )
+    return FupGenRepository(db=session, make_recurrence=rrule_factory, make_id=str)
+
+
+@pytest.mark.asyncio
+async def test_only_near_term_owners_are_in_memory(repo: FupGenRepository):
+    backend = HeapqTaskScheduler()
+    sch = TieredTaskScheduler(backend, repo, idle, horizon=HORIZON)
+    await sch.start()
+    try:
+        assert await backend.is_active("soon")
+        assert not await backend.is_active("later")
+        assert not await backend.is_active("far")
+        # parked owners are still visible through the tiered scheduler
+        assert await sch.is_active("far")
+        assert (
+            await sch.next_run("later") == (await sch.next_run_many(["later"]))["later"]
+        )
+
+        # a sweep later on promotes what came within the horizon
+        assert await sch.sweep(datetime.now() + timedelta(minutes=15)) == 1
+        assert await backend.is_active("later")
+        assert not await backend.is_active("far")
+    finally:
+        await sch.stop()
+
+
+@pytest.mark.asyncio
+async def test_schedule_and_reschedule_park_far_runs(repo: FupGenRepository):
+    backend = HeapqTaskScheduler()
+    sch = TieredTaskScheduler(backend, repo, idle, horizon=HORIZON)
+    now = datetime.now()
+
+    await sch.schedule("new", idle, now + timedelta(days=2))
+    assert not await backend.is_active("new")
+
+    await sch.schedule("near", idle, now + timedelta(minutes=5))
+    assert await backend.is_active("near")
+    with pytest.raises(ValueError):
+        await sch.schedule("near", idle, now)
+
+    await sch.reschedule("near", now + timedelta(days=1))
+    assert not await backend.is_active("near")
+
+    await sch.reschedule("far", now + timedelta(minutes=5))
+    assert await backend.next_run("far") == now + timedelta(minutes=5)
+    with pytest.raises(ValueError):
+        await sch.reschedule("ghost", now)
+
+
+@pytest.mark.asyncio
+async def test_fired_task_with_far_next_run_leaves_memory(
+    repo: FupGenRepository, session: Session
+):
+    fired: list[str] = []
+    far = datetime.now() + timedelta(days=7)
+
+    async def runtask(task_id: str) -> Optional[datetime]:
+        # RunTask persists the next run before returning it
+        fired.append(task_id)
+        set_next_run(session, task_id, far)
+        return far
+
+    backend = HeapqTaskScheduler()
+    sch = TieredTaskScheduler(backend, repo, runtask, horizon=HORIZON)
+    await sch.schedule("soon", runtask, datetime.now() + timedelta(milliseconds=20))
+    await backend.start()
+    await asyncio.sleep(0.1)
+    await backend.stop()
+
+    assert fired == ["soon"]
+    assert not await backend.is_active("soon")
+    assert await sch.next_run("soon") == far
+
+
+@pytest.mark.asyncio
+async def test_cancelled_owner_is_not_promoted(repo: FupGenRepository):
+    backend = HeapqTaskScheduler()
+    sch = TieredTaskScheduler(backend, repo, idle, horizon=HORIZON)
+    later = await sch.next_run("later")
+
+    await sch.cancel_many(["later"])
+    assert await sch.sweep(datetime.now() + timedelta(minutes=15)) == 1
+    assert not await backend.is_active("later")
+    assert not await sch.is_active("later")
+
+    # the cancellation lives in the repository, so it survives a restart
+    restarted = TieredTaskScheduler(HeapqTaskScheduler(), repo, idle, horizon=HORIZON)
+    assert await restarted.sweep(datetime.now() + timedelta(minutes=15)) == 1
+    assert not await restarted.is_active("later")
+    with pytest.raises(ValueError):
+        await restarted.reschedule("later", datetime.now())
+
+    # re-armed at the generator's own next date, not at the run asked for
+    await restarted.schedule("later", idle, datetime.now() + timedelta(days=1))
+    assert await restarted.next_run("later") == later.replace(microsecond=0)
+
+    with pytest.raises(ValueError):
+        TieredTaskScheduler(
+            backend, repo, idle, horizon=HORIZON, sweep_interval=timedelta(hours=1)
+        )
+
+
+@pytest.mark.asyncio
+async def test_reschedule_is_written_to_the_repository(repo: FupGenRepository):
+    backend = HeapqTaskScheduler()
+    sch = TieredTaskScheduler(backend, repo, idle, horizon=HORIZON)
+    await sch.sweep()
+    now = datetime.now()
+
+    # out of the horizon: dropped from memory, the sweep must not bring it back
+    far = now + timedelta(days=3)
+    await sch.reschedule("soon", far)
+    assert not await backend.is_active("soon")
+    assert await sch.sweep(now + timedelta(minutes=15)) == 1
+    assert not await backend.is_active("soon")
+    assert repo.get_next_runs(["soon"]) == {"soon": far}
+
+    # parked only in the repository
+    await sch.reschedule("far", now + timedelta(days=60))
+    assert repo.get_next_runs(["far"]) == {"far": now + timedelta(days=60)}
+    await sch.reschedule("far", now + timedelta(minutes=5))
+    assert await backend.next_run("far") == now + timedelta(minutes=5)
+
+
+@pytest.mark.asyncio
+async def test_schedule_many_rejects_held_owners(repo: FupGenRepository):
+    backend = HeapqTaskScheduler()
+    sch = TieredTaskScheduler(backend, repo, idle, horizon=HORIZON)
+    await sch.sweep()
+    assert await backend.is_active("soon")
+
+    with pytest.raises(ValueError):
+        await sch.schedule_many(
+            idle, [("new", datetime.now()), ("soon", datetime.now())]
+        )
+    assert not await backend.is_active("new")
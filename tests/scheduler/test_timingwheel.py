@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+
+from infra.scheduler.scheduler import TaskScheduler
+from infra.scheduler.timingwheel import TimingWheelTaskScheduler
+
+
+def make_wheel() -> TimingWheelTaskScheduler:
+    return TimingWheelTaskScheduler(
+        resolution=timedelta(milliseconds=10), slots=4, levels=3
+    )
+
+
+@pytest.mark.asyncio
+async def test_fires_and_reschedules():
+    wheel = make_wheel()
+    scheduler = TaskScheduler(wheel)
+    calls: list[datetime] = []
+
+    async def task(task_id: str) -> Optional[datetime]:
+        calls.append(datetime.now())
+        if len(calls) < 3:
+            return datetime.now() + timedelta(milliseconds=30)
+        return None
+
+    await scheduler.start()
+    run_at = datetime.now() + timedelta(milliseconds=50)
+    await scheduler.schedule("task1", task, run_at)
+    assert await scheduler.next_run("task1") == run_at
+
+    await asyncio.sleep(0.4)
+    await scheduler.stop()
+
+    assert len(calls) == 3
+    assert calls[0] >= run_at
+    assert not await scheduler.is_active("task1")
+
+
+@pytest.mark.asyncio
+async def test_cancel_removes_from_wheel():
+    wheel = make_wheel()
+    called: list[str] = []
+
+    async def task(task_id: str) -> Optional[datetime]:
+        called.append(task_id)
+        return None
+
+    await wheel.start()
+    await wheel.schedule("task1", task, datetime.now() + timedelta(milliseconds=50))
+    await wheel.cancel("task1")
+    assert not await wheel.is_active("task1")
+    assert all(not slot for level in wheel._wheels for slot in level)
+
+    await asyncio.sleep(0.1)
+    await wheel.stop()
+    assert called == []
+
+
+@pytest.mark.asyncio
+async def test_duplicate_schedule_raises():
+    wheel = make_wheel()
+
+    async def task(task_id: str) -> Optional[datetime]:
+        return None
+
+    await wheel.schedule("task1", task, datetime.now() + timedelta(seconds=1))
+    with pytest.raises(ValueError):
+        await wheel.schedule("task1", task, datetime.now() + timedelta(seconds=1))
+
+
+@pytest.mark.asyncio
+async def test_cascades_far_future_entries():
+    wheel = make_wheel()
+
+    async def task(task_id: str) -> Optional[datetime]:
+        return None
+
+    # 4 slots x 3 levels = 64 ticks of range, the last task overflows it
+    ticks = [1, 3, 4, 17, 63, 64, 200]
+    for t in ticks:
+        await wheel.schedule(f"t{t}", task, wheel._origin + t * wheel._resolution)
+
+    fired: dict[str, int] = {}
+    while len(fired) < len(ticks):
+        for entry in wheel._advance():
+            fired[entry.task_id] = wheel._tick
+
+    assert fired == {f"t{t}": t for t in ticks}
+
+
+@pytest.mark.asyncio
+async def test_catch_up_jumps_over_idle_ticks():
+    wheel = make_wheel()
+    advanced: list[int] = []
+    advance = wheel._advance
+    wheel._advance = lambda: advanced.append(1) or advance()  # type: ignore
+    fired: list[str] = []
+
+    async def once(task_id: str) -> Optional[datetime]:
+        fired.append(task_id)
+        return None
+
+    now = datetime.now()
+    # one entry per level: ticks 3, 10 and 40
+    for task_id, ms in [("far", 400), ("near", 30), ("mid", 100)]:
+        await wheel.schedule(task_id, once, now + timedelta(milliseconds=ms))
+    # as if the loop had been idle for 2000 ticks
+    wheel._origin -= timedelta(seconds=20)
+
+    await wheel.start()
+    await asyncio.sleep(0.05)
+    await wheel.stop()
+
+    assert fired == ["near", "mid", "far"]
+    assert len(advanced) < 20
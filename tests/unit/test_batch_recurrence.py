@@ -0,0 +1,98 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from domain.entity.recurrence import RecurrenceConfig, make_scheduler
+from infra.recurrence.batch import batch_schedule
+from infra.recurrence.rruleadaptor import rrule_factory
+
+TICK = datetime(2025, 6, 1, 12)
+
+
+def expected(config: RecurrenceConfig, until: datetime):
+    sch = make_scheduler(rrule_factory, config.model_copy())
+    dates = sch._recur.between(sch.last_run, until, inc=True)
+    return dates, sch._recur.after(dates[-1]) if dates else None
+
+
+def random_configs(n: int, seed: int) -> list[RecurrenceConfig]:
+    rnd = random.Random(seed)
+    configs = []
+    for _ in range(n):
+        dtstart = datetime(2020, 1, 1, rnd.randint(0, 23), rnd.choice([0, 30]))
+        dtstart += timedelta(days=rnd.randint(0, 2000))
+        if rnd.random() < 0.1 and dtstart.month != 2:
+            dtstart = dtstart.replace(day=31 if dtstart.month in (1, 3, 5) else 30)
+        kwargs: dict[str, Any] = dict(
+            freq=rnd.choice(["DAILY", "WEEKLY", "MONTHLY", "YEARLY"]),
+            dtstart=dtstart,
+            interval=rnd.randint(1, 4),
+            count=rnd.choice([None, None, 0, 1, 3, 50]),
+            until=rnd.choice([None, dtstart + timedelta(days=rnd.randint(-5, 3000))]),
+            allow_infinite=True,
+        )
+        if rnd.random() < 0.1:
+            kwargs["byweekday"] = ["MO", "FR"]
+        sch = make_scheduler(rrule_factory, RecurrenceConfig(**kwargs))
+        if rnd.random() < 0.6:
+            # a generator that already ran for a while
+            sch.schedule(dtstart + timedelta(days=rnd.randint(0, 1500)))
+        configs.append(sch.config)
+    return configs
+
+
+def test_batch_matches_rrule_factory():
+    configs = random_configs(500, seed=7)
+
+    planned = batch_schedule(configs, TICK)
+
+    assert len(planned) == len(configs)
+    for config, plan in zip(configs, planned):
+        assert plan == expected(config, TICK), config
+
+
+def test_batch_keeps_input_order_across_shapes():
+    configs = [
+        RecurrenceConfig(freq="MONTHLY", dtstart=datetime(2025, 1, 5), count=3),
+        RecurrenceConfig(
+            freq="WEEKLY",
+            dtstart=datetime(2025, 5, 1),
+            byweekday=["MO"],
+            allow_infinite=True,
+        ),
+        RecurrenceConfig(
+            freq="DAILY", dtstart=datetime(2025, 5, 29), interval=2, count=10
+        ),
+    ]
+
+    planned = batch_schedule(configs, TICK)
+
+    assert planned == [expected(c, TICK) for c in configs]
+    assert planned[0] == (
+        [datetime(2025, 1, 5), datetime(2025, 2, 5), datetime(2025, 3, 5)],
+        None,
+    )
+    assert planned[2] == (
+        [datetime(2025, 5, 29), datetime(2025, 5, 31)],
+        datetime(2025, 6, 2),
+    )
+
+
+def test_batch_falls_back_for_aware_datetimes():
+    config = RecurrenceConfig(
+        freq="DAILY",
+        dtstart=datetime(2025, 5, 30, tzinfo=timezone.utc),
+        allow_infinite=True,
+    )
+    tick = TICK.replace(tzinfo=timezone.utc)
+
+    assert batch_schedule([config], tick) == [expected(config, tick)]
+
+
+def test_batch_does_not_modify_configs():
+    config = RecurrenceConfig(freq="DAILY", dtstart=datetime(2025, 5, 1), count=5)
+    before = config.model_dump()
+
+    batch_schedule([config], TICK)
+
+    assert config.model_dump() == before
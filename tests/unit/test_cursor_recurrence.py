@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+
+from domain.entity.recurrence import RecurrenceConfig, make_scheduler
+from infra.recurrence.cursor import (
+    ClosedFormRecurrence,
+    RebasedRecurrence,
+    cursor_factory,
+)
+from infra.recurrence.rruleadaptor import RRuleRecurrence, rrule_factory
+
+
+def make_cfg(**kwargs: Any) -> RecurrenceConfig:
+    base = dict(
+        freq="DAILY",
+        dtstart=datetime(2025, 4, 15, 9, 30),
+        interval=1,
+        allow_infinite=True,
+    )
+    base.update(kwargs)
+    return RecurrenceConfig(**base)
+
+
+CASES = [
+    dict(),
+    dict(interval=3),
+    dict(freq="WEEKLY", interval=2),
+    dict(freq="MONTHLY", count=7),
+    dict(freq="YEARLY", until=datetime(2031, 1, 1)),
+    dict(freq="MONTHLY", dtstart=datetime(2025, 1, 31)),
+    dict(freq="WEEKLY", byweekday=["MO", "FR"], last_run=datetime(2025, 6, 6, 9, 30)),
+    dict(bymonthday=[1, 15], last_run=datetime(2025, 7, 15, 9, 30)),
+    dict(freq="WEEKLY", byweekday=["TU"], count=10),
+]
+
+
+@pytest.mark.parametrize("kwargs", CASES)
+def test_matches_rrule(kwargs: dict[str, Any]):
+    reference = rrule_factory(make_cfg(**kwargs))
+    recur = cursor_factory(make_cfg(**kwargs))
+
+    start = kwargs.get("last_run", datetime(2025, 4, 15))
+    for offset in (0, 1, 17, 400):
+        a = start + timedelta(days=offset, hours=3)
+        b = a + timedelta(days=90)
+        for inc in (True, False):
+            assert recur.after(a, inc) == reference.after(a, inc)
+            assert recur.between(a, b, inc) == reference.between(a, b, inc)
+            assert list(recur.iter_between(a, b, inc)) == recur.between(a, b, inc)
+            assert list(reference.iter_between(a, b, inc)) == reference.between(
+                a, b, inc
+            )
+    assert recur.between(start, start, True) == reference.between(start, start, True)
+
+
+def test_factory_picks_evaluation():
+    assert isinstance(cursor_factory(make_cfg()), ClosedFormRecurrence)
+    # rrule skips the months without a 31st
+    gaps = make_cfg(freq="MONTHLY", dtstart=datetime(2025, 1, 31))
+    assert isinstance(cursor_factory(gaps), RRuleRecurrence)
+
+    weekly = dict(freq="WEEKLY", byweekday=["MO", "FR"])
+    assert isinstance(cursor_factory(make_cfg(**weekly)), RRuleRecurrence)
+    rebased = make_cfg(**weekly, last_run=datetime(2025, 6, 6, 9, 30))
+    assert isinstance(cursor_factory(rebased), RebasedRecurrence)
+    # a cursor that is not an occurrence is not trusted
+    off_rule = make_cfg(**weekly, last_run=datetime(2025, 6, 7, 9, 30))
+    assert isinstance(cursor_factory(off_rule), RRuleRecurrence)
+
+
+def test_old_rule_from_cursor():
+    cfg = make_cfg(dtstart=datetime(1925, 4, 15, 9, 30), interval=2)
+    recur = cursor_factory(cfg)
+
+    assert recur.after(datetime(2025, 4, 15)) == datetime(2025, 4, 16, 9, 30)
+    assert recur.between(datetime(2025, 4, 15), datetime(2025, 4, 20)) == [
+        datetime(2025, 4, 16, 9, 30),
+        datetime(2025, 4, 18, 9, 30),
+    ]
+
+
+def test_scheduler_manager_with_cursor_factory():
+    cfg = make_cfg(count=3, past_events="all")
+    sched = make_scheduler(cursor_factory, cfg)
+
+    assert sched.schedule(datetime(2025, 4, 16, 12)) == [
+        datetime(2025, 4, 15, 9, 30),
+        datetime(2025, 4, 16, 9, 30),
+    ]
+    assert sched.next_run == datetime(2025, 4, 17, 9, 30)
+    assert sched.count == 1
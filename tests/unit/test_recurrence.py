@@ -4,7 +4,11 @@ from typing import Any
 import pytest
 
 from domain.entity.recurrence import RecurrenceConfig, make_scheduler
-from infra.recurrence.rruleadaptor import rrule_factory
+from infra.recurrence.rruleadaptor import (
+    rrule_cache_clear,
+    rrule_cache_info,
+    rrule_factory,
+)
 
 
 def make_cfg(**kwargs: Any) -> RecurrenceConfig:
@@ -108,3 +112,60 @@ def test_weekday_filtering():
         datetime(2025, 4, 18),  # Friday
         datetime(2025, 4, 21),  # Monday
     ]
+
+
+def test_rrule_cache_shares_rules_across_counts():
+    rrule_cache_clear()
+    first = rrule_factory(make_cfg(count=3))
+    second = rrule_factory(make_cfg(count=1))
+
+    info = rrule_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+    assert first._rule is second._rule  # type: ignore
+
+    # the shared rule still honours each config's count
+    until = datetime(2025, 5, 1)
+    assert len(first.between(datetime(2025, 4, 15), until, inc=True)) == 3
+    assert second.between(datetime(2025, 4, 15), until, inc=True) == [
+        datetime(2025, 4, 15)
+    ]
+    assert second.after(datetime(2025, 4, 15)) is None
+
+
+def test_rrule_cache_misses_on_rule_change():
+    rrule_cache_clear()
+    rrule_factory(make_cfg(byweekday=["MO", "FR"]))
+    rrule_factory(make_cfg(byweekday=["MO", "FR"]))
+    rrule_factory(make_cfg(byweekday=["MO"]))
+    rrule_factory(make_cfg(interval=2, byweekday=["MO", "FR"]))
+
+    info = rrule_cache_info()
+    assert (info.hits, info.misses) == (1, 3)
+
+
+def test_count_beyond_until_keeps_every_date():
+    cfg = make_cfg(count=10, until=datetime(2025, 4, 17), past_events="all")
+    sched = make_scheduler(rrule_factory, cfg)
+
+    assert sched.schedule(datetime(2025, 4, 20)) == [
+        datetime(2025, 4, 15),
+        datetime(2025, 4, 16),
+        datetime(2025, 4, 17),
+    ]
+
+
+def test_iter_schedule_applies_state_per_chunk():
+    cfg = make_cfg(count=10, past_events="all")
+    sched = make_scheduler(rrule_factory, cfg)
+
+    chunks = sched.iter_schedule(datetime(2025, 4, 30), chunk_size=3, limit=7)
+
+    first = next(chunks)
+    assert first == [datetime(2025, 4, d) for d in (15, 16, 17)]
+    assert (sched.count, sched.last_run) == (7, datetime(2025, 4, 17))
+    assert sched.next_run == datetime(2025, 4, 18)
+
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    assert (sched.count, sched.last_run) == (3, datetime(2025, 4, 21))
+    # the cap leaves the rest for the next call
+    assert sched.next_run == datetime(2025, 4, 22)
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from domain.entity.recurrence import RecurrenceConfig
+from infra.recurrence.batch import batch_schedule
+from infra.recurrence.shared import SharedSchedule
+
+TICK = datetime(2025, 4, 20, 12)
+
+
+def test_identical_rule_states_are_evaluated_once():
+    seen = []
+
+    def inner(configs, until):
+        seen.append(len(configs))
+        return batch_schedule(configs, until)
+
+    daily = dict(freq="DAILY", dtstart=datetime(2025, 4, 15), allow_infinite=True)
+    configs = [
+        RecurrenceConfig(**daily),
+        RecurrenceConfig(**daily, past_events="all"),  # not part of the rule
+        RecurrenceConfig(**daily, last_run=datetime(2025, 4, 18)),
+        RecurrenceConfig(**daily, count=3),
+        RecurrenceConfig(**daily),
+    ]
+    shared = SharedSchedule(inner)
+
+    planned = shared(configs, TICK)
+
+    assert seen == [3]
+    assert (shared.evaluated, shared.shared) == (3, 2)
+    assert planned == batch_schedule(configs, TICK)
+    assert planned[0][0] is not planned[1][0]
+
+
+def test_rule_fields_split_groups():
+    base = dict(freq="WEEKLY", dtstart=datetime(2025, 4, 1), allow_infinite=True)
+    configs = [
+        RecurrenceConfig(**base),
+        RecurrenceConfig(**base, byweekday=["MO"]),
+        RecurrenceConfig(**base, interval=2),
+        RecurrenceConfig(**base, until=datetime(2025, 4, 10)),
+    ]
+    shared = SharedSchedule()
+
+    assert shared(configs, TICK) == batch_schedule(configs, TICK)
+    assert shared.shared == 0
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import asyncio
+
+import pytest
+
+from app.usecase.fup.createfupgen import CreateFupGenerator, CreateFupGenerators
+from app.usecase.task.runtask import RunTask
+from domain.entity.channel import Channel
+from domain.entity.fupgen import FupGenInput
+from domain.entity.recurrence import RecurrenceConfig
+from infra.db.db import Session
+from infra.recurrence.rruleadaptor import rrule_factory
+from infra.repository.fupgenrepo import FupGenRepository
+from infra.scheduler.scheduler import HeapqTaskScheduler
+
+
+def make_input(ownerid: str, name: str, dtstart: datetime) -> FupGenInput:
+    return FupGenInput(
+        hookid="hook",
+        ownerid=ownerid,
+        name=name,
+        channel=[Channel(id="ch", type="email", configdata={})],
+        recurconfig=RecurrenceConfig(
+            freq="DAILY", dtstart=dtstart, allow_infinite=True
+        ),
+        msg="hello",
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_fupgens_schedules_each_owner_once(populated_session: Session):
+    fupgenrepo = FupGenRepository(
+        db=populated_session,
+        make_recurrence=rrule_factory,
+        make_id=lambda: str(uuid4()),
+    )
+    scheduler = HeapqTaskScheduler()
+    runtask = RunTask(
+        fupgenrepo=fupgenrepo, fuprepo=MagicMock(), sendgateway=AsyncMock()
+    )
+    create = CreateFupGenerators(
+        fupgenrepo=fupgenrepo, scheduler=scheduler, runtask=runtask
+    )
+    queued_at = datetime(2025, 4, 16)
+    await scheduler.schedule("owner1", runtask.execute, queued_at)
+
+    start = datetime(2025, 5, 1)
+    inputs = [
+        make_input("owner1", "new", start),
+        make_input("owner2", "a", start + timedelta(days=3)),
+        make_input("owner2", "b", start),
+        make_input("owner3", "a", start + timedelta(days=1)),
+    ]
+
+    assert await create.execute(inputs) == 2
+
+    # owner1 was already queued and is left alone
+    assert await scheduler.next_run("owner1") == queued_at
+    assert await scheduler.next_run("owner2") == datetime(2025, 5, 2)
+    assert await scheduler.next_run("owner3") == datetime(2025, 5, 3)
+    assert len(fupgenrepo.get_fupgen("owner2", active_only=True)) == 2
+
+
+@pytest.mark.asyncio
+async def test_create_fupgen_schedules_a_task_that_fires(populated_session: Session):
+    fupgenrepo = FupGenRepository(
+        db=populated_session,
+        make_recurrence=rrule_factory,
+        make_id=lambda: str(uuid4()),
+    )
+    scheduler = HeapqTaskScheduler()
+    runtask = MagicMock()
+    runtask.execute = AsyncMock(return_value=None)
+    create = CreateFupGenerator(
+        fupgenrepo=fupgenrepo, scheduler=scheduler, runtask=runtask
+    )
+
+    # dtstart in the past, so the first run is already due
+    await create.execute(make_input("owner2", "a", datetime(2025, 5, 1)))
+    await scheduler.start()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        await scheduler.stop()
+
+    runtask.execute.assert_awaited_once_with("owner2")
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+
+from app.usecase.task.forecast import Forecast
+from domain.entity.channel import Channel
+from domain.entity.fupgen import FupGenInput
+from domain.entity.recurrence import RecurrenceConfig
+from infra.db.db import Session
+from infra.db.models.recurrenceconfig import Recurrence
+from infra.recurrence.rruleadaptor import rrule_factory
+from infra.repository.fupgenrepo import FupGenRepository
+
+TS = datetime(2025, 4, 20, 12)
+
+
+@pytest.fixture
+def repo(session: Session) -> FupGenRepository:
+    repo = FupGenRepository(
+        db=session,
+        make_recurrence=rrule_factory,
+        make_id=iter(f"id{i}" for i in range(100)).__next__,
+    )
+    gens = {
+        "daily": dict(freq="DAILY", dtstart=datetime(2025, 4, 21), count=3),
+        "weekly": dict(freq="WEEKLY", dtstart=datetime(2025, 4, 16)),
+        "silent": dict(freq="DAILY", dtstart=datetime(2025, 4, 21), past_events="none"),
+        "late": dict(freq="DAILY", dtstart=datetime(2025, 4, 10)),
+    }
+    for name, recurrence in gens.items():
+        repo.create(
+            FupGenInput(
+                hookid="hook",
+                ownerid="owner2" if name == "late" else "owner1",
+                name=name,
+                channel=[Channel(id="ch", type="email", configdata={})],
+                recurconfig=RecurrenceConfig(allow_infinite=True, **recurrence),
+                msg=f"{name} message",
+            )
+        )
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_forecast_one_owner(repo: FupGenRepository):
+    forecast = Forecast(fupgenrepo=repo, make_recurrence=rrule_factory)
+
+    fups = await forecast.execute("owner1", until=datetime(2025, 5, 1), ts=TS)
+
+    assert [(fup.fupgenid, fup.date.day) for fup in fups] == [
+        ("id0", 22),  # next_run of a new generator is its second date
+        ("id0", 23),  # count=3: the last one
+        ("id4", 23),
+        ("id4", 30),
+    ]
+    daily = repo.get_fupgen("owner1", active_only=True)[0]
+    assert (fups[0].msgid, fups[0].dataid) == (daily.msg[0], daily.data[0])
+
+
+@pytest.mark.asyncio
+async def test_forecast_many_collapses_lastonly_backlog(repo: FupGenRepository):
+    forecast = Forecast(fupgenrepo=repo, make_recurrence=rrule_factory)
+
+    fups = await forecast.execute_many(
+        ["owner2", "ghost"], until=datetime(2025, 4, 22), ts=TS
+    )
+
+    # next_run 11th: the backlog up to the 20th goes out as one
+    assert [fup.date.day for fup in fups["owner2"]] == [20, 21, 22]
+    assert fups["ghost"] == []
+
+
+@pytest.mark.asyncio
+async def test_forecast_has_no_side_effects(repo: FupGenRepository, session: Session):
+    before = [(r.count, r.last_run, r.next_run) for r in session.query(Recurrence)]
+
+    await Forecast(fupgenrepo=repo, make_recurrence=rrule_factory).execute_many(
+        ["owner1", "owner2"], until=datetime(2025, 12, 31), ts=TS
+    )
+    session.expire_all()
+
+    after = [(r.count, r.last_run, r.next_run) for r in session.query(Recurrence)]
+    assert after == before
@@ -4,10 +4,14 @@ from uuid import uuid4
 
 import pytest
 
-from app.usecase.task.runtask import RunTask
+from app.usecase.task.runtask import CatchUpPolicy, RunTask
 from domain.entity.channel import Channel
+from domain.entity.fupgen import FupGenInput
+from domain.entity.recurrence import RecurrenceConfig
 from infra.db.db import Session
+from infra.recurrence.batch import batch_schedule
 from infra.recurrence.rruleadaptor import rrule_factory
+from infra.recurrence.shared import SharedSchedule
 from infra.repository.fupgenrepo import FupGenRepository
 
 # from domain.entity.fup import FollowUp
@@ -39,3 +43,148 @@ async def test_run_task_executes_correctly(populated_session: Session):
     sendgateway.send.assert_awaited_once()
 
     assert next_run == ts + timedelta(days=1)
+
+
+@pytest.mark.asyncio
+async def test_run_task_execute_many_batches_owners(populated_session: Session):
+    fuprepo = MagicMock()
+    sendgateway = AsyncMock()
+
+    fupgenrepo = FupGenRepository(
+        db=populated_session,
+        make_recurrence=rrule_factory,
+        make_id=lambda: str(uuid4()),
+    )
+    fupgenrepo.create(
+        FupGenInput(
+            hookid="hook2",
+            ownerid="owner2",
+            name="weekly",
+            channel=[Channel(id="ch2", type="email", configdata={})],
+            recurconfig=RecurrenceConfig(
+                freq="WEEKLY", dtstart=datetime(2025, 4, 16), allow_infinite=True
+            ),
+            msg="hello",
+        )
+    )
+
+    task = RunTask(
+        fupgenrepo=fupgenrepo,
+        fuprepo=fuprepo,
+        sendgateway=sendgateway,
+    )
+
+    ts = datetime(2025, 4, 18)
+    nexts = await task.execute_many(["owner1", "owner2", "ghost"], ts)
+
+    fuprepo.add.assert_called_once()
+    sendgateway.send.assert_awaited_once()
+    fups = fuprepo.add.call_args.args[0]
+    assert len(fups) == 2
+
+    assert nexts == {
+        "owner1": ts + timedelta(days=1),
+        "owner2": datetime(2025, 4, 23),
+        "ghost": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_task_batch_schedule_updates_configs(populated_session: Session):
+    fuprepo = MagicMock()
+    fupgenrepo = FupGenRepository(
+        db=populated_session,
+        make_recurrence=rrule_factory,
+        make_id=lambda: str(uuid4()),
+    )
+    task = RunTask(
+        fupgenrepo=fupgenrepo,
+        fuprepo=fuprepo,
+        sendgateway=AsyncMock(),
+        batch_schedule=batch_schedule,
+    )
+
+    ts = datetime(2025, 4, 18)
+    nexts = await task.execute_many(["owner1"], ts)
+
+    assert nexts == {"owner1": ts + timedelta(days=1)}
+    # past_events="lastonly": one fup, for the last date
+    assert [f.date for f in fuprepo.add.call_args.args[0]] == [ts]
+    [fupgen] = fupgenrepo.get_fupgen("owner1", active_only=True)
+    assert fupgen.scheduler.last_run == ts
+    assert fupgen.scheduler.next_run == ts + timedelta(days=1)
+
+
+@pytest.mark.asyncio
+async def test_run_task_catches_up_in_chunks(session: Session):
+    fuprepo = MagicMock()
+    sendgateway = AsyncMock()
+    fupgenrepo = FupGenRepository(
+        db=session, make_recurrence=rrule_factory, make_id=lambda: str(uuid4())
+    )
+    fupgenrepo.create(
+        FupGenInput(
+            hookid="hook3",
+            ownerid="owner3",
+            name="daily",
+            channel=[Channel(id="ch3", type="email", configdata={})],
+            recurconfig=RecurrenceConfig(
+                freq="DAILY",
+                dtstart=datetime(2025, 1, 1),
+                allow_infinite=True,
+                past_events="all",
+            ),
+            msg="hello",
+        )
+    )
+    task = RunTask(
+        fupgenrepo=fupgenrepo,
+        fuprepo=fuprepo,
+        sendgateway=sendgateway,
+        catchup=CatchUpPolicy(chunk_size=30, max_dates=70),
+    )
+
+    # 100 missed days, the cap lets 70 through
+    next_run = await task.execute("owner3", datetime(2025, 4, 10))
+
+    sizes = [len(call.args[0]) for call in sendgateway.send.await_args_list]
+    assert sizes == [0, 30, 30, 10]
+    assert next_run == datetime(2025, 3, 12)
+    [fupgen] = fupgenrepo.get_fupgen("owner3", active_only=True)
+    assert fupgen.scheduler.last_run == datetime(2025, 3, 11)
+    assert fupgen.scheduler.next_run == datetime(2025, 3, 12)
+
+
+@pytest.mark.asyncio
+async def test_run_task_shares_identical_rules(session: Session):
+    fuprepo = MagicMock()
+    fupgenrepo = FupGenRepository(
+        db=session, make_recurrence=rrule_factory, make_id=lambda: str(uuid4())
+    )
+    for ownerid in ("owner1", "owner2", "owner3"):
+        fupgenrepo.create(
+            FupGenInput(
+                hookid="hook",
+                ownerid=ownerid,
+                name="daily",
+                channel=[Channel(id="ch", type="email", configdata={})],
+                recurconfig=RecurrenceConfig(
+                    freq="DAILY", dtstart=datetime(2025, 4, 15), allow_infinite=True
+                ),
+                msg="hello",
+            )
+        )
+    shared = SharedSchedule()
+    task = RunTask(
+        fupgenrepo=fupgenrepo,
+        fuprepo=fuprepo,
+        sendgateway=AsyncMock(),
+        batch_schedule=shared,
+    )
+
+    ts = datetime(2025, 4, 18)
+    nexts = await task.execute_many(["owner1", "owner2", "owner3"], ts)
+
+    assert (shared.evaluated, shared.shared) == (1, 2)
+    assert set(nexts.values()) == {ts + timedelta(days=1)}
+    assert [f.date for f in fuprepo.add.call_args.args[0]] == [ts] * 3
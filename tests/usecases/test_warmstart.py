@@ -0,0 +1,67 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.usecase.task.runtask import RunTask
+from app.usecase.task.warmstart import WarmStart
+from domain.entity.channel import Channel
+from domain.entity.fupgen import FupGenInput
+from domain.entity.recurrence import RecurrenceConfig
+from infra.db.db import Session
+from infra.recurrence.rruleadaptor import rrule_factory
+from infra.repository.fupgenrepo import FupGenRepository
+from infra.scheduler.scheduler import HeapqTaskScheduler
+
+
+def make_input(ownerid: str, name: str, recurconfig: RecurrenceConfig) -> FupGenInput:
+    return FupGenInput(
+        hookid="hook",
+        ownerid=ownerid,
+        name=name,
+        channel=[Channel(id="ch", type="email", configdata={})],
+        recurconfig=recurconfig,
+        msg="hello",
+    )
+
+
+@pytest.mark.asyncio
+async def test_warm_start_loads_min_next_run_per_owner(populated_session: Session):
+    fupgenrepo = FupGenRepository(
+        db=populated_session,
+        make_recurrence=rrule_factory,
+        make_id=lambda: str(uuid4()),
+    )
+    # populated_session's generator has no persisted next_run
+    fupgenrepo.update_config([("id1", False, None, None, datetime(2025, 4, 16))])
+
+    daily = RecurrenceConfig(
+        freq="DAILY", dtstart=datetime(2025, 5, 1), allow_infinite=True
+    )
+    weekly = RecurrenceConfig(
+        freq="WEEKLY", dtstart=datetime(2025, 5, 1), allow_infinite=True
+    )
+    exhausted = RecurrenceConfig(
+        freq="DAILY", dtstart=datetime(2025, 5, 1), count=1, allow_infinite=False
+    )
+    fupgenrepo.create(make_input("owner2", "daily", daily))
+    fupgenrepo.create(make_input("owner2", "weekly", weekly))
+    fupgenrepo.create(make_input("owner3", "once", exhausted))
+
+    scheduler = HeapqTaskScheduler()
+    runtask = RunTask(
+        fupgenrepo=fupgenrepo, fuprepo=MagicMock(), sendgateway=AsyncMock()
+    )
+    warmstart = WarmStart(
+        fupgenrepo=fupgenrepo, scheduler=scheduler, runtask=runtask, chunk_size=1
+    )
+
+    assert await warmstart.execute() == 2
+
+    assert await scheduler.next_run("owner1") == datetime(2025, 4, 16)
+    assert await scheduler.next_run("owner2") == datetime(2025, 5, 2)
+    assert not await scheduler.is_active("owner3")
+
+    # already scheduled owners are left alone
+    assert await warmstart.execute() == 0